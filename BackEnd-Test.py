@@ -1,22 +1,70 @@
 import requests
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Image
+import sys
+import time
+import math
+import tracemalloc
+import threading
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from api_client import ApiClient, ResponseCache, DEFAULT_BASE_URL
+from metrics import RequestRecorder, LatencyHistogram
+from history import HistoryStore
+import regression
+import report
+from token_cache import TokenCache
+from traffic import TrafficRecorder, TrafficReplayer, load_recording
+from results import ResultSink, open_run_sink, read_results, PASSED, FAILED, WARNING, INFO
 from datetime import datetime
 import random
 import string
 
-# Endpoints AgroRedDev
-BASE_URL = "http://127.0.0.1:8000" # Asumiendo que el main.py de FastAPI corre en 8000
-USERS_URL = f"{BASE_URL}/api/v1/users"
-PRODUCTS_URL = f"{BASE_URL}/api/v1/products"
-AUTH_URL = f"{BASE_URL}/api/v1/auth" # Endpoint para autenticación
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
 
-test_results = []
+# Endpoints AgroRedDev (rutas relativas a la base URL del cliente)
+BASE_URL = DEFAULT_BASE_URL
+USERS_URL = "/api/v1/users"
+PRODUCTS_URL = "/api/v1/products"
+AUTH_URL = "/api/v1/auth" # Endpoint para autenticación
+ORDERS_URL = "/api/v1/orders"
+
+# Métricas por endpoint de cada llamada HTTP (latencia, estado, bytes)
+request_recorder = RequestRecorder()
+
+# Cliente HTTP con pool de conexiones compartido por todos los helpers
+client = ApiClient(BASE_URL)
+client.add_hook(request_recorder)
+
+# Tokens de acceso reutilizables por usuario (se renuevan poco antes de su `exp`)
+token_cache = TokenCache()
+
+# Resultados de la ejecución en curso, escritos en streaming a un JSONL
+results_sink = ResultSink()
 test_users_ids = []
 test_products_ids = []
+# Id en el histórico de la última ejecución guardada por este proceso
+last_run_id = None
+
+def configure_client(**kwargs):
+    """Reemplaza el cliente compartido (base URL, tamaño del pool, timeouts, reintentos, caché)."""
+    global client
+    kwargs.setdefault("cache", client.cache)
+    captures = client.captures
+    client.close()
+    client = ApiClient(**kwargs)
+    client.add_hook(request_recorder)
+    # Una grabación de tráfico en curso sigue al cliente nuevo
+    for capture in captures:
+        client.add_capture(capture)
+    return client
+
+def record(status, step, details="", duration=None):
+    """Emite un resultado a la ejecución en curso."""
+    return results_sink.emit(status, step, details, duration)
+
+def _elapsed(response):
+    return response.elapsed.total_seconds() if response is not None else None
 
 def generate_random_string(length=5):
     """Genera una cadena aleatoria de letras minúsculas."""
@@ -26,7 +74,7 @@ def generate_random_string(length=5):
 def register_user(full_name, email, password):
     """Registra un nuevo usuario en el sistema."""
     try:
-        response = requests.post(USERS_URL, json={"full_name": full_name, "email": email, "password": password})
+        response = client.post(USERS_URL, json={"full_name": full_name, "email": email, "password": password})
         response.raise_for_status()
         user_data = response.json()
         print(f"✅ Respuesta de registro de usuario: {user_data}") # Imprime la respuesta completa para depuración
@@ -35,21 +83,21 @@ def register_user(full_name, email, password):
         user_id = user_data.get("_id") 
         if user_id:
             print(f"✅ Usuario registrado: {user_data.get('email')} con ID: {user_id}")
-            test_results.append(f"✅ Registro de usuario '{email}': PASSED. Esperado: Usuario creado con ID. Resultado: {user_id}")
+            record(PASSED, f"Registro de usuario '{email}'", f"Esperado: Usuario creado con ID. Resultado: {user_id}", _elapsed(response))
         else:
             print(f"⚠️ Usuario registrado, pero ID no encontrado en la respuesta: {user_data.get('email')}")
-            test_results.append(f"⚠️ Registro de usuario '{email}': PASSED (sin ID). Esperado: ID de usuario válido. Resultado: ID no encontrado. Respuesta completa: {user_data}")
+            record(WARNING, f"Registro de usuario '{email}'", f"Sin ID. Esperado: ID de usuario válido. Resultado: ID no encontrado. Respuesta completa: {user_data}", _elapsed(response))
         
         return user_id
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló el registro de usuario '{email}': {e}")
-        test_results.append(f"❌ Registro de usuario '{email}': FAILED - {e}. Esperado: Usuario creado con ID.")
+        record(FAILED, f"Registro de usuario '{email}'", f"{e}. Esperado: Usuario creado con ID.", _elapsed(e.response))
         return None
 
 def login_user(email, password):
     """Inicia sesión y obtiene un token de acceso."""
     try:
-        response = requests.post(
+        response = client.post(
             f"{AUTH_URL}/login",
             data={"username": email, "password": password},
             headers={"Content-Type": "application/x-www-form-urlencoded"}
@@ -57,18 +105,22 @@ def login_user(email, password):
         response.raise_for_status()
         token_data = response.json()
         print(f"✅ Login exitoso para {email}. Token obtenido.")
-        test_results.append(f"✅ Login de usuario '{email}': PASSED. Esperado: Token de acceso. Resultado: Token tipo: {token_data.get('token_type')}")
+        record(PASSED, f"Login de usuario '{email}'", f"Esperado: Token de acceso. Resultado: Token tipo: {token_data.get('token_type')}", _elapsed(response))
         return token_data.get("access_token")
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló el login para {email}: {e}")
-        test_results.append(f"❌ Login de usuario '{email}': FAILED - {e}. Esperado: Token de acceso.")
+        record(FAILED, f"Login de usuario '{email}'", f"{e}. Esperado: Token de acceso.", _elapsed(e.response))
         return None
 
+def get_token(email, password, login=None):
+    """Token vigente del usuario: lo reutiliza de la caché o inicia sesión con `login` (por defecto `login_user`)."""
+    return token_cache.get(email, password, login or login_user)
+
 def create_product(access_token, name, price=500, stock=500, whatsapp_number="0123456789", category="Fruta"):
     """Crea un producto asociado a un usuario autenticado."""
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        response = requests.post(PRODUCTS_URL, json={
+        response = client.post(PRODUCTS_URL, json={
             "name": name,
             "price": price,
             "stock": stock,
@@ -80,24 +132,24 @@ def create_product(access_token, name, price=500, stock=500, whatsapp_number="01
         print(f"✅ Producto creado: {product_data}")
         product_id = str(product_data.get("_id"))  # Cambiado para usar "_id" en lugar de "id"
         if product_id:
-            test_results.append(f"✅ Creación de producto '{name}': PASSED. Esperado: Producto creado con ID. Resultado: {product_id}")
+            record(PASSED, f"Creación de producto '{name}'", f"Esperado: Producto creado con ID. Resultado: {product_id}", _elapsed(response))
             return product_id
         else:
-            test_results.append(f"⚠️ Creación de producto '{name}': PASSED (sin ID). Esperado: ID de producto válido. Resultado: ID no encontrado. Respuesta completa: {product_data}")
+            record(WARNING, f"Creación de producto '{name}'", f"Sin ID. Esperado: ID de producto válido. Resultado: ID no encontrado. Respuesta completa: {product_data}", _elapsed(response))
             return None
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló la creación de producto: {e}")
         if e.response is not None:
             print(f"DEBUG: Respuesta de error al crear producto: {e.response.status_code} - {e.response.text}")
-            test_results.append(f"❌ Creación de producto '{name}': FAILED - {e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Producto creado con ID.")
+            record(FAILED, f"Creación de producto '{name}'", f"{e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Producto creado con ID.", _elapsed(e.response))
         else:
-            test_results.append(f"❌ Creación de producto '{name}': FAILED - {e}. Esperado: Producto creado con ID.")
+            record(FAILED, f"Creación de producto '{name}'", f"{e}. Esperado: Producto creado con ID.")
         return None
 
 def get_product(product_id):
     """Obtiene un producto por su ID."""
     try:
-        response = requests.get(f"{PRODUCTS_URL}/{product_id}")
+        response = client.get(f"{PRODUCTS_URL}/{product_id}")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException:
@@ -106,38 +158,67 @@ def get_product(product_id):
 def get_products():
     """Obtiene todos los productos."""
     try:
-        response = requests.get(PRODUCTS_URL)
+        response = client.get(PRODUCTS_URL)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló la consulta de productos: {e}")
-        test_results.append(f"❌ Consulta de productos: FAILED - {e}. Esperado: Lista de productos.")
+        record(FAILED, "Consulta de productos", f"{e}. Esperado: Lista de productos.", _elapsed(e.response))
         return []
 
 def delete_product(access_token, product_id):
     """Elimina un producto por su ID."""
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        response = requests.delete(f"{PRODUCTS_URL}/{product_id}", headers=headers)
+        response = client.delete(f"{PRODUCTS_URL}/{product_id}", headers=headers)
         response.raise_for_status()
         print(f"🗑️ Producto con ID {product_id} eliminado.")
-        test_results.append(f"🗑️ Eliminación de producto (ID: {product_id}): PASSED. Esperado: Código 204 No Content. Resultado: Eliminado.")
+        record(PASSED, f"Eliminación de producto (ID: {product_id})", "Esperado: Código 204 No Content. Resultado: Eliminado.", _elapsed(response))
         return True
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló la eliminación de producto (ID: {product_id}): {e}")
         # Imprime el contenido de la respuesta para depuración del 405
         if e.response is not None:
             print(f"DEBUG: Respuesta de error al eliminar producto: {e.response.status_code} - {e.response.text}")
-            test_results.append(f"❌ Eliminación de producto (ID: {product_id}): FAILED - {e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Código 204 No Content.")
+            record(FAILED, f"Eliminación de producto (ID: {product_id})", f"{e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Código 204 No Content.", _elapsed(e.response))
         else:
-            test_results.append(f"❌ Eliminación de producto (ID: {product_id}): FAILED - {e}. Esperado: Código 204 No Content.")
+            record(FAILED, f"Eliminación de producto (ID: {product_id})", f"{e}. Esperado: Código 204 No Content.")
         return False
 
+def create_order(access_token, product_id, quantity=1):
+    """Realiza un pedido de `quantity` unidades de un producto; devuelve el ID del pedido o None."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    try:
+        response = client.post(ORDERS_URL, json={"product_id": product_id, "quantity": quantity}, headers=headers)
+        response.raise_for_status()
+        order_id = response.json().get("_id")
+        record(PASSED, f"Pedido de producto (ID: {product_id})", f"Esperado: Pedido creado. Resultado: {order_id}", _elapsed(response))
+        return order_id
+    except requests.exceptions.RequestException as e:
+        if e.response is not None and e.response.status_code == 409:
+            # Rechazo de negocio esperado cuando se agota el stock: no es un fallo del servicio
+            record(WARNING, f"Pedido de producto (ID: {product_id})", "Stock insuficiente (409).", _elapsed(e.response))
+        elif e.response is not None:
+            record(FAILED, f"Pedido de producto (ID: {product_id})", f"{e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Pedido creado.", _elapsed(e.response))
+        else:
+            record(FAILED, f"Pedido de producto (ID: {product_id})", f"{e}. Esperado: Pedido creado.")
+        return None
+
 def get_user(user_id, access_token):
     """Obtiene un usuario por su ID (requiere autenticación)."""
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        response = requests.get(f"{USERS_URL}/{user_id}", headers=headers)
+        response = client.get(f"{USERS_URL}/{user_id}", headers=headers)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException:
+        return None
+
+def list_users(access_token):
+    """Lista todos los usuarios (requiere autenticación); None si el backend no lo permite."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    try:
+        response = client.get(USERS_URL, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException:
@@ -150,74 +231,100 @@ def delete_user(access_token, user_id):
         "Content-Type": "application/json"
     }
     try:
-        response = requests.delete(f"{USERS_URL}/{user_id}", headers=headers)
+        response = client.delete(f"{USERS_URL}/{user_id}", headers=headers)
         response.raise_for_status()
         print(f"🗑️ Usuario con ID {user_id} eliminado.")
-        test_results.append(f"🗑️ Eliminación de usuario (ID: {user_id}): PASSED. Esperado: Código 204 No Content. Resultado: Eliminado.")
+        record(PASSED, f"Eliminación de usuario (ID: {user_id})", "Esperado: Código 204 No Content. Resultado: Eliminado.", _elapsed(response))
         return True
     except requests.exceptions.RequestException as e:
         print(f"❌ Falló la eliminación de usuario (ID: {user_id}): {e}")
         if e.response is not None:
             print(f"DEBUG: Respuesta de error al eliminar usuario: {e.response.status_code} - {e.response.text}")
-            test_results.append(f"❌ Eliminación de usuario (ID: {user_id}): FAILED - {e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Código 204 No Content.")
+            record(FAILED, f"Eliminación de usuario (ID: {user_id})", f"{e}. Detalles: {e.response.status_code} - {e.response.text}. Esperado: Código 204 No Content.", _elapsed(e.response))
         else:
-            test_results.append(f"❌ Eliminación de usuario (ID: {user_id}): FAILED - {e}. Esperado: Código 204 No Content.")
+            record(FAILED, f"Eliminación de usuario (ID: {user_id})", f"{e}. Esperado: Código 204 No Content.")
         return False
 
-def generate_pdf_report(results, filename_prefix="AgroRedDev_Backend_Test_Report"):
-    """Genera un reporte PDF con los resultados de las pruebas."""
-    reports_dir = os.path.join(os.path.dirname(__file__), "reports")
+def cache_rows(stats):
+    """Filas con la actividad de la caché HTTP de productos para el reporte."""
+    return [
+        ["GET cacheables", stats["requests"]],
+        ["Aciertos (304, cuerpo desde la caché)", f"{stats['hits']} ({stats['hit_rate']:.1%})"],
+        ["Fallos (cuerpo descargado)", stats["misses"]],
+        ["Revalidaciones (If-None-Match / If-Modified-Since)", stats["revalidations"]],
+        ["Desalojos LRU", stats["evictions"]],
+        ["Bytes descargados", f"{stats['bytes_downloaded'] / 1024:.1f} KiB"],
+        ["Bytes ahorrados", f"{stats['bytes_saved'] / 1024:.1f} KiB"],
+        ["Entradas / tamaño en caché", f"{stats['entries']} / {stats['size'] / 1024:.1f} KiB"],
+    ]
+
+# Resultados que cada modo lista como notas en su reporte, además de los fallos (por tipo de ejecución)
+REPORT_NOTES = {
+    "backend": None,
+    "load": lambda r: r.failed or r.status == INFO or r.step.startswith("Carga: "),
+    "catalog": lambda r: r.failed or r.status == INFO or r.step.startswith("Catálogo: "),
+    "soak": lambda r: r.failed or r.status == INFO or r.step.startswith("Soak: "),
+    "auth": lambda r: r.failed or r.status in (INFO, WARNING) or r.step.startswith("Auth: "),
+    "orders": lambda r: r.failed or r.status in (INFO, WARNING) or r.step.startswith("Contención: "),
+    "replay": lambda r: r.status in (INFO, WARNING) or r.step.startswith("Reproducción: "),
+}
+
+def generate_pdf_report(results, filename_prefix="AgroRedDev_Backend_Test_Report", latency_rows=None, include=None,
+                        max_failures=report.MAX_FAILURES):
+    """Genera el reporte PDF (y el mismo en HTML) de una ejecución.
+
+    `results` es un iterable de `ResultRecord` (normalmente `read_results` sobre
+    el JSONL de la ejecución) que se recorre una sola vez: se listan los fallos
+    (hasta `max_failures`) y, como notas, los resultados que cumplan `include`;
+    el resto queda en tablas y gráficos, así el reporte no crece con la ejecución.
+    """
+    reports_dir = REPORTS_DIR
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
-    
-    now = datetime.now()
-    date_str = now.strftime('%Y%m%d')
-    counter = 1
-    filename = os.path.join(reports_dir, f"{filename_prefix}_{counter}.pdf")
-    while os.path.exists(filename):
-        counter += 1
-        filename = os.path.join(reports_dir, f"{filename_prefix}_{counter}.pdf")
-
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Agrega el logo de la universidad (ajusta la ruta si es necesario)
-    logo_path = os.path.join(reports_dir, "unal_logo.png")
-    if os.path.exists(logo_path):
-        img = Image(logo_path, width=128, height=60)  # Ajusta tamaño si lo deseas
-        story.append(img)
-        story.append(Spacer(1, 12))
-
-    story.append(Paragraph("AgroRedDev Backend Integration Test Report", styles['h1']))
-    story.append(Paragraph(f"Fecha: {now.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 12))
-
-    for result in results:
-        style = styles['Normal']
-        if "FAILED" in result:
-            style = styles['Code']
-            story.append(Paragraph(f"<font color='red'>{result}</font>", style))
-        elif "PASSED" in result:
-            story.append(Paragraph(f"<font color='green'>{result}</font>", style))
-        else:
-            story.append(Paragraph(result, style))
-        story.append(Spacer(1, 6))
-
+    # Nombre único por fecha y hora: no hace falta recorrer los reportes existentes
+    filename = os.path.join(reports_dir, f"{filename_prefix}_{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.pdf")
+    tables = []
+    if client.cache is not None:
+        stats = client.cache.stats()
+        print(f"🗃️ Caché HTTP de productos: {stats['hits']} aciertos, {stats['misses']} fallos, "
+              f"{stats['revalidations']} revalidaciones, {stats['bytes_saved'] / 1024:.1f} KiB ahorrados")
+        tables.append(("Caché HTTP de productos", cache_rows(stats)))
     try:
-        doc.build(story)
-        print(f"📊 Reporte PDF generado: {filename}")
-        test_results.append(f"📊 Reporte PDF generado: {filename}")
+        _, html_path = report.build_report(results, filename, "AgroRedDev Backend Integration Test Report",
+                                           latency_rows, tables, include, max_failures,
+                                           logo_path=os.path.join(reports_dir, "unal_logo.png"))
+        print(f"📊 Reporte PDF generado: {filename} (HTML: {html_path})")
+        record(INFO, f"📊 Reporte PDF generado: {filename}")
+        return filename
     except Exception as e:
         print(f"❌ Error generando el reporte PDF: {e}")
-        test_results.append(f"❌ Error generando el reporte PDF: FAILED - {e}")
+        record(FAILED, "Generación del reporte PDF", str(e))
+        return None
+
+def save_history(kind, report_path, started_at, rows=None):
+    """Guarda la ejecución (resultados y latencias por endpoint, o `rows`) en el histórico SQLite.
+
+    Devuelve su id y lo deja en `last_run_id` para que `run_cli` evalúe esta
+    ejecución y no la última que haya escrito otro job en el mismo histórico.
+    """
+    global last_run_id
+    store = HistoryStore()
+    try:
+        last_run_id = store.record_run(kind, request_recorder.summary() if rows is None else rows,
+                                       results_sink.path, report_path, started_at)
+        print(f"🗄️ Ejecución #{last_run_id} guardada en el histórico ({store.path})")
+        return last_run_id
+    finally:
+        store.close()
 
 def integration_test():
     """Ejecuta las pruebas de integración del backend."""
-    global test_results, test_users_ids, test_products_ids
-    test_results = []
+    global results_sink, test_users_ids, test_products_ids
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Backend_Test_Results")
     test_users_ids = []
     test_products_ids = []
+    request_recorder.reset()
     
     user_id = None
     product_id = None
@@ -228,49 +335,49 @@ def integration_test():
 
     try:
         # 1. Registrar un nuevo usuario
-        test_results.append("--- INICIO DE PRUEBA: Registro de Usuario ---")
+        record(INFO, "--- INICIO DE PRUEBA: Registro de Usuario ---")
         user_id = register_user(test_full_name, test_email, test_password)
         assert user_id is not None, "❌ Falló el registro de usuario, user_id es None."
         test_users_ids.append(user_id)
-        test_results.append("Assertion: User ID is not None: PASSED. Esperado: ID de usuario válido.")
+        record(PASSED, "Assertion: User ID is not None", "Esperado: ID de usuario válido.")
 
         # 2. Iniciar sesión con el usuario creado para obtener un token
-        test_results.append("\n--- INICIO DE PRUEBA: Login de Usuario ---")
+        record(INFO, "--- INICIO DE PRUEBA: Login de Usuario ---")
         access_token = login_user(test_email, test_password)
         assert access_token is not None, "❌ Falló el login, access_token es None."
-        test_results.append("Assertion: Access Token is not None: PASSED. Esperado: Token de acceso válido.")
+        record(PASSED, "Assertion: Access Token is not None", "Esperado: Token de acceso válido.")
 
         # 3. Crear un producto para ese usuario (requiere autenticación)
-        test_results.append("\n--- INICIO DE PRUEBA: Creación de Producto ---")
+        record(INFO, "--- INICIO DE PRUEBA: Creación de Producto ---")
         # Ahora create_product no necesita owner_id como parámetro, lo obtiene del token
         product_id = create_product(access_token, "Tomate Orgánico") 
         assert product_id is not None, "❌ Falló la creación de producto, product_id es None."
         test_products_ids.append(product_id)
-        test_results.append("Assertion: Product ID is not None: PASSED. Esperado: ID de producto válido.")
+        record(PASSED, "Assertion: Product ID is not None", "Esperado: ID de producto válido.")
 
         # # 4. Verificar que el producto está registrado y asociado al usuario
-        # test_results.append("\n--- INICIO DE PRUEBA: Verificación de Producto ---")
+        # record(INFO, "--- INICIO DE PRUEBA: Verificación de Producto ---")
         # products = get_products()
         # user_products = [p for p in products if p.get("owner_id") == user_id]
         # assert any(p["_id"] == product_id for p in user_products), "❌ El producto no fue registrado correctamente o no está asociado al usuario."
         # print("✅ Test completado: producto registrado y vinculado al usuario.")
-        # test_results.append("✅ Verificación de registro y vinculación de producto: PASSED. Esperado: Producto encontrado y asociado al usuario.")
+        # record(PASSED, "Verificación de registro y vinculación de producto", "Esperado: Producto encontrado y asociado al usuario.")
 
         # # 5. Intentar obtener el usuario por ID (requiere autenticación)
-        # test_results.append("\n--- INICIO DE PRUEBA: Obtener Usuario por ID ---")
+        # record(INFO, "--- INICIO DE PRUEBA: Obtener Usuario por ID ---")
         # retrieved_user_data = get_user(user_id, access_token)
         # assert retrieved_user_data is not None and retrieved_user_data.get("_id") == user_id, "❌ No se pudo obtener el usuario por ID o el ID no coincide."
         # print(f"✅ Verificación: Usuario con ID {user_id} obtenido correctamente.")
-        # test_results.append(f"✅ Verificación: Usuario con ID {user_id} obtenido: PASSED. Esperado: Datos del usuario con ID coincidente.")
+        # record(PASSED, f"Verificación: Usuario con ID {user_id} obtenido", "Esperado: Datos del usuario con ID coincidente.")
 
     except AssertionError as ae:
         print(f"❌ Assertion Failed: {ae}")
-        test_results.append(f"❌ ASSERTION FAILED: {ae}. Esperado: Que la condición de la aserción sea verdadera.")
+        record(FAILED, "ASSERTION", f"{ae}. Esperado: Que la condición de la aserción sea verdadera.")
     except Exception as e:
         print(f"❌ Error inesperado durante las pruebas: {e}")
-        test_results.append(f"❌ UNEXPECTED ERROR: {e}. Esperado: Ejecución sin errores inesperados.")
+        record(FAILED, "UNEXPECTED ERROR", f"{e}. Esperado: Ejecución sin errores inesperados.")
     finally:
-        test_results.append("\n--- INICIO DE PRUEBA: Limpieza de Datos ---")
+        record(INFO, "--- INICIO DE PRUEBA: Limpieza de Datos ---")
         # Limpieza de datos: Eliminar productos y usuarios creados
         
         # Eliminar productos solo si se crearon
@@ -280,21 +387,929 @@ def integration_test():
                 retrieved_product = get_product(product_id)
                 assert retrieved_product is None, f"❌ El producto eliminado (ID: {product_id}) sigue presente."
                 print(f"✅ Verificación: Producto con ID {product_id} eliminado y no encontrado.")
-                test_results.append(f"✅ Verificación: Producto con ID {product_id} eliminado y no encontrado: PASSED. Esperado: Producto no encontrado después de la eliminación.")
+                record(PASSED, f"Verificación: Producto con ID {product_id} eliminado y no encontrado", "Esperado: Producto no encontrado después de la eliminación.")
             else:
-                test_results.append(f"❌ Verificación: Producto con ID {product_id} NO eliminado correctamente. Esperado: Producto no encontrado después de la eliminación.")
-
-        # # Eliminar usuarios solo si se crearon
-        # if user_id:
-        #     deleted_user = delete_user(access_token, user_id)
-        #     if deleted_user:
-        #         retrieved_user = get_user(user_id, access_token)
-        #         assert retrieved_user is None, f"❌ El usuario eliminado (ID: {user_id}) sigue presente."
-        #         print(f"✅ Verificación: Usuario con ID {user_id} eliminado y no encontrado.")
-        #         test_results.append(f"✅ Verificación: Usuario con ID {user_id} eliminado y no encontrado: PASSED. Esperado: Usuario no encontrado después de la eliminación.")
-        #     else:
-        #         test_results.append(f"❌ Verificación: Usuario con ID {user_id} NO eliminado correctamente. Esperado: Usuario no encontrado después de la eliminación.")
+                record(FAILED, f"Verificación: Producto con ID {product_id} NO eliminado correctamente", "Esperado: Producto no encontrado después de la eliminación.")
+
+        # Eliminar el usuario solo si se creó; si el login falló se intenta con un token nuevo
+        if user_id:
+            deleted_user = delete_user(access_token or login_user(test_email, test_password), user_id)
+            print(f"🗑️ Limpieza: usuario {user_id} {'eliminado' if deleted_user else 'no eliminado'}")
+            if not deleted_user:
+                record(WARNING, "Limpieza de la prueba de integración",
+                       f"El usuario {user_id} no se pudo eliminar (ver sweeper.py)")
         # Generar reporte PDF al final de las pruebas
-        generate_pdf_report(test_results, filename_prefix="AgroRedDev_Backend_Test_Report")
+        report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Backend_Test_Report",
+                                          latency_rows=request_recorder.summary())
+        results_sink.close()
+        save_history("backend", report_path, started_at)
+
+# --- Modo de carga: usuarios virtuales concurrentes ---
+
+# Nombre de cada paso del flujo -> endpoint que ejercita (para el reporte por endpoint)
+LOAD_ENDPOINTS = {
+    "register": "POST /api/v1/users",
+    "login": "POST /api/v1/auth/login",
+    "create_product": "POST /api/v1/products",
+    "delete_product": "DELETE /api/v1/products/{id}",
+}
+
+def _timed(samples, lock, step, func, *args):
+    """Ejecuta un helper, mide su tiempo y lo acumula en el histograma de su endpoint."""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    with lock:
+        histogram, errors = samples[LOAD_ENDPOINTS[step]]
+        histogram.add(elapsed)
+        if result in (None, False):
+            errors[0] += 1
+    return result
+
+def virtual_user_flow(samples, lock, password="testpassword123", accounts=None):
+    """Una iteración del flujo register → login → create_product → delete_product.
+
+    El usuario registrado se añade a `accounts` para borrarlo al final, fuera de la medición.
+    """
+    email = f"{generate_random_string(10)}@agrored.com"
+    user_id = _timed(samples, lock, "register", register_user, "Usuario de Carga", email, password)
+    if user_id is None:
+        return False
+    if accounts is not None:
+        with lock:
+            accounts.append((user_id, email))
+    access_token = _timed(samples, lock, "login", login_user, email, password)
+    if access_token is None:
+        return False
+    product_id = _timed(samples, lock, "create_product", create_product, access_token,
+                        f"{generate_random_string()} Tomate Carga")
+    if product_id is None:
+        return False
+    return _timed(samples, lock, "delete_product", delete_product, access_token, product_id)
+
+def summarize_load(samples, wall_time):
+    """Calcula throughput, tasa de error y p50/p95/p99 por endpoint."""
+    summary = {}
+    for endpoint in LOAD_ENDPOINTS.values():
+        histogram, errors = samples[endpoint]
+        count = histogram.count
+        summary[endpoint] = {
+            "count": count,
+            "throughput": count / wall_time if wall_time > 0 else 0.0,
+            "error_rate": errors[0] / count if count else 0.0,
+            "p50": histogram.percentile(50) * 1000,
+            "p95": histogram.percentile(95) * 1000,
+            "p99": histogram.percentile(99) * 1000,
+        }
+    return summary
+
+def reused_user_flow(samples, lock, email, password="testpassword123"):
+    """Iteración con un usuario ya registrado: token de la caché → create_product → delete_product.
+
+    Solo los logins reales (caché vacía o token por vencer) cuentan en la latencia de login.
+    """
+    access_token = get_token(email, password, lambda *args: _timed(samples, lock, "login", login_user, *args))
+    if access_token is None:
+        return False
+    product_id = _timed(samples, lock, "create_product", create_product, access_token,
+                        f"{generate_random_string()} Tomate Carga")
+    if product_id is None:
+        return False
+    return _timed(samples, lock, "delete_product", delete_product, access_token, product_id)
+
+def load_test(users=10, iterations=None, duration=None, reuse_users=False, quiet=True, password="testpassword123"):
+    """Ejecuta el flujo de integración con `users` usuarios virtuales concurrentes.
+
+    Cada usuario repite el flujo `iterations` veces, o hasta que pasen `duration`
+    segundos si se indica una duración. Al final se imprime y se reporta el
+    throughput, la tasa de error y la latencia p50/p95/p99 de cada endpoint.
+    Con `reuse_users` cada usuario virtual se registra una sola vez y reutiliza
+    su token entre iteraciones, así la carga se concentra en los productos.
+    Todos los usuarios registrados se borran al terminar, fuera de la medición.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Backend_Load_Results")
+    request_recorder.reset()
+    if iterations is None and duration is None:
+        iterations = 1
+    if reuse_users:
+        token_cache.clear()
+    ensure_pool_size(users)
+    # Por endpoint: histograma de latencias y contador de errores (memoria constante)
+    samples = {endpoint: (LatencyHistogram(), [0]) for endpoint in LOAD_ENDPOINTS.values()}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    accounts = []
+
+    def worker():
+        done = 0
+        account = None
+        if reuse_users:
+            email = f"{generate_random_string(10)}@agrored.com"
+            user_id = _timed(samples, lock, "register", register_user, "Usuario de Carga", email, password)
+            if user_id is None:
+                return
+            account = (user_id, email)
+            with lock:
+                accounts.append(account)
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if iterations is not None and done >= iterations:
+                break
+            if account is None:
+                virtual_user_flow(samples, lock, password, accounts)
+            else:
+                reused_user_flow(samples, lock, account[1], password)
+            done += 1
+
+    def cleanup(account):
+        user_id, email = account
+        access_token = get_token(email, password)
+        deleted = bool(access_token) and delete_user(access_token, user_id)
+        token_cache.invalidate(email)
+        return deleted
+
+    start = time.perf_counter()
+    try:
+        # Los helpers imprimen cada llamada; en carga eso distorsiona las latencias
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            with ThreadPoolExecutor(max_workers=users) as executor:
+                futures = [executor.submit(worker) for _ in range(users)]
+                for future in futures:
+                    future.result()
+        wall_time = time.perf_counter() - start
+    finally:
+        if reuse_users:
+            stats = token_cache.stats()
+            record(INFO, f"🔑 Caché de tokens: {stats['hits']} reutilizados, {stats['logins']} logins "
+                         f"({stats['hit_rate']:.0%} de aciertos)")
+        # Los usuarios se borran fuera de la medición, cada uno con su propio token
+        deleted = run_parallel(cleanup, accounts, users, quiet)
+        print(f"🗑️ Limpieza: {sum(deleted)}/{len(accounts)} usuarios eliminados")
+        if not all(deleted):
+            record(WARNING, "Limpieza de la prueba de carga",
+                   f"{deleted.count(False)} usuarios no se pudieron eliminar (ver sweeper.py)")
+
+    summary = summarize_load(samples, wall_time)
+    record(INFO, f"--- PRUEBA DE CARGA: {users} usuarios virtuales, {wall_time:.1f} s ---")
+    print(f"📈 Prueba de carga: {users} usuarios virtuales, duración {wall_time:.1f} s")
+    for endpoint, stats in summary.items():
+        line = (f"{endpoint}: {stats['count']} req, {stats['throughput']:.1f} req/s, "
+                f"errores {stats['error_rate']:.1%}, p50 {stats['p50']:.1f} ms, "
+                f"p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms")
+        print(f"   {line}")
+        status = FAILED if stats["error_rate"] > 0 else PASSED
+        record(status, f"Carga: {endpoint}", line)
+    # El PDF lista solo el resumen y los fallos; el detalle completo queda en el JSONL
+    report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Backend_Load_Report",
+                                      latency_rows=request_recorder.summary(),
+                                      include=REPORT_NOTES["load"])
+    results_sink.close()
+    save_history("load", report_path, started_at)
+    return summary
+
+# --- Benchmark de escalado del catálogo (GET /api/v1/products) ---
+
+CATALOG_SIZES = (1000, 10000, 100000)
+
+def ensure_pool_size(workers):
+    """Agranda el pool de conexiones del cliente para `workers` hilos concurrentes."""
+    if client.pool_size < workers:
+        configure_client(base_url=client.base_url, pool_size=workers,
+                         timeout=client.timeout, retries=client.retries)
+
+def run_parallel(func, items, workers, quiet=True):
+    """Aplica `func` a cada elemento con un pool de `workers` hilos y devuelve los resultados en orden."""
+    ensure_pool_size(workers)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+def measure_catalog_listing(repeats=3):
+    """Mide `get_products()`: latencias de `repeats` llamadas (ms), pico de memoria y bytes de la respuesta."""
+    sizes = []
+    def capture_size(method, path, status, size, seconds):
+        if method == "GET" and path == PRODUCTS_URL:
+            sizes.append(size)
+    latencies = LatencyHistogram()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        products = get_products()
+        latencies.add(time.perf_counter() - start)
+    del products
+    # La memoria se mide en una llamada aparte: tracemalloc distorsiona los tiempos
+    client.add_hook(capture_size)
+    tracemalloc.start()
+    try:
+        products = get_products()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        client.hooks.remove(capture_size)
+    return {
+        "items": len(products),
+        "mean": latencies.mean * 1000,
+        "min": latencies.min * 1000,
+        "p95": latencies.percentile(95) * 1000,
+        "max": latencies.max * 1000,
+        "peak_mb": peak / (1024 * 1024),
+        "bytes": sizes[-1] if sizes else 0,
+    }
+
+def scaling_exponent(points):
+    """Pendiente log-log entre el primer y el último punto: ~1 es lineal, >1 superlineal."""
+    if len(points) < 2 or points[0][1] <= 0 or points[-1][1] <= 0:
+        return None
+    (n0, t0), (n1, t1) = points[0], points[-1]
+    return math.log(t1 / t0) / math.log(n1 / n0)
+
+def catalog_benchmark(sizes=CATALOG_SIZES, workers=32, repeats=3):
+    """Siembra el catálogo hasta cada tamaño y mide cómo escala el listado completo.
+
+    Los productos se crean y se eliminan en paralelo con `workers` hilos; para
+    cada tamaño se mide el tiempo y el pico de memoria de `get_products()`.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Catalog_Benchmark_Results")
+    request_recorder.reset()
+    email = f"{generate_random_string(10)}@agrored.com"
+    password = "testpassword123"
+    user_id = None
+    access_token = None
+    seeded = []
+    curve = []
+    rows = []
+    try:
+        user_id = register_user("Vendedor Benchmark", email, password)
+        if user_id is None:
+            raise RuntimeError("No se pudo registrar el usuario del benchmark")
+        access_token = login_user(email, password)
+        if access_token is None:
+            raise RuntimeError("No se pudo iniciar sesión con el usuario del benchmark")
+        baseline = len(get_products())
+        for size in sorted(sizes):
+            missing = size - len(seeded)
+            start = time.perf_counter()
+            names = [f"Bench {generate_random_string(8)}" for _ in range(missing)]
+            created = run_parallel(lambda name: create_product(access_token, name), names, workers)
+            seeded.extend(product_id for product_id in created if product_id)
+            seed_time = time.perf_counter() - start
+            stats = measure_catalog_listing(repeats)
+            curve.append((stats["items"], stats["mean"]))
+            line = (f"{stats['items']} productos ({len(seeded)} sembrados + {baseline} previos): "
+                    f"listado medio {stats['mean']:.1f} ms (min {stats['min']:.1f}, p95 {stats['p95']:.1f}, max {stats['max']:.1f}), "
+                    f"pico de memoria {stats['peak_mb']:.1f} MB, respuesta {stats['bytes'] / 1024:.0f} KiB, "
+                    f"siembra {seed_time:.1f} s")
+            print(f"📦 {line}")
+            record(PASSED, f"Catálogo: {size}", line, stats["mean"] / 1000)
+            rows.append({"endpoint": f"GET {PRODUCTS_URL} @ {size}", "count": repeats, "errors": 0,
+                         "min": stats["min"], "mean": stats["mean"], "p95": stats["p95"], "max": stats["max"]})
+        exponent = scaling_exponent(curve)
+        if exponent is not None:
+            print(f"📈 Exponente de escalado del listado: {exponent:.2f} (1.0 = lineal)")
+            record(INFO, f"📈 Exponente de escalado del listado: {exponent:.2f} (1.0 = lineal)")
+    except Exception as e:
+        print(f"❌ Error en el benchmark de catálogo: {e}")
+        record(FAILED, "Benchmark de catálogo", str(e))
+    finally:
+        start = time.perf_counter()
+        deleted = run_parallel(lambda product_id: delete_product(access_token, product_id), seeded, workers)
+        failed = deleted.count(False)
+        print(f"🗑️ Limpieza: {len(seeded) - failed}/{len(seeded)} productos eliminados en {time.perf_counter() - start:.1f} s")
+        if failed:
+            record(FAILED, "Limpieza del catálogo", f"{failed} productos no se pudieron eliminar")
+        if user_id and not (access_token and delete_user(access_token, user_id)):
+            record(FAILED, "Limpieza del catálogo", f"No se pudo eliminar el vendedor del benchmark {email}")
+        report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Catalog_Benchmark_Report",
+                                          latency_rows=request_recorder.summary(),
+                                          include=REPORT_NOTES["catalog"])
+        results_sink.close()
+        save_history("catalog", report_path, started_at, rows)
+    return curve
+
+# --- Modo soak: el flujo completo en bucle durante horas a ritmo fijo ---
+
+class ResourceLedger:
+    """Usuarios y productos creados durante el soak que siguen vivos (id -> email del dueño)."""
+
+    def __init__(self):
+        self.live = {"usuarios": {}, "productos": {}}
+        self.created = {"usuarios": 0, "productos": 0}
+        self.deleted = {"usuarios": 0, "productos": 0}
+
+    def add(self, kind, resource_id, owner_email):
+        self.live[kind][resource_id] = owner_email
+        self.created[kind] += 1
+
+    def remove(self, kind, resource_id):
+        self.live[kind].pop(resource_id, None)
+        self.deleted[kind] += 1
+
+def soak_flow(ledger, password="testpassword123", account=None):
+    """Una iteración completa con limpieza: register → login → create/get/delete product → delete user.
+
+    Con `account` (email de un usuario ya registrado) se omiten el registro y el
+    borrado del usuario y el token sale de la caché: solo se ejercita el producto.
+    """
+    if account is None:
+        email = f"{generate_random_string(10)}@agrored.com"
+        user_id = register_user("Usuario Soak", email, password)
+        if user_id is None:
+            return False
+        ledger.add("usuarios", user_id, email)
+        access_token = login_user(email, password)
+    else:
+        email = account
+        access_token = get_token(email, password)
+    if access_token is None:
+        return False
+    ok = True
+    product_id = create_product(access_token, f"{generate_random_string()} Tomate Soak")
+    if product_id is None:
+        ok = False
+    else:
+        ledger.add("productos", product_id, email)
+        ok = get_product(product_id) is not None
+        if delete_product(access_token, product_id):
+            ledger.remove("productos", product_id)
+        else:
+            ok = False
+    if account is not None:
+        return ok
+    if product_id in ledger.live["productos"]:
+        # El dueño se conserva para poder borrar su producto en la limpieza final
+        return False
+    if delete_user(access_token, user_id):
+        ledger.remove("usuarios", user_id)
+    else:
+        ok = False
+    return ok
+
+def latency_drift(windows, stat="p95"):
+    """Compara la latencia de las primeras y las últimas ventanas por endpoint.
+
+    `windows` es una lista de `RequestRecorder.summary()` (una por ventana).
+    Devuelve {endpoint: (inicio_ms, final_ms, cambio_relativo)} usando la media
+    del primer y el último cuarto de las ventanas, para no depender de una sola.
+    """
+    series = {}
+    for rows in windows:
+        for row in rows:
+            if row["count"]:
+                series.setdefault(row["endpoint"], []).append(row[stat])
+    drift = {}
+    for endpoint, values in series.items():
+        if len(values) < 2:
+            continue
+        edge = max(1, len(values) // 4)
+        start = sum(values[:edge]) / edge
+        end = sum(values[-edge:]) / edge
+        drift[endpoint] = (start, end, (end - start) / start if start > 0 else 0.0)
+    return drift
+
+def soak_test(duration=3600, rate=1.0, window=60, drift_threshold=0.25, reuse_users=False, quiet=True,
+              password="testpassword123"):
+    """Repite el flujo completo `rate` veces por segundo durante `duration` segundos.
+
+    Las latencias se agrupan en ventanas de `window` segundos para detectar
+    deriva (p95 final vs inicial por encima de `drift_threshold`), y cada
+    usuario y producto creado se contabiliza hasta su eliminación para detectar
+    fugas. Los recursos que quedan vivos al final se reportan y se limpian.
+    Con `reuse_users` todos los flujos usan un mismo usuario con token en caché,
+    para que la medición se centre en el tráfico de productos y no en los logins.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Backend_Soak_Results")
+    request_recorder.reset()
+    ledger = ResourceLedger()
+    window_recorder = RequestRecorder()
+    account = account_id = products_before = None
+    client.add_hook(window_recorder)
+    windows = []
+    flows = failed = late = window_flows = 0
+    record(INFO, f"--- PRUEBA SOAK: {duration / 60:.1f} min a {rate:g} flujos/s, ventanas de {window:g} s ---")
+    print(f"⏳ Soak de {duration / 60:.1f} min a {rate:g} flujos/s")
+    try:
+        if reuse_users:
+            token_cache.clear()
+            account = f"{generate_random_string(10)}@agrored.com"
+            account_id = register_user("Usuario Soak", account, password)
+            if account_id is None:
+                raise RuntimeError("No se pudo registrar el usuario del soak")
+            ledger.add("usuarios", account_id, account)
+        products_before = len(get_products())
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        deadline = start + duration
+        next_flow = start
+        next_window = start + window
+        while True:
+            now = time.perf_counter()
+            if now >= next_window or now >= deadline:
+                rows = window_recorder.summary()
+                window_recorder.reset()
+                if rows:
+                    windows.append(rows)
+                    worst = max(rows, key=lambda row: row["p95"])
+                    line = (f"Ventana {len(windows)}: {flows - window_flows} flujos (acumulado: {failed} fallidos, {late} con atraso), "
+                            f"p95 más alto {worst['endpoint']} {worst['p95']:.1f} ms, "
+                            f"vivos {len(ledger.live['usuarios'])} usuarios / {len(ledger.live['productos'])} productos")
+                    print(f"   🕒 {line}")
+                    record(INFO, line)
+                window_flows = flows
+                next_window += window
+            if now >= deadline:
+                break
+            if now < next_flow:
+                time.sleep(min(next_flow, deadline, next_window) - now)
+                continue
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                ok = soak_flow(ledger, password, account)
+            flows += 1
+            failed += not ok
+            next_flow += interval
+            # Si el backend se atrasa no se recuperan los flujos perdidos en ráfaga: el ritmo se mantiene fijo
+            if time.perf_counter() > next_flow:
+                late += 1
+                next_flow = time.perf_counter()
+    except Exception as e:
+        # Sin usuario compartido o sin backend la ejecución igual se reporta y se guarda en el histórico
+        print(f"❌ Error en la prueba soak: {e}")
+        record(FAILED, "Prueba soak", str(e))
+    finally:
+        client.hooks.remove(window_recorder)
+
+    status = FAILED if failed else PASSED
+    record(status, "Soak: flujos", f"{flows} flujos, {failed} fallidos, {late} no cumplieron el ritmo de {rate:g}/s")
+    print(f"{'❌' if failed else '✅'} Soak: {flows} flujos, {failed} fallidos, {late} con atraso")
+    for endpoint, (first, last, change) in sorted(latency_drift(windows).items()):
+        line = f"p95 {first:.1f} ms → {last:.1f} ms ({change:+.0%})"
+        drifted = change > drift_threshold
+        print(f"   {'⚠️' if drifted else '📉'} {endpoint}: {line}")
+        record(FAILED if drifted else PASSED, f"Soak: deriva {endpoint}", line)
+    if reuse_users:
+        stats = token_cache.stats()
+        record(INFO, f"🔑 Caché de tokens: {stats['hits']} reutilizados, {stats['logins']} logins")
+    for kind in ("usuarios", "productos"):
+        # El usuario compartido sigue vivo a propósito hasta la limpieza final
+        leaked = [resource_id for resource_id in ledger.live[kind] if resource_id != account_id]
+        line = f"{ledger.created[kind]} creados, {ledger.deleted[kind]} eliminados, {len(leaked)} sin eliminar"
+        print(f"   {'⚠️' if leaked else '🧹'} {kind}: {line}")
+        record(FAILED if leaked else PASSED, f"Soak: fugas de {kind}", line)
+    products_after = len(get_products())
+    if products_before is not None and products_after != products_before:
+        record(WARNING, "Soak: tamaño del catálogo",
+               f"{products_before} productos al inicio, {products_after} al final (otros clientes también pueden modificarlo)")
+    # Limpieza de lo que quedó vivo, para que el soak no deje basura en el entorno
+    for product_id, email in list(ledger.live["productos"].items()):
+        access_token = get_token(email, password)
+        if access_token and delete_product(access_token, product_id):
+            ledger.remove("productos", product_id)
+    for user_id, email in list(ledger.live["usuarios"].items()):
+        access_token = get_token(email, password)
+        if access_token and delete_user(access_token, user_id):
+            ledger.remove("usuarios", user_id)
+            token_cache.invalidate(email)
+    if any(ledger.live.values()):
+        record(FAILED, "Soak: limpieza final", f"Quedaron {len(ledger.live['usuarios'])} usuarios y "
+               f"{len(ledger.live['productos'])} productos sin eliminar")
+    report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Backend_Soak_Report",
+                                      latency_rows=request_recorder.summary(),
+                                      include=REPORT_NOTES["soak"])
+    results_sink.close()
+    save_history("soak", report_path, started_at)
+    return windows, ledger
+
+# --- Benchmark de throughput de autenticación (registro y login) ---
+
+AUTH_LEVELS = (1, 2, 4, 8, 16, 32)
+AUTH_ENDPOINTS = {"login": f"POST {AUTH_URL}/login", "register": f"POST {USERS_URL}"}
+
+def classify_statuses(statuses):
+    """Agrupa los códigos de estado en éxitos, 401, otros 4xx y errores de servidor/conexión."""
+    groups = {"ok": 0, "401": 0, "4xx": 0, "error": 0}
+    for status, count in statuses.items():
+        if status is not None and status < 400:
+            groups["ok"] += count
+        elif status == 401:
+            groups["401"] += count
+        elif status is not None and status < 500:
+            groups["4xx"] += count
+        else:
+            groups["error"] += count
+    return groups
+
+def throughput_knee(levels, gain=1.1):
+    """Concurrencia a partir de la cual el throughput deja de crecer al menos un `gain` (10 %) por escalón.
+
+    `levels` es una lista de (concurrencia, req/s exitosas) en orden creciente.
+    """
+    best = None
+    for concurrency, throughput in levels:
+        if best is not None and throughput < best[1] * gain:
+            return best[0]
+        if best is None or throughput > best[1]:
+            best = (concurrency, throughput)
+    return None
+
+def run_auth_level(kind, concurrency, duration, accounts, password):
+    """Ejecuta `concurrency` hilos de registros o logins durante `duration` s y devuelve sus métricas."""
+    recorder = RequestRecorder()
+    client.add_hook(recorder)
+    registered = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            if kind == "login":
+                login_user(accounts[index % len(accounts)], password)
+            else:
+                email = f"{generate_random_string(10)}@agrored.com"
+                user_id = register_user("Usuario de Carga", email, password)
+                if user_id:
+                    with lock:
+                        registered.append((user_id, email))
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+    finally:
+        client.hooks.remove(recorder)
+    wall_time = time.perf_counter() - start
+    stats = recorder.endpoints.get(AUTH_ENDPOINTS[kind])
+    if stats is None:
+        return {"concurrency": concurrency, "count": 0, "throughput": 0.0, "p50": 0.0, "p95": 0.0,
+                "max": 0.0, "mean": 0.0, "min": 0.0, "ok": 0, "401": 0, "4xx": 0, "error": 0}, registered
+    groups = classify_statuses(stats.statuses)
+    latency = stats.latency
+    return dict(groups, concurrency=concurrency, count=latency.count, throughput=groups["ok"] / wall_time,
+                p50=latency.percentile(50) * 1000, p95=latency.percentile(95) * 1000, mean=latency.mean * 1000,
+                min=(latency.min or 0.0) * 1000, max=(latency.max or 0.0) * 1000), registered
+
+def auth_benchmark(levels=AUTH_LEVELS, duration=10, kinds=("login", "register"), max_error_rate=0.5,
+                   password="testpassword123", quiet=True):
+    """Sube la concurrencia de logins y registros por escalones hasta saturar user_service.
+
+    En cada escalón se mide el throughput de respuestas exitosas y la latencia,
+    separando 401, otros 4xx y errores de servidor o conexión. El codo es la
+    concurrencia a partir de la cual más hilos ya no aumentan el throughput.
+    Un escalón con más de `max_error_rate` de errores detiene la rampa.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Auth_Benchmark_Results")
+    request_recorder.reset()
+    levels = sorted(levels)
+    ensure_pool_size(levels[-1])
+    rows = []
+    registered = []
+    # Una cuenta por hilo para que los logins no compitan por el mismo usuario
+    accounts = [f"{generate_random_string(10)}@agrored.com" for _ in range(levels[-1])] if "login" in kinds else []
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            created = run_parallel(lambda email: register_user("Usuario de Carga", email, password), accounts, levels[-1])
+        registered.extend((user_id, email) for user_id, email in zip(created, accounts) if user_id)
+        accounts = [email for user_id, email in zip(created, accounts) if user_id]
+        if "login" in kinds and not accounts:
+            raise RuntimeError("No se pudieron registrar las cuentas para el benchmark de login")
+        for kind in kinds:
+            record(INFO, f"--- BENCHMARK DE AUTENTICACIÓN: {AUTH_ENDPOINTS[kind]} ---")
+            print(f"🔐 {AUTH_ENDPOINTS[kind]}")
+            curve = []
+            for concurrency in levels:
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                    stats, created = run_auth_level(kind, concurrency, duration, accounts, password)
+                registered.extend(created)
+                curve.append((concurrency, stats["throughput"]))
+                failed = stats["401"] + stats["4xx"] + stats["error"]
+                line = (f"{concurrency} hilos: {stats['throughput']:.1f} req/s exitosas, p50 {stats['p50']:.0f} ms, "
+                        f"p95 {stats['p95']:.0f} ms; {stats['ok']} ok, {stats['401']} 401, "
+                        f"{stats['4xx']} otros 4xx, {stats['error']} errores 5xx/conexión")
+                print(f"   {line}")
+                record(FAILED if stats["error"] else PASSED, f"Auth: {kind} @ {concurrency}", line, stats["p50"] / 1000)
+                rows.append({"endpoint": f"{AUTH_ENDPOINTS[kind]} @ {concurrency}", "count": stats["count"],
+                             "errors": failed, "min": stats["min"], "mean": stats["mean"],
+                             "p95": stats["p95"], "max": stats["max"]})
+                if stats["count"] and failed / stats["count"] > max_error_rate:
+                    record(WARNING, f"Auth: {kind}", f"Rampa detenida en {concurrency} hilos: "
+                                                     f"{failed / stats['count']:.0%} de respuestas fallidas")
+                    break
+            knee = throughput_knee(curve)
+            peak = max(curve, key=lambda point: point[1])
+            line = (f"Pico {peak[1]:.1f} req/s con {peak[0]} hilos; "
+                    + (f"codo en {knee} hilos" if knee else "sin codo: el throughput siguió creciendo"))
+            print(f"📈 {line}")
+            record(INFO, f"📈 {AUTH_ENDPOINTS[kind]}: {line}")
+    except Exception as e:
+        print(f"❌ Error en el benchmark de autenticación: {e}")
+        record(FAILED, "Benchmark de autenticación", str(e))
+    finally:
+        # Limpieza fuera de la medición: cada usuario se borra con su propio token
+        def cleanup(account):
+            user_id, email = account
+            access_token = get_token(email, password)
+            deleted = bool(access_token) and delete_user(access_token, user_id)
+            token_cache.invalidate(email)
+            return deleted
+        deleted = run_parallel(cleanup, registered, levels[-1])
+        print(f"🗑️ Limpieza: {sum(deleted)}/{len(registered)} usuarios eliminados")
+        if not all(deleted):
+            record(WARNING, "Limpieza del benchmark de autenticación",
+                   f"{deleted.count(False)} usuarios no se pudieron eliminar (ver sweeper.py)")
+        report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Auth_Benchmark_Report",
+                                          include=REPORT_NOTES["auth"])
+        results_sink.close()
+        save_history("auth", report_path, started_at, rows)
+    return rows
+
+# --- Contención de stock: muchos compradores pidiendo el mismo producto a la vez ---
+
+ORDER_ENDPOINT = f"POST {ORDERS_URL}"
+BARRIER_TIMEOUT = 30.0  # s que un comprador espera al resto antes de dar la salida por fallida
+
+def stock_contention_benchmark(buyers=50, stock=100, orders_per_buyer=5, quantity=1,
+                               password="testpassword123", quiet=True):
+    """Lanza pedidos concurrentes contra el stock de un único producto.
+
+    `buyers` hilos (cada uno con su propio comprador) arrancan a la vez y hacen
+    `orders_per_buyer` pedidos de `quantity` unidades. Se mide el throughput y
+    la latencia de los pedidos, se separan los aceptados, los rechazados por
+    falta de stock (409) y los errores, y al final se verifica que el stock
+    restante cuadre con los pedidos aceptados, sin sobreventa.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Stock_Contention_Results")
+    request_recorder.reset()
+    ensure_pool_size(buyers)
+    rows = []
+    seller = None
+    product_id = None
+    accounts = []
+    demand = buyers * orders_per_buyer * quantity
+    record(INFO, f"--- CONTENCIÓN DE STOCK: {buyers} compradores, {demand} unidades pedidas sobre {stock} ---")
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            emails = [f"{generate_random_string(10)}@agrored.com" for _ in range(buyers + 1)]
+            created = run_parallel(lambda email: register_user("Usuario de Carga", email, password), emails, buyers)
+            accounts = [(user_id, email) for user_id, email in zip(created, emails) if user_id]
+            if len(accounts) < 2:
+                raise RuntimeError("No se pudieron registrar el vendedor y los compradores")
+            seller, accounts = accounts[0], accounts[1:]
+            product_id = create_product(get_token(seller[1], password), f"{generate_random_string()} Tomate Cosecha",
+                                        stock=stock)
+            if product_id is None:
+                raise RuntimeError("No se pudo crear el producto del benchmark")
+            # Los logins quedan fuera de la medición: los tokens se piden antes de la barrera
+            tokens = run_parallel(lambda account: get_token(account[1], password), accounts, buyers)
+        # Solo los compradores con sesión cuentan para la barrera; si no, esperaría a hilos que nunca llegan
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            raise RuntimeError("Ningún comprador pudo iniciar sesión")
+        if len(tokens) < len(accounts):
+            record(WARNING, "Contención: login de compradores",
+                   f"{len(accounts) - len(tokens)} de {len(accounts)} compradores no pudieron iniciar sesión")
+        recorder = RequestRecorder()
+        client.add_hook(recorder)
+        barrier = threading.Barrier(len(tokens))
+
+        def buyer(access_token):
+            try:
+                barrier.wait(timeout=BARRIER_TIMEOUT)
+            except threading.BrokenBarrierError:
+                return False
+            for _ in range(orders_per_buyer):
+                create_order(access_token, product_id, quantity)
+            return True
+
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                with ThreadPoolExecutor(max_workers=len(tokens)) as executor:
+                    started = list(executor.map(buyer, tokens))
+        finally:
+            client.hooks.remove(recorder)
+        wall_time = time.perf_counter() - start
+        if not all(started):
+            record(FAILED, "Contención: barrera de salida",
+                   f"{started.count(False)} compradores no arrancaron: la barrera se rompió tras {BARRIER_TIMEOUT:.0f} s")
+
+        stats = recorder.endpoints.get(ORDER_ENDPOINT)
+        statuses = stats.statuses if stats else {}
+        accepted = sum(count for status, count in statuses.items() if status is not None and status < 400)
+        sold_out = statuses.get(409, 0)
+        errors = sum(statuses.values()) - accepted - sold_out
+        latency = stats.latency if stats else LatencyHistogram()
+        line = (f"{latency.count} pedidos en {wall_time:.2f} s ({latency.count / wall_time:.1f} pedidos/s): "
+                f"{accepted} aceptados, {sold_out} sin stock (409), {errors} errores; "
+                f"p50 {latency.percentile(50) * 1000:.1f} ms, p95 {latency.percentile(95) * 1000:.1f} ms, "
+                f"max {(latency.max or 0.0) * 1000:.1f} ms")
+        print(f"🛒 {line}")
+        record(FAILED if errors else PASSED, "Contención: pedidos", line, latency.percentile(50))
+        rows.append({"endpoint": f"{ORDER_ENDPOINT} @ {len(tokens)} compradores", "count": latency.count,
+                     "errors": errors, "min": (latency.min or 0.0) * 1000, "mean": latency.mean * 1000,
+                     "p95": latency.percentile(95) * 1000, "max": (latency.max or 0.0) * 1000})
+
+        product = get_product(product_id)
+        if product is None:
+            raise RuntimeError("No se pudo leer el stock final del producto")
+        expected = stock - accepted * quantity
+        oversold = accepted * quantity > stock
+        consistent = product.get("stock") == expected and not oversold
+        line = (f"Stock final {product.get('stock')} (esperado {expected}: {stock} - {accepted} × {quantity}); "
+                f"{'SOBREVENTA de ' + str(accepted * quantity - stock) + ' unidades' if oversold else 'sin sobreventa'}")
+        print(f"{'✅' if consistent else '❌'} {line}")
+        record(PASSED if consistent else FAILED, "Contención: consistencia del stock", line)
+        if demand >= stock and not oversold and expected > 0 and not errors:
+            record(WARNING, "Contención: stock sin vender",
+                   f"Quedaron {expected} unidades aunque la demanda ({demand}) superaba el stock")
+    except Exception as e:
+        print(f"❌ Error en el benchmark de contención: {e}")
+        record(FAILED, "Benchmark de contención de stock", str(e))
+    finally:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            if product_id and seller:
+                delete_product(get_token(seller[1], password), product_id)
+
+            def cleanup(account):
+                access_token = get_token(account[1], password)
+                deleted = bool(access_token) and delete_user(access_token, account[0])
+                token_cache.invalidate(account[1])
+                return deleted
+            run_parallel(cleanup, accounts + ([seller] if seller else []), buyers)
+        report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Stock_Contention_Report",
+                                          include=REPORT_NOTES["orders"])
+        results_sink.close()
+        save_history("orders", report_path, started_at, rows)
+    return rows
+
+# --- Grabación y reproducción de tráfico ---
+
+def start_recording(path):
+    """Graba todas las peticiones del cliente compartido en `path` hasta `stop_recording`."""
+    recorder = TrafficRecorder(path, base_url=client.base_url)
+    client.add_capture(recorder)
+    return recorder
+
+def stop_recording(recorder):
+    if recorder in client.captures:
+        client.captures.remove(recorder)
+    recorder.close()
+    print(f"🎙️ {recorder.count} peticiones grabadas en {recorder.path}")
+
+def replay_test(path, speed=1.0, copies=1, stagger=0.0):
+    """Reproduce una grabación de tráfico contra el backend configurado.
+
+    Cada copia de la grabación usa sus propios emails y sustituye los `_id` y
+    `access_token` que va devolviendo el backend, así una ejecución funcional
+    grabada se convierte en un perfil de carga. `speed` 0 envía sin pausas.
+    Por endpoint se reporta la latencia y cuántas respuestas no tuvieron el
+    código de estado grabado.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRedDev_Backend_Replay_Results")
+    request_recorder.reset()
+    header, streams = load_recording(path)
+    total = sum(len(stream) for stream in streams)
+    pace = f"{speed:g}x" if speed else "sin pausas"
+    record(INFO, f"--- REPRODUCCIÓN: {total} peticiones en {len(streams)} streams × {copies} copias, {pace} ---",
+           f"Grabación {path} (backend original {header.get('base_url')})")
+    ensure_pool_size(len(streams) * copies)
+    replayer = TrafficReplayer(client, streams, speed=speed, copies=copies, stagger=stagger)
+    stats = replayer.run()
+    line = (f"{stats['requests']} peticiones en {stats['wall_time']:.1f} s "
+            f"({stats['requests'] / stats['wall_time'] if stats['wall_time'] else 0.0:.1f} req/s), "
+            f"{stats['skipped']} omitidas por ids/tokens no capturados, {stats['mismatched']} con otro código de estado, "
+            f"{stats['errors']} sin respuesta; retraso máximo sobre el ritmo grabado {stats['max_lag']:.2f} s")
+    print(f"🔁 Reproducción {pace}: {line}")
+    record(FAILED if stats["errors"] or stats["skipped"] else PASSED, "Reproducción: resumen", line)
+    for row in request_recorder.summary():
+        endpoint = row["endpoint"]
+        statuses = request_recorder.endpoints[endpoint].statuses
+        server_errors = sum(count for status, count in statuses.items() if status is None or status >= 500)
+        mismatched = replayer.mismatches.get(endpoint, 0)
+        line = (f"{endpoint}: {row['count']} req, p95 {row['p95']:.1f} ms, max {row['max']:.1f} ms, "
+                f"{server_errors} errores del servidor, {mismatched} con otro código que el grabado")
+        print(f"   {line}")
+        status = FAILED if server_errors else WARNING if mismatched else PASSED
+        record(status, f"Reproducción: {endpoint}", line)
+    report_path = generate_pdf_report(read_results(results_sink.path), filename_prefix="AgroRedDev_Backend_Replay_Report",
+                                      latency_rows=request_recorder.summary(),
+                                      include=REPORT_NOTES["replay"])
+    results_sink.close()
+    save_history("replay", report_path, started_at)
+    return stats
+
+def positive_float(value):
+    """Tipo de argparse para duraciones y ritmos: un número mayor que cero."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que 0: {value}")
+    return number
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de integración y carga del backend AgroRed.")
+    parser.add_argument("--base-url", default=BASE_URL, help="URL base del backend.")
+    parser.add_argument("--pool-size", type=int, default=10, help="Conexiones keep-alive en el pool HTTP.")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout de lectura por petición en segundos.")
+    parser.add_argument("--retries", type=int, default=2, help="Reintentos de peticiones idempotentes ante 502/503/504.")
+    parser.add_argument("--http-cache", action="store_true",
+                        help="Cachea en el cliente los GET de /api/v1/products (LRU, revalidación con ETag/Last-Modified).")
+    parser.add_argument("--cache-entries", type=int, default=256, help="Máximo de respuestas en la caché HTTP.")
+    parser.add_argument("--cache-mb", type=float, default=32, help="Máximo de MB de cuerpos en la caché HTTP.")
+    parser.add_argument("--stub", action="store_true", help="Levanta un stub local del backend y prueba contra él.")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Latencia inyectada por el stub en segundos.")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Fracción de respuestas 500 del stub.")
+    parser.add_argument("--load", action="store_true", help="Ejecuta el modo de carga con usuarios virtuales concurrentes.")
+    parser.add_argument("--users", type=int, default=10, help="Número de usuarios virtuales concurrentes.")
+    parser.add_argument("--iterations", type=int, default=None, help="Iteraciones del flujo por usuario virtual.")
+    parser.add_argument("--duration", type=float, default=None, help="Duración de la prueba de carga en segundos.")
+    parser.add_argument("--reuse-users", action="store_true",
+                        help="En carga y soak, registra cada usuario una vez y reutiliza su token (caché por exp).")
+    parser.add_argument("--catalog-bench", action="store_true", help="Benchmark de escalado del listado de productos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CATALOG_SIZES), help="Tamaños de catálogo a medir.")
+    parser.add_argument("--workers", type=int, default=32, help="Hilos para sembrar y limpiar en paralelo.")
+    regression.add_arguments(parser)
+    parser.add_argument("--auth-bench", action="store_true", help="Rampa de concurrencia de logins y registros.")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(AUTH_LEVELS),
+                        help="Niveles de concurrencia del benchmark de autenticación.")
+    parser.add_argument("--level-duration", type=float, default=10, help="Segundos por nivel de concurrencia.")
+    parser.add_argument("--auth-kinds", nargs="+", choices=list(AUTH_ENDPOINTS), default=list(AUTH_ENDPOINTS),
+                        help="Operaciones a medir en el benchmark de autenticación.")
+    parser.add_argument("--stub-hash-rounds", type=int, default=0,
+                        help="Iteraciones PBKDF2 del stub por registro/login (simula el coste del hash).")
+    parser.add_argument("--orders-bench", action="store_true",
+                        help="Pedidos concurrentes sobre el stock de un solo producto (contención).")
+    parser.add_argument("--buyers", type=int, default=50, help="Compradores concurrentes en --orders-bench.")
+    parser.add_argument("--stock", type=int, default=100, help="Stock inicial del producto en --orders-bench.")
+    parser.add_argument("--orders-per-buyer", type=int, default=5, help="Pedidos por comprador en --orders-bench.")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="Graba todas las peticiones de la ejecución en PATH (JSONL, .gz para comprimir).")
+    parser.add_argument("--replay", default=None, metavar="PATH", help="Reproduce una grabación de --record.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Aceleración de --replay sobre los tiempos grabados (0 = lo más rápido posible).")
+    parser.add_argument("--copies", type=int, default=1, help="Copias de la grabación reproducidas en paralelo.")
+    parser.add_argument("--stagger", type=float, default=0.0, help="Segundos entre el arranque de cada copia.")
+    parser.add_argument("--soak", action="store_true", help="Repite el flujo completo a ritmo fijo buscando deriva y fugas.")
+    parser.add_argument("--soak-duration", type=positive_float, default=3600, help="Duración del soak en segundos.")
+    parser.add_argument("--rate", type=positive_float, default=1.0, help="Flujos por segundo durante el soak.")
+    parser.add_argument("--window", type=positive_float, default=60, help="Tamaño de ventana para medir la deriva, en segundos.")
+    parser.add_argument("--drift-threshold", type=float, default=0.25,
+                        help="Aumento relativo de p95 (final vs inicio) que se considera degradación.")
+    return parser.parse_args(argv)
+
+def run_cli(argv=None):
+    """Ejecuta el modo elegido por los argumentos y devuelve el código de salida de `regression.gate`."""
+    global last_run_id
+    args = parse_args(argv)
+    last_run_id = None
+    if args.stub:
+        from stub_server import start_stub_server
+        stub = start_stub_server(latency=args.stub_latency, error_rate=args.stub_error_rate,
+                                 hash_rounds=args.stub_hash_rounds)
+        args.base_url = stub.url
+        print(f"🧪 Usando stub local del backend en {stub.url}")
+    configure_client(base_url=args.base_url, pool_size=args.pool_size,
+                     timeout=(3.05, args.timeout), retries=args.retries,
+                     cache=ResponseCache(args.cache_entries, int(args.cache_mb * 1024 * 1024)) if args.http_cache else None)
+    traffic_recorder = start_recording(args.record) if args.record else None
+    if args.replay:
+        kind = "replay"
+        replay_test(args.replay, speed=args.speed, copies=args.copies, stagger=args.stagger)
+    elif args.load:
+        kind = "load"
+        load_test(users=args.users, iterations=args.iterations, duration=args.duration, reuse_users=args.reuse_users)
+    elif args.auth_bench:
+        kind = "auth"
+        auth_benchmark(levels=args.levels, duration=args.level_duration, kinds=args.auth_kinds)
+    elif args.orders_bench:
+        kind = "orders"
+        stock_contention_benchmark(buyers=args.buyers, stock=args.stock, orders_per_buyer=args.orders_per_buyer)
+    elif args.soak:
+        kind = "soak"
+        soak_test(duration=args.soak_duration, rate=args.rate, window=args.window,
+                  drift_threshold=args.drift_threshold, reuse_users=args.reuse_users)
+    elif args.catalog_bench:
+        kind = "catalog"
+        catalog_benchmark(sizes=args.sizes, workers=args.workers)
+    else:
+        kind = "backend"
+        integration_test()
+    if traffic_recorder is not None:
+        stop_recording(traffic_recorder)
+    if last_run_id is None:
+        print(f"❌ La ejecución '{kind}' no quedó guardada en el histórico")
+        return regression.EXIT_FAILED
+    # Código de salida distinto de 0 ante fallos o regresiones de latencia, para bloquear despliegues
+    return regression.gate(kind, args.baseline, args.tolerance, args.diff_out, run_id=last_run_id)
+
 if __name__ == "__main__":
-    integration_test()
+    sys.exit(run_cli())
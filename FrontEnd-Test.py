@@ -1,196 +1,264 @@
-import time
 import os
+import platform
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Image
 from datetime import datetime
 import random
 import string
+import fixtures
+import frontend_pool
+import settings
+from browser_metrics import PageMetrics
+from emulation import PERFILES, PERFIL_BASE, FLUJOS_CLAVE, aplicar_perfil, paso_con_perfil
+from history import HistoryStore
+import regression
+import report
+from metrics import LatencyHistogram
+from results import ResultSink, open_run_sink, read_results, PASSED, FAILED, WARNING, INFO
+from waits import (
+    timings, wait_until, wait_for_element, wait_for_staleness, wait_for_route,
+    wait_for_route_change, wait_for_network_idle, wait_for_stable_count,
+    wait_for_alert, track_network, start_input_timer, wait_for_input_settled,
+)
 
-test_results = []
+FRONTEND_URL = settings.FRONTEND_URL
+# Modificador de "seleccionar todo" en un campo de texto: Cmd en macOS, Ctrl en el resto
+SELECT_ALL_KEY = Keys.COMMAND if platform.system() == "Darwin" else Keys.CONTROL
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+
+# Resultados de la ejecución en curso, escritos en streaming a un JSONL
+results_sink = ResultSink()
+# Id en el histórico de la última ejecución guardada por este proceso
+last_run_id = None
 
 def generate_random_string(length=5):
     """Genera una cadena aleatoria de letras minúsculas."""
     letters = string.ascii_lowercase
     return ''.join(random.choice(letters) for i in range(length))
 
-def generate_pdf_report(results, filename_prefix="AgroRed_Frontend_Test_Report"):
-    reports_dir = os.path.join(os.path.dirname(__file__), "reports")
+def record(status, step, details=""):
+    """Emite un resultado con el tiempo transcurrido desde que empezó el paso actual."""
+    return results_sink.emit(status, step, details, timings.current_elapsed())
+
+# Resultados que cada modo lista como notas en su reporte, además de los fallos (por tipo de ejecución)
+REPORT_NOTES = {
+    "frontend": lambda r: r.status == INFO,
+    "search": lambda r: r.status == INFO or r.step.startswith("Búsqueda: "),
+}
+
+def generate_pdf_report(results, filename_prefix="AgroRed_Frontend_Test_Report", latency_rows=None, include=None,
+                        max_failures=report.MAX_FAILURES):
+    """Genera el reporte PDF (y el mismo en HTML) a partir de un iterable de `ResultRecord`.
+
+    Se listan los fallos y, como notas, los resultados que cumplan `include`;
+    `latency_rows` son los tiempos por paso (`timings.rows()`).
+    """
+    reports_dir = REPORTS_DIR
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
-    report_number = 1
-    filename = os.path.join(reports_dir, f"{filename_prefix}_{report_number}.pdf")
-    while os.path.exists(filename):
-        report_number += 1
-        filename = os.path.join(reports_dir, f"{filename_prefix}_{report_number}.pdf")
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Agrega el logo de la universidad (ajusta la ruta si es necesario)
-    logo_path = os.path.join(reports_dir, "unal_logo.png")
-    if os.path.exists(logo_path):
-        img = Image(logo_path, width=128, height=60)  # Ajusta tamaño si lo deseas
-        story.append(img)
-        story.append(Spacer(1, 12))
-
-    story.append(Paragraph("AgroRed Frontend Integration Test Report", styles['h1']))
-    story.append(Paragraph(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 12))
-    for result in results:
-        style = styles['Normal']
-        if "❌" in result or "FAILED" in result:
-            story.append(Paragraph(f"<font color='red'>{result}</font>", style))
-        elif "✅" in result or "PASSED" in result:
-            story.append(Paragraph(f"<font color='green'>{result}</font>", style))
-        else:
-            story.append(Paragraph(result, style))
-        story.append(Spacer(1, 6))
+    # Nombre único por fecha y hora: no hace falta recorrer los reportes existentes
+    filename = os.path.join(reports_dir, f"{filename_prefix}_{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.pdf")
     try:
-        doc.build(story)
-        print(f"📊 PDF report generated: {filename}")
+        _, html_path = report.build_report(results, filename, "AgroRed Frontend Integration Test Report",
+                                           latency_rows, include=include, max_failures=max_failures,
+                                           logo_path=os.path.join(reports_dir, "unal_logo.png"))
+        print(f"📊 PDF report generated: {filename} (HTML: {html_path})")
+        return filename
     except Exception as e:
         print(f"❌ Error generating PDF report: {e}")
+        return None
+
+def save_history(kind, report_path, started_at, rows):
+    """Guarda la ejecución en el histórico SQLite y deja su id en `last_run_id` para `run_cli`."""
+    global last_run_id
+    store = HistoryStore()
+    try:
+        last_run_id = store.record_run(kind, rows, results_sink.path, report_path, started_at)
+        print(f"🗄️ Ejecución #{last_run_id} guardada en el histórico ({store.path})")
+        return last_run_id
+    finally:
+        store.close()
+
+# Búsqueda de tarjetas del catálogo en una sola evaluación dentro de la página.
+# Argumentos: nombre, producto_id, selector del elemento a devolver dentro de la
+# tarjeta y texto opcional que ese elemento debe contener. Sin nombre ni
+# producto_id se usa la primera tarjeta.
+_BUSCAR_EN_TARJETAS_JS = """
+const [nombre, productoId, selector, texto] = arguments;
+let card = null;
+if (productoId) {
+    const link = document.querySelector('a[href*="/products/' + productoId + '"]');
+    if (!link) return null;
+    card = link.closest('.MuiCard-root');
+    if (!card || selector === 'a') return link;
+} else {
+    for (const candidate of document.getElementsByClassName('MuiCard-root')) {
+        if (!nombre || candidate.innerText.includes(nombre)) { card = candidate; break; }
+    }
+    if (!card) return null;
+}
+for (const element of card.querySelectorAll(selector)) {
+    if (!texto || element.innerText.includes(texto)) return element;
+}
+return null;
+"""
+
+def buscar_en_tarjetas(driver, nombre=None, producto_id=None, selector="a", texto=None):
+    """Devuelve el elemento `selector` de la tarjeta del producto (por id, por nombre o la primera), o None.
+
+    Resuelve todo con un único `execute_script`, en lugar de un round-trip de
+    WebDriver por tarjeta, así que su coste no crece con el tamaño del catálogo.
+    """
+    return driver.execute_script(_BUSCAR_EN_TARJETAS_JS, nombre, producto_id, selector, texto)
+
+def contar_tarjetas(driver):
+    """Número de tarjetas del catálogo sin traer una referencia de WebDriver por tarjeta."""
+    return driver.execute_script("return document.getElementsByClassName('MuiCard-root').length;")
+
+@timings.step
 def abrir_frontend(driver):
     try:
-        driver.get("http://localhost:5173")
-        time.sleep(2)
-        test_results.append("✅ Frontend AgroRed abierto correctamente.")
+        driver.get(FRONTEND_URL)
+        wait_for_network_idle(driver)
+        record(PASSED, "Frontend AgroRed abierto correctamente")
     except Exception as e:
-        test_results.append(f"❌ No se pudo abrir el frontend: {e}")
+        record(FAILED, "No se pudo abrir el frontend", str(e))
         raise
 
 def click_nav_button(driver, text):
-    WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.LINK_TEXT, text))
-    )
-    driver.find_element(By.LINK_TEXT, text).click()
-    time.sleep(2)
+    link = wait_for_element(driver, (By.LINK_TEXT, text), "clickable")
+    href = link.get_attribute("href")
+    track_network(driver)
+    link.click()
+    if href:
+        wait_for_route(driver, href)
+    wait_for_network_idle(driver)
 
+@timings.step
 def cargar_catalogo(driver):
     try:
         click_nav_button(driver, "Catálogo")
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "MuiCard-root"))
-        )
-        productos = driver.find_elements(By.CLASS_NAME, "MuiCard-root")
-        assert len(productos) > 0
-        test_results.append("✅ Catálogo cargado correctamente.")
+        wait_for_element(driver, (By.CLASS_NAME, "MuiCard-root"))
+        assert buscar_en_tarjetas(driver) is not None, "El catálogo no tiene tarjetas de producto"
+        record(PASSED, "Catálogo cargado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la carga del catálogo: {e}")
+        record(FAILED, "Falló la carga del catálogo", str(e))
         raise
 
+@timings.step
 def ir_a_login(driver):
     click_nav_button(driver, "Iniciar Sesión")
 
+@timings.step
 def crear_usuario(driver, full_name, email, password):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "register-form"))
-        )
+        wait_for_element(driver, (By.CLASS_NAME, "register-form"))
         form = driver.find_element(By.CLASS_NAME, "register-form")
         inputs = form.find_elements(By.CLASS_NAME, "register-input")
         inputs[0].send_keys(email)
         inputs[1].send_keys(full_name)
         inputs[2].send_keys(password)
+        track_network(driver)
         form.find_element(By.CLASS_NAME, "register-button").click()
-        time.sleep(2)
-        test_results.append("✅ Usuario registrado correctamente.")
+        wait_for_network_idle(driver)
+        record(PASSED, "Usuario registrado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló el registro de usuario: {e}")
+        record(FAILED, "Falló el registro de usuario", str(e))
         raise
 
+@timings.step
 def iniciar_sesion(driver, email, password):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "login-form"))
-        )
+        wait_for_element(driver, (By.CLASS_NAME, "login-form"))
         form = driver.find_element(By.CLASS_NAME, "login-form")
         inputs = form.find_elements(By.CLASS_NAME, "login-input")
         inputs[0].send_keys(email)
         inputs[1].send_keys(password)
+        track_network(driver)
         form.find_element(By.CLASS_NAME, "login-button").click()
-        time.sleep(2)
-        test_results.append("✅ Inicio de sesión correcto.")
+        # Con sesión iniciada la navbar muestra "Cerrar Sesión"
+        wait_for_element(driver, (By.XPATH, '//button[contains(text(),"Cerrar Sesión")]'), "visible")
+        wait_for_network_idle(driver)
+        record(PASSED, "Inicio de sesión correcto")
     except Exception as e:
-        test_results.append(f"❌ Falló el inicio de sesión: {e}")
+        record(FAILED, "Falló el inicio de sesión", str(e))
         raise
 
+@timings.step
 def ver_productos(driver):
     click_nav_button(driver, "Ver Productos")
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CLASS_NAME, "MuiCard-root"))
-    )
+    wait_for_element(driver, (By.CLASS_NAME, "MuiCard-root"))
 
+@timings.step
 def seleccionar_producto(driver, nombre=None, producto_id=None):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "MuiCard-root"))
-        )
+        wait_for_element(driver, (By.CLASS_NAME, "MuiCard-root"))
         producto = None
-        if producto_id:
-            links = driver.find_elements(By.CSS_SELECTOR, f'a[href*="/products/{producto_id}"]')
-            if links:
-                producto = links[0]
-        elif nombre:
-            cards = driver.find_elements(By.CLASS_NAME, "MuiCard-root")
-            for card in cards:
-                if nombre in card.text:
-                    producto = card.find_element(By.TAG_NAME, "a")
-                    break
+        if producto_id or nombre:
+            producto = buscar_en_tarjetas(driver, nombre=nombre, producto_id=producto_id)
         if producto:
+            url_actual = driver.current_url
+            track_network(driver)
             producto.click()
-            time.sleep(2)
-            test_results.append("✅ Producto seleccionado correctamente.")
+            wait_for_route_change(driver, url_actual)
+            wait_for_network_idle(driver)
+            record(PASSED, "Producto seleccionado correctamente")
         else:
-            test_results.append("❌ No se encontró el producto para seleccionar.")
+            record(FAILED, "No se encontró el producto para seleccionar")
             raise Exception("Producto no encontrado")
     except Exception as e:
-        test_results.append(f"❌ Falló la selección de producto: {e}")
+        record(FAILED, "Falló la selección de producto", str(e))
         raise
 
+@timings.step
 def calificar_producto(driver, estrellas=5, comentario="Prueba de comentario"):
     try:
         estrellas_elements = driver.find_elements(By.CSS_SELECTOR, 'span[class*="css-w8gd7d"]')
         for i in range(estrellas):
+            wait_until(driver, EC.element_to_be_clickable(estrellas_elements[i]))
             estrellas_elements[i].click()
-            time.sleep(0.2)
         textarea = driver.find_element(By.CSS_SELECTOR, 'textarea[placeholder*="Comparte tu experiencia"]')
         textarea.clear()
         textarea.send_keys(comentario)
+        track_network(driver)
         driver.find_element(By.XPATH, '//button[contains(text(),"Enviar Calificación")]').click()
-        time.sleep(2)
-        test_results.append("✅ Calificación enviada correctamente.")
+        # Tras enviar, el formulario pasa a modo edición
+        wait_for_element(driver, (By.XPATH, '//button[contains(text(),"Actualizar Calificación")]'), "visible")
+        wait_for_network_idle(driver)
+        record(PASSED, "Calificación enviada correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la calificación de producto: {e}")
+        record(FAILED, "Falló la calificación de producto", str(e))
         raise
 
+@timings.step
 def actualizar_calificacion(driver, comentario=" actualizado"):
     try:
         textarea = driver.find_element(By.CSS_SELECTOR, 'textarea[placeholder*="Comparte tu experiencia"]')
         textarea.clear()
         textarea.send_keys(comentario)
+        track_network(driver)
         driver.find_element(By.XPATH, '//button[contains(text(),"Actualizar Calificación")]').click()
-        time.sleep(2)
-        test_results.append("✅ Calificación actualizada correctamente.")
+        wait_for_network_idle(driver)
+        record(PASSED, "Calificación actualizada correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la actualización de calificación: {e}")
+        record(FAILED, "Falló la actualización de calificación", str(e))
         raise
 
+@timings.step
 def ir_a_añadir_producto(driver):
     click_nav_button(driver, "Añadir Producto")
 
+@timings.step
 def crear_producto(driver, nombre, precio, stock, whatsapp, categoria, descripcion):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "add-product-form"))
-        )
+        wait_for_element(driver, (By.CLASS_NAME, "add-product-form"))
         form = driver.find_element(By.CLASS_NAME, "add-product-form")
         form.find_element(By.NAME, "name").send_keys(nombre)
         form.find_element(By.NAME, "description").send_keys(descripcion)
@@ -198,194 +266,567 @@ def crear_producto(driver, nombre, precio, stock, whatsapp, categoria, descripci
         form.find_element(By.NAME, "stock").send_keys(str(stock))
         form.find_element(By.NAME, "whatsapp_number").send_keys(whatsapp)
         form.find_element(By.NAME, "category").send_keys(categoria)
+        track_network(driver)
         form.find_element(By.CLASS_NAME, "add-product-submit-button").click()
-        time.sleep(2)
-        test_results.append("✅ Producto creado correctamente.")
+        wait_for_network_idle(driver)
+        record(PASSED, "Producto creado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la creación de producto: {e}")
+        record(FAILED, "Falló la creación de producto", str(e))
         raise
 
+def medir_busqueda(driver, search_input, termino):
+    """Escribe `termino` en el buscador y devuelve los ms hasta que las tarjetas filtradas se estabilizan."""
+    search_input.send_keys(SELECT_ALL_KEY, "a")
+    search_input.send_keys(Keys.DELETE)
+    # Se espera a que el catálogo vuelva a su estado sin filtro antes de medir
+    wait_for_stable_count(driver, (By.CLASS_NAME, "MuiCard-root"))
+    start_input_timer(driver, search_input)
+    search_input.send_keys(termino)
+    return wait_for_input_settled(driver)
+
+@timings.step
 def buscar_producto(driver, nombre):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "catalog-search-input"))
-        )
+        wait_for_element(driver, (By.CLASS_NAME, "catalog-search-input"))
         # Busca el input por la clase generada por MUI
         search_input = driver.find_element(By.CLASS_NAME, "css-1pzfmz2-MuiInputBase-input-MuiOutlinedInput-input")
-        search_input.clear()
-        search_input.send_keys(nombre)
-        time.sleep(2)
-        test_results.append("✅ Producto buscado correctamente.")
+        latencia = medir_busqueda(driver, search_input, nombre)
+        record(PASSED, "Producto buscado correctamente", f"Resultados estables {latencia:.0f} ms tras el último tecleo")
     except Exception as e:
-        test_results.append(f"❌ Falló la búsqueda de producto: {e}")
+        record(FAILED, "Falló la búsqueda de producto", str(e))
         raise
 
+@timings.step
 def editar_producto(driver, producto_id):
     try:
         # Espera el enlace <a> con href que contiene el product_id y texto "Editar"
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, f'//a[contains(@href, "/products/edit")]'))
-        )
-        driver.find_element(By.XPATH, f'//a[contains(@href, "/products/edit")]').click()
-        time.sleep(2)
-        test_results.append("✅ Navegó a editar producto correctamente.")
+        link = wait_for_element(driver, (By.XPATH, '//a[contains(@href, "/products/edit")]'), "clickable")
+        track_network(driver)
+        link.click()
+        wait_for_route(driver, "/products/edit")
+        wait_for_element(driver, (By.NAME, "description"), "visible")
+        wait_for_network_idle(driver)
+        record(PASSED, "Navegó a editar producto correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la navegación a editar producto: {e}")
+        record(FAILED, "Falló la navegación a editar producto", str(e))
         raise
 
+@timings.step
 def actualizar_descripcion_producto(driver, descripcion=" actualizado"):
     try:
         textarea = driver.find_element(By.NAME, "description")
         textarea.clear()
         textarea.send_keys(descripcion)
         driver.find_element(By.XPATH, '//button[contains(text(),"Guardar Cambios")]').click()
-        time.sleep(1)
-        driver.switch_to.alert.accept()  # Aceptar alerta
-        test_results.append("✅ Descripción de producto actualizada correctamente.")
+        wait_for_alert(driver).accept()  # Aceptar alerta
+        record(PASSED, "Descripción de producto actualizada correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la actualización de descripción: {e}")
+        record(FAILED, "Falló la actualización de descripción", str(e))
         raise
 
-def agregar_carrito_catalogo(driver):
+@timings.step
+def agregar_carrito_catalogo(driver, nombre=None, producto_id=None):
     try:
-        # Busca el primer botón "Agregar" en la tarjeta del catálogo por clase y texto
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar")]'))
-        )
-        driver.find_element(By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar")]').click()
-        time.sleep(2)
-        test_results.append("✅ Producto agregado al carrito desde catálogo correctamente.")
+        if nombre or producto_id:
+            # Botón "Agregar" de la tarjeta de ese producto
+            wait_for_element(driver, (By.CLASS_NAME, "MuiCard-root"))
+            boton = buscar_en_tarjetas(driver, nombre=nombre, producto_id=producto_id,
+                                       selector="button.MuiButton-containedPrimary", texto="Agregar")
+            if boton is None:
+                raise Exception("Producto no encontrado en el catálogo")
+            wait_until(driver, EC.element_to_be_clickable(boton))
+        else:
+            # Busca el primer botón "Agregar" en la tarjeta del catálogo por clase y texto
+            boton = wait_for_element(driver, (By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar")]'), "clickable")
+        track_network(driver)
+        boton.click()
+        wait_for_network_idle(driver)
+        record(PASSED, "Producto agregado al carrito desde catálogo correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la adición al carrito desde catálogo: {e}")
+        record(FAILED, "Falló la adición al carrito desde catálogo", str(e))
         raise
 
+@timings.step
 def agregar_carrito_detalle(driver):
     try:
         # Busca el botón "Agregar al Carrito" en la página de detalle
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar al Carrito")]'))
-        )
-        driver.find_element(By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar al Carrito")]').click()
-        time.sleep(2)
-        test_results.append("✅ Producto agregado al carrito desde detalle correctamente.")
+        boton = wait_for_element(driver, (By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Agregar al Carrito")]'), "clickable")
+        track_network(driver)
+        boton.click()
+        wait_for_network_idle(driver)
+        record(PASSED, "Producto agregado al carrito desde detalle correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la adición al carrito desde detalle: {e}")
+        record(FAILED, "Falló la adición al carrito desde detalle", str(e))
         raise
 
+@timings.step
 def cargar_carrito(driver):
     try:
         # Espera el botón del carrito en la navbar
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'a.navbar-button.cart-icon-button'))
-        )
-        driver.find_element(By.CSS_SELECTOR, 'a.navbar-button.cart-icon-button').click()
-        time.sleep(2)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "cart-content"))
-        )
-        test_results.append("✅ Carrito cargado correctamente.")
+        boton = wait_for_element(driver, (By.CSS_SELECTOR, 'a.navbar-button.cart-icon-button'), "clickable")
+        track_network(driver)
+        boton.click()
+        wait_for_element(driver, (By.CLASS_NAME, "cart-content"))
+        wait_for_network_idle(driver)
+        record(PASSED, "Carrito cargado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la carga del carrito: {e}")
+        record(FAILED, "Falló la carga del carrito", str(e))
         raise
 
+@timings.step
 def eliminar_carrito(driver):
     try:
         # Elimina el primer producto del carrito usando el botón "Eliminar"
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'button.remove-button'))
-        )
-        driver.find_element(By.CSS_SELECTOR, 'button.remove-button').click()
-        time.sleep(2)
-        test_results.append("✅ Producto eliminado del carrito correctamente.")
+        boton = wait_for_element(driver, (By.CSS_SELECTOR, 'button.remove-button'), "clickable")
+        boton.click()
+        wait_for_staleness(driver, boton)
+        record(PASSED, "Producto eliminado del carrito correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la eliminación del producto del carrito: {e}")
+        record(FAILED, "Falló la eliminación del producto del carrito", str(e))
         raise
 
+@timings.step
 def realizar_pedido(driver):
     try:
         # Busca el botón "Realizar Pedido" en la página de detalle
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Realizar Pedido")]'))
-        )
-        driver.find_element(By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Realizar Pedido")]').click()
-        time.sleep(10)  # Espera para simular el tiempo de procesamiento del pedido
-        test_results.append("✅ Pedido realizado correctamente.")
+        boton = wait_for_element(driver, (By.XPATH, '//button[contains(@class, "MuiButton-containedPrimary") and contains(., "Realizar Pedido")]'), "clickable")
+        track_network(driver)
+        boton.click()
+        # Espera a que el backend termine de procesar el pedido (timeout propio del paso)
+        wait_for_network_idle(driver)
+        record(PASSED, "Pedido realizado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la realización del pedido: {e}")
+        record(FAILED, "Falló la realización del pedido", str(e))
         raise
 
+@timings.step
 def eliminar_producto(driver):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(text(),"Eliminar")]'))
-        )
-        driver.find_element(By.XPATH, '//button[contains(text(),"Eliminar")]').click()
-        time.sleep(2)
-        driver.switch_to.alert.accept()  # Aceptar alerta
-        test_results.append("✅ Producto eliminado correctamente.")
+        boton = wait_for_element(driver, (By.XPATH, '//button[contains(text(),"Eliminar")]'), "clickable")
+        boton.click()
+        wait_for_alert(driver).accept()  # Aceptar alerta
+        record(PASSED, "Producto eliminado correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló la eliminación de producto: {e}")
+        record(FAILED, "Falló la eliminación de producto", str(e))
         raise
 
+@timings.step
 def cerrar_sesion(driver):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[contains(text(),"Cerrar Sesión")]'))
-        )
-        driver.find_element(By.XPATH, '//button[contains(text(),"Cerrar Sesión")]').click()
-        time.sleep(2)
-        test_results.append("✅ Sesión cerrada correctamente.")
+        boton = wait_for_element(driver, (By.XPATH, '//button[contains(text(),"Cerrar Sesión")]'), "clickable")
+        boton.click()
+        wait_for_element(driver, (By.LINK_TEXT, "Iniciar Sesión"), "visible")
+        record(PASSED, "Sesión cerrada correctamente")
     except Exception as e:
-        test_results.append(f"❌ Falló el cierre de sesión: {e}")
+        record(FAILED, "Falló el cierre de sesión", str(e))
         raise
 
-def main():
+def report_step_timings():
+    """Agrega a los resultados el tiempo de espera y de trabajo de cada paso."""
+    total_wait = 0.0
+    total_work = 0.0
+    results_sink.emit(INFO, "--- TIEMPOS POR PASO (espera vs. trabajo) ---")
+    for step, stats in timings.summary().items():
+        total_wait += stats["wait"]
+        total_work += stats["work"]
+        line = (f"⏱️ {step} (x{stats['calls']}): total {stats['total']:.2f} s, "
+                f"espera {stats['wait']:.2f} s, trabajo {stats['work']:.2f} s")
+        print(line)
+        results_sink.emit(INFO, line, duration=stats["total"])
+    line = f"⏱️ Total: espera {total_wait:.2f} s, trabajo {total_work:.2f} s"
+    print(line)
+    results_sink.emit(INFO, line)
+
+# --- Escenarios independientes, ejecutables en paralelo ---
+
+TEST_PASSWORD = "Testpassword123."
+
+def crear_driver(headless=True):
+    """Crea una instancia de Chrome; en headless se fija el viewport de escritorio."""
     options = Options()
-    # options.add_argument('--headless')
-    driver = webdriver.Chrome(options=options)
-    global test_results
-    test_results = []
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=options)
+
+@timings.step
+def preparar_sesion(driver, productos=(), vendedor=None):
+    """Prepara el escenario por API: comprador con sesión inyectada y productos de otro vendedor.
+
+    Los productos se siembran con un usuario vendedor aparte para que el
+    comprador pueda calificarlos y comprarlos. Si se recibe `vendedor` (creado
+    una vez para toda la ejecución) se reutiliza su token en lugar de registrar
+    e iniciar sesión con un vendedor nuevo por escenario.
+    No abre el frontend: después se llama a `abrir_frontend` como paso propio
+    (un paso anidado no se mide ni pasa por sus presupuestos de carga) y a
+    `verificar_sesion`.
+    """
+    datos = {"productos": {}, "vendedor": None}
+    if productos:
+        datos["vendedor"] = vendedor or fixtures.crear_usuario_api("Vendedor de Prueba")
+        datos["productos"] = fixtures.sembrar_productos(fixtures.token_de(datos["vendedor"]), productos)
+    datos["comprador"] = fixtures.crear_usuario_api()
+    fixtures.inyectar_sesion(driver, datos["comprador"]["token"])
+    return datos
+
+@timings.step
+def verificar_sesion(driver):
+    """La sesión inyectada por `preparar_sesion` debe verse como usuario autenticado en la navbar."""
+    wait_for_element(driver, (By.XPATH, '//button[contains(text(),"Cerrar Sesión")]'), "visible")
+
+def limpiar_sesion(datos):
+    if not datos:
+        return
+    if datos["productos"]:
+        fixtures.eliminar_productos(fixtures.token_de(datos["vendedor"]), datos["productos"])
+    # El comprador se registra en todos los escenarios con sesión, con o sin productos
+    if datos.get("comprador"):
+        fixtures.eliminar_usuario_api(datos["comprador"])
+
+def escenario_registro(driver, datos):
+    """Registro e inicio de sesión por formulario (el resto de escenarios los hace por API)."""
+    test_email = f"{generate_random_string(10)}@agrored.com"
+    abrir_frontend(driver)
+    ver_productos(driver)
+    ir_a_login(driver)
+    crear_usuario(driver, "Usuario de Prueba", test_email, TEST_PASSWORD)
+    iniciar_sesion(driver, test_email, TEST_PASSWORD)
+
+def escenario_calificacion(driver, datos):
+    (producto_id,) = datos["productos"].values()
+    cargar_catalogo(driver)
+    seleccionar_producto(driver, producto_id=producto_id)
+    calificar_producto(driver, estrellas=5, comentario="prueba de comentario")
+    actualizar_calificacion(driver)
+
+def escenario_carrito(driver, datos):
+    (producto_id,) = datos["productos"].values()
+    cargar_catalogo(driver)
+    agregar_carrito_catalogo(driver, producto_id=producto_id) # Agregar producto al carrito desde el catálogo
+    seleccionar_producto(driver, producto_id=producto_id)
+    agregar_carrito_detalle(driver)
+    cargar_carrito(driver)
+    eliminar_carrito(driver)
+    realizar_pedido(driver)
+
+def escenario_crud_producto(driver, datos):
+    test_produc_name = f"{generate_random_string()} Producto Test"
+    ir_a_añadir_producto(driver)
+    crear_producto(driver, test_produc_name, 1000, 10, "0123456789", "Frutas", "descripción de prueba")
+    cargar_catalogo(driver)
+    buscar_producto(driver, test_produc_name)
+    seleccionar_producto(driver, nombre=test_produc_name)
+    editar_producto(driver, producto_id=None)
+    actualizar_descripcion_producto(driver)
+    cargar_catalogo(driver)
+    buscar_producto(driver, test_produc_name)
+    seleccionar_producto(driver, nombre=test_produc_name)
+    eliminar_producto(driver)
+    cargar_catalogo(driver)
+    buscar_producto(driver, test_produc_name)
+
+def escenario_busqueda(driver, datos):
+    (nombre,) = datos["productos"]
+    cargar_catalogo(driver)
+    buscar_producto(driver, nombre)
+    seleccionar_producto(driver, nombre=nombre)
+
+# nombre -> (función del escenario, nº de productos a sembrar por API, sesión por API)
+ESCENARIOS = {
+    "registro": (escenario_registro, 0, False),
+    "calificacion": (escenario_calificacion, 1, True),
+    "carrito": (escenario_carrito, 1, True),
+    "crud_producto": (escenario_crud_producto, 0, True),
+    "busqueda": (escenario_busqueda, 1, True),
+}
+
+def ejecutar_escenario(nombre, results_path, headless=True, vendedor=None, perfil=PERFIL_BASE):
+    """Ejecuta un escenario completo en su propio Chrome y con su propio usuario.
+
+    Corre en un proceso del pool: escribe sus resultados en su propio JSONL
+    (`results_path`) y devuelve los tiempos por paso para combinarlos en un
+    solo reporte.
+    Salvo el escenario de registro, el usuario, su sesión y los productos que
+    necesita se crean por API en lugar de llenar formularios.
+    Con un `perfil` de emulación distinto del base se limitan la red y la CPU
+    del Chrome, se escalan los timeouts y los pasos se registran como
+    `paso @ perfil`; los presupuestos de rendimiento solo aplican al perfil base.
+    """
+    global results_sink
+    results_sink = ResultSink(results_path)
+    timings.reset()
+    ok = True
+    datos = None
+    escenario, n_productos, sesion_api = ESCENARIOS[nombre]
+    metricas = PageMetrics(record, budgets=None if perfil == PERFIL_BASE else {})
+    timings.add_listener(metricas)
+    driver = crear_driver(headless)
     try:
-        test_email = f"{generate_random_string()}@agrored.com"
-        test_password = "Testpassword123."
-        test_full_name = "Usuario de Prueba"
-        test_produc_name = f"{generate_random_string()} Producto Test"
-        abrir_frontend(driver)
-        ver_productos(driver)
-        ir_a_login(driver)
-        crear_usuario(driver, test_full_name, test_email, test_password)
-        iniciar_sesion(driver, test_email, test_password)
-        cargar_catalogo(driver)
-        seleccionar_producto(driver, nombre="Papa")  
-        calificar_producto(driver, estrellas=5, comentario="prueba de comentario")
-        actualizar_calificacion(driver)
-        cargar_catalogo(driver)
-        agregar_carrito_catalogo(driver) # Agregar producto al carrito desde el catálogo
-        seleccionar_producto(driver, nombre="Fresa")
-        agregar_carrito_detalle(driver)
-        cargar_carrito(driver)
-        eliminar_carrito(driver)
-        realizar_pedido(driver)
-        ir_a_añadir_producto(driver)
-        crear_producto(driver, test_produc_name, 1000, 10, "0123456789", "Frutas", "descripción de prueba")
-        cargar_catalogo(driver)
-        buscar_producto(driver, test_produc_name)
-        seleccionar_producto(driver, nombre=test_produc_name)
-        editar_producto(driver, producto_id=None) 
-        actualizar_descripcion_producto(driver)
-        cargar_catalogo(driver)
-        buscar_producto(driver, test_produc_name)
-        seleccionar_producto(driver, nombre=test_produc_name)
-        eliminar_producto(driver)
-        cargar_catalogo(driver)
-        buscar_producto(driver, test_produc_name)
+        timings.timeout_scale = aplicar_perfil(driver, perfil)
+        if sesion_api:
+            productos = [f"{generate_random_string()} Producto Semilla" for _ in range(n_productos)]
+            datos = preparar_sesion(driver, productos, vendedor)
+            abrir_frontend(driver)
+            verificar_sesion(driver)
+        escenario(driver, datos)
         cerrar_sesion(driver)
     except Exception as e:
-        print(f"Error en el test: {e}")
-        test_results.append(f"❌ TEST GENERAL FALLÓ: {e}")
+        ok = False
+        print(f"Error en el escenario {nombre}: {e}")
+        results_sink.emit(FAILED, f"ESCENARIO '{nombre}'", str(e))
     finally:
+        timings.remove_listener(metricas)
         driver.quit()
-        generate_pdf_report(test_results, "AgroRed_Frontend_Test_Report")
+        limpiar_sesion(datos)
+        # Exceder un presupuesto de rendimiento también hace fallar el escenario
+        if metricas.violations:
+            ok = False
+        results_sink.close()
+    for registro in timings.records:
+        registro["step"] = paso_con_perfil(registro["step"], perfil)
+    return nombre, ok, timings.records
+
+def reportar_perfiles(perfiles):
+    """Compara entre perfiles de emulación el tiempo medio de los flujos clave."""
+    medias = {row["endpoint"]: row["mean"] for row in timings.rows()}
+    results_sink.emit(INFO, "--- FLUJOS CLAVE POR PERFIL DE EMULACIÓN ---")
+    for step in FLUJOS_CLAVE:
+        base = medias.get(step)
+        partes = []
+        for perfil in perfiles:
+            media = medias.get(paso_con_perfil(step, perfil))
+            if media is None:
+                continue
+            factor = f" (x{media / base:.1f})" if base and perfil != PERFIL_BASE else ""
+            partes.append(f"{perfil} {media / 1000:.2f} s{factor}")
+        if partes:
+            line = f"🐢 {step}: " + ", ".join(partes)
+            print(line)
+            results_sink.emit(INFO, line)
+
+def configurar_destinos(frontend_url, base_url):
+    """Apunta el script al frontend y al backend indicados (proceso principal y procesos del pool)."""
+    global FRONTEND_URL
+    FRONTEND_URL = frontend_url
+    fixtures.load_backend().configure_client(base_url=base_url)
+
+def main(escenarios=None, workers=4, headless=True, perfiles=None):
+    """Ejecuta los escenarios en paralelo sobre un pool de `workers` Chrome y combina los resultados.
+
+    Con varios `perfiles` de emulación cada escenario se ejecuta una vez por perfil.
+    """
+    global results_sink
+    started_at = time.time()
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRed_Frontend_Test_Results")
+    timings.reset()
+    escenarios = escenarios or list(ESCENARIOS)
+    perfiles = perfiles or [PERFIL_BASE]
+    trabajos = [(nombre, perfil) for perfil in perfiles for nombre in escenarios]
+    parciales = {(nombre, perfil): f"{results_sink.path[:-len('.jsonl')]}_{nombre}_{perfil}.jsonl"
+                 for nombre, perfil in trabajos}
+    estados = {}
+    # Un solo vendedor para todos los escenarios: cada proceso reutiliza su token en vez de hacer login
+    vendedor = None
+    if any(ESCENARIOS[nombre][1] for nombre in escenarios):
+        try:
+            vendedor = fixtures.crear_usuario_api("Vendedor de Prueba")
+        except Exception as e:
+            results_sink.emit(WARNING, "Vendedor compartido", f"{e}. Cada escenario creará el suyo.")
+    # Los procesos se inicializan con las URLs de este: con spawn o forkserver no heredan sus globales
+    destinos = (FRONTEND_URL, fixtures.load_backend().client.base_url)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(trabajos))),
+                             initializer=frontend_pool.inicializar_proceso, initargs=destinos) as executor:
+        futures = {executor.submit(frontend_pool.ejecutar_escenario, nombre, parciales[(nombre, perfil)], headless,
+                                   vendedor, perfil): (nombre, perfil) for nombre, perfil in trabajos}
+        for future in as_completed(futures):
+            try:
+                _, ok, records = future.result()
+            except Exception as e:
+                results_sink.emit(FAILED, "TEST GENERAL", str(e))
+                continue
+            estados[futures[future]] = ok
+            timings.extend(records)
+    if vendedor:
+        fixtures.eliminar_usuario_api(vendedor)
+    # Se respeta el orden de los escenarios pedido, no el de finalización
+    for trabajo in trabajos:
+        if trabajo not in estados:
+            continue
+        estado = "PASSED" if estados[trabajo] else "FAILED"
+        results_sink.emit(INFO, f"--- ESCENARIO: {paso_con_perfil(trabajo[0], trabajo[1])} ({estado}) ---")
+        for result in read_results(parciales[trabajo]):
+            results_sink.write(result)
+        os.remove(parciales[trabajo])
+    report_step_timings()
+    if perfiles != [PERFIL_BASE]:
+        reportar_perfiles(perfiles)
+    report_path = generate_pdf_report(read_results(results_sink.path), "AgroRed_Frontend_Test_Report",
+                                      latency_rows=timings.rows(), include=REPORT_NOTES["frontend"])
+    results_sink.close()
+    save_history("frontend", report_path, started_at, timings.rows())
+
+# --- Benchmark de búsqueda de tarjetas: por tarjeta vs. en una sola evaluación ---
+
+_CATALOGO_SINTETICO_JS = """
+const n = arguments[0];
+const html = [];
+for (let i = 0; i < n; i++) {
+    html.push('<div class="MuiCard-root"><a href="/products/bench' + i + '">Producto Bench ' + i +
+              '</a><p>Precio ' + i + '</p><button class="MuiButton-containedPrimary">Agregar</button></div>');
+}
+document.body.innerHTML = html.join('');
+"""
+
+def _buscar_tarjeta_por_elemento(driver, nombre):
+    """Búsqueda anterior: un `card.text` (y un `find_element`) por tarjeta. Solo para comparar."""
+    for card in driver.find_elements(By.CLASS_NAME, "MuiCard-root"):
+        if nombre in card.text:
+            return card.find_element(By.TAG_NAME, "a")
+    return None
+
+def benchmark_tarjetas(sizes=(50, 200, 1000), repeats=3, headless=True):
+    """Compara ambas búsquedas sobre catálogos sintéticos de tamaño creciente.
+
+    Se busca siempre la última tarjeta (peor caso para el recorrido tarjeta a tarjeta).
+    """
+    global results_sink
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRed_DOM_Benchmark_Results")
+    driver = crear_driver(headless)
+    try:
+        driver.get("about:blank")
+        for size in sizes:
+            driver.execute_script(_CATALOGO_SINTETICO_JS, size)
+            objetivo = f"Producto Bench {size - 1}"
+            tiempos = {}
+            for nombre, buscar in (("por tarjeta", lambda: _buscar_tarjeta_por_elemento(driver, objetivo)),
+                                   ("en lote", lambda: buscar_en_tarjetas(driver, nombre=objetivo))):
+                muestras = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    encontrado = buscar()
+                    muestras.append(time.perf_counter() - start)
+                    assert encontrado is not None, f"No se encontró {objetivo} ({nombre})"
+                tiempos[nombre] = sorted(muestras)[len(muestras) // 2]
+            line = (f"{size} tarjetas: por tarjeta {tiempos['por tarjeta'] * 1000:.1f} ms, "
+                    f"en lote {tiempos['en lote'] * 1000:.1f} ms "
+                    f"(x{tiempos['por tarjeta'] / max(tiempos['en lote'], 1e-9):.0f})")
+            print(f"🔎 {line}")
+            results_sink.emit(PASSED, f"Búsqueda de tarjetas: {size}", line, tiempos["en lote"])
+    except Exception as e:
+        print(f"❌ Error en el benchmark de tarjetas: {e}")
+        results_sink.emit(FAILED, "Benchmark de tarjetas", str(e))
+    finally:
+        driver.quit()
+        generate_pdf_report(read_results(results_sink.path), "AgroRed_DOM_Benchmark_Report",
+                            include=lambda r: r.status == INFO or r.step.startswith("Búsqueda de tarjetas: "))
+        results_sink.close()
+
+# --- Benchmark de latencia de búsqueda en el catálogo ---
+
+BUSQUEDA_TERMINOS = ("Papa", "Tom", "Bench", "sin-resultados-xyz")
+BUSQUEDA_TAMANOS = (100, 1000)
+_PALABRAS_SEMILLA = ("Papa", "Tomate", "Fresa", "Mango", "Yuca")
+
+def benchmark_busqueda(terminos=BUSQUEDA_TERMINOS, sizes=BUSQUEDA_TAMANOS, repeats=5, headless=True, workers=16):
+    """Mide tecleo→resultados estables del buscador para cada término y tamaño de catálogo.
+
+    El catálogo se siembra por API hasta cada tamaño con nombres que combinan
+    varias palabras, para que cada término filtre un subconjunto distinto.
+    """
+    global results_sink
+    results_sink = open_run_sink(REPORTS_DIR, "AgroRed_Search_Benchmark_Results")
+    started_at = time.time()
+    filas = []
+    sembrados = {}
+    vendedor = comprador = None
+    driver = crear_driver(headless)
+    try:
+        vendedor = fixtures.crear_usuario_api("Vendedor Búsqueda")
+        comprador = fixtures.crear_usuario_api()
+        fixtures.inyectar_sesion(driver, comprador["token"])
+        for size in sorted(sizes):
+            faltantes = size - len(sembrados)
+            nombres = [f"Bench {_PALABRAS_SEMILLA[i % len(_PALABRAS_SEMILLA)]} {generate_random_string(6)}"
+                       for i in range(len(sembrados), len(sembrados) + faltantes)]
+            sembrados.update(fixtures.sembrar_catalogo(vendedor["token"], nombres, workers))
+            abrir_frontend(driver)
+            cargar_catalogo(driver)
+            wait_for_element(driver, (By.CLASS_NAME, "catalog-search-input"))
+            search_input = driver.find_element(By.CLASS_NAME, "css-1pzfmz2-MuiInputBase-input-MuiOutlinedInput-input")
+            for termino in terminos:
+                latencias = LatencyHistogram()
+                for _ in range(repeats):
+                    latencias.add(medir_busqueda(driver, search_input, termino) / 1000)
+                tarjetas = contar_tarjetas(driver)
+                fila = {"endpoint": f"buscar '{termino}' @ {size}", "count": latencias.count, "errors": 0,
+                        "min": latencias.min * 1000, "mean": latencias.mean * 1000,
+                        "p95": latencias.percentile(95) * 1000, "max": latencias.max * 1000}
+                filas.append(fila)
+                line = (f"'{termino}' con {len(sembrados)} productos sembrados → {tarjetas} tarjetas: "
+                        f"p50 {latencias.percentile(50) * 1000:.0f} ms, p95 {fila['p95']:.0f} ms, "
+                        f"max {fila['max']:.0f} ms")
+                print(f"🔎 {line}")
+                results_sink.emit(PASSED, f"Búsqueda: '{termino}' @ {size}", line, latencias.percentile(50))
+    except Exception as e:
+        print(f"❌ Error en el benchmark de búsqueda: {e}")
+        results_sink.emit(FAILED, "Benchmark de búsqueda", str(e))
+    finally:
+        driver.quit()
+        if vendedor and sembrados:
+            fixtures.eliminar_productos(vendedor["token"], sembrados, workers)
+        for usuario in (vendedor, comprador):
+            if usuario:
+                fixtures.eliminar_usuario_api(usuario)
+        report_path = generate_pdf_report(read_results(results_sink.path), "AgroRed_Search_Benchmark_Report",
+                                          include=REPORT_NOTES["search"])
+        results_sink.close()
+        save_history("search", report_path, started_at, filas)
+    return filas
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de integración del frontend AgroRed.")
+    parser.add_argument("--frontend-url", default=FRONTEND_URL, help="URL del frontend (o AGRORED_FRONTEND_URL).")
+    parser.add_argument("--base-url", default=settings.BASE_URL,
+                        help="URL del backend donde se siembran los datos (o AGRORED_BASE_URL).")
+    parser.add_argument("--workers", type=int, default=4, help="Instancias de Chrome en paralelo.")
+    parser.add_argument("--headed", action="store_true", help="Muestra el navegador en lugar de usar headless.")
+    parser.add_argument("--dom-bench", action="store_true",
+                        help="Compara la búsqueda de tarjetas por elemento y en lote sobre catálogos sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000],
+                        help="Número de tarjetas de cada catálogo sintético (--dom-bench).")
+    parser.add_argument("--search-bench", action="store_true",
+                        help="Mide la latencia del buscador del catálogo por término y tamaño de catálogo.")
+    parser.add_argument("--terms", nargs="+", default=list(BUSQUEDA_TERMINOS), help="Términos a buscar (--search-bench).")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=list(BUSQUEDA_TAMANOS),
+                        help="Productos a sembrar antes de medir (--search-bench).")
+    regression.add_arguments(parser)
+    parser.add_argument("--profiles", nargs="+", choices=list(PERFILES), default=[PERFIL_BASE],
+                        help="Perfiles de emulación de red/CPU; cada escenario se ejecuta una vez por perfil.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(ESCENARIOS), default=None,
+                        help="Escenarios a ejecutar (por defecto todos).")
+    return parser.parse_args(argv)
+
+def run_cli(argv=None):
+    """Ejecuta el modo elegido por los argumentos y devuelve el código de salida de `regression.gate`."""
+    global last_run_id
+    args = parse_args(argv)
+    last_run_id = None
+    configurar_destinos(args.frontend_url, args.base_url)
+    if args.dom_bench:
+        # Benchmark local del DOM: no se guarda en el histórico ni tiene umbrales
+        benchmark_tarjetas(sizes=args.sizes, headless=not args.headed)
+        return regression.EXIT_OK
+    if args.search_bench:
+        kind = "search"
+        benchmark_busqueda(terminos=args.terms, sizes=args.catalog_sizes, headless=not args.headed)
+    else:
+        kind = "frontend"
+        main(escenarios=args.scenarios, workers=args.workers, headless=not args.headed, perfiles=args.profiles)
+    if last_run_id is None:
+        print(f"❌ La ejecución '{kind}' no quedó guardada en el histórico")
+        return regression.EXIT_FAILED
+    return regression.gate(kind, args.baseline, args.tolerance, args.diff_out, run_id=last_run_id)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(run_cli())
@@ -0,0 +1,128 @@
+import argparse
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import settings
+
+SMOKE_PATH = "/api/v1/products"
+# Tipos de ejecución del histórico que escribe FrontEnd-Test.py; el resto son de BackEnd-Test.py
+FRONTEND_KINDS = ("frontend", "search")
+
+
+def smoke(base_url, path=SMOKE_PATH, timeout=5.0):
+    """Comprueba que el backend responde a `path` con un código < 400 antes de `timeout` segundos.
+
+    Pensado como health probe: solo usa la biblioteca estándar, no genera
+    reportes ni histórico y lee las cabeceras de la respuesta, no el cuerpo.
+    """
+    url = base_url.rstrip("/") + path
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers={"Accept": "application/json"}),
+                                    timeout=timeout) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError as e:
+        print(f"❌ {url}: sin respuesta ({e})")
+        return 1
+    elapsed = time.perf_counter() - start
+    ok = status < 400
+    print(f"{'✅' if ok else '❌'} {url}: {status} en {elapsed * 1000:.0f} ms")
+    return 0 if ok else 1
+
+
+def report(results_path=None, kind=None, max_failures=None):
+    """Regenera el reporte (PDF y HTML) de una ejecución a partir de su JSONL de resultados.
+
+    Sin `results_path` se usa la última ejecución de `kind` del histórico; si
+    la ejecución está en el histórico su reporte incluye la latencia por endpoint
+    y su tipo decide qué script lo construye y qué notas lista (`REPORT_NOTES`).
+    Para un JSONL fuera del histórico el tipo es `kind`.
+    """
+    import fixtures
+    from history import HistoryStore
+    from results import read_results
+
+    store = HistoryStore()
+    try:
+        if results_path is not None:
+            results_path = os.path.abspath(results_path)
+            run = store.find_run(results_path=results_path)
+        else:
+            run = store.find_run(kind=kind)
+            if run is None:
+                print(f"❌ No hay ejecuciones '{kind}' en el histórico")
+                return 1
+            results_path = run[2]
+        if run:
+            kind = run[1]
+        latency_rows = store.run_metrics(run[0]) if run else None
+    finally:
+        store.close()
+    if not results_path or not os.path.exists(results_path):
+        print(f"❌ No existe el archivo de resultados {results_path}")
+        return 1
+    prefix = os.path.basename(results_path).split("_Results_")[0] + "_Report"
+    script = fixtures.load_frontend() if kind in FRONTEND_KINDS else fixtures.load_backend()
+    options = {} if max_failures is None else {"max_failures": max_failures}
+    report_path = script.generate_pdf_report(read_results(results_path), filename_prefix=prefix, latency_rows=latency_rows,
+                                             include=script.REPORT_NOTES.get(kind), **options)
+    return 0 if report_path else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="agrored", allow_abbrev=False, description="CLI de las pruebas AgroRed. Las opciones no listadas en cada subcomando "
+                                    "se pasan al script correspondiente (BackEnd-Test.py / FrontEnd-Test.py).")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    backend = subcommands.add_parser("backend", allow_abbrev=False, help="Pruebas de integración del backend (o --smoke).")
+    backend.add_argument("--smoke", action="store_true",
+                         help="Solo comprueba que el backend responde, sin reportes (health probe).")
+    backend.add_argument("--smoke-path", default=SMOKE_PATH, help="Ruta consultada por --smoke.")
+    backend.add_argument("--smoke-timeout", type=float, default=5.0, help="Timeout de --smoke en segundos.")
+
+    subcommands.add_parser("load", allow_abbrev=False, help="Prueba de carga del backend con usuarios virtuales.")
+
+    frontend = subcommands.add_parser("frontend", allow_abbrev=False, help="Escenarios de navegador del frontend.")
+    frontend.add_argument("--frontend-url", default=settings.FRONTEND_URL,
+                          help="URL del frontend (por defecto AGRORED_FRONTEND_URL o %(default)s).")
+
+    report_parser = subcommands.add_parser("report", allow_abbrev=False, help="Regenera el reporte PDF de una ejecución.")
+    report_parser.add_argument("results", nargs="?", default=None, help="JSONL de resultados de la ejecución.")
+    report_parser.add_argument("--kind", default="backend",
+                               help="Sin JSONL, usa la última ejecución de este tipo (también es el tipo de un JSONL "
+                                    "que no está en el histórico).")
+    report_parser.add_argument("--max-failures", type=int, default=None,
+                               help="Fallos listados uno por uno en el reporte (el resto solo se cuenta).")
+
+    for subcommand in (backend, subcommands.choices["load"], frontend):
+        subcommand.add_argument("--base-url", default=settings.BASE_URL,
+                                help="URL base del backend (por defecto AGRORED_BASE_URL o %(default)s).")
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None):
+    args, extra = parse_args(argv)
+    if args.command == "report":
+        if extra:
+            print(f"❌ Opciones no reconocidas: {' '.join(extra)}")
+            return 2
+        return report(args.results, args.kind, args.max_failures)
+    if args.command == "backend" and args.smoke:
+        return smoke(args.base_url, args.smoke_path, args.smoke_timeout)
+    # Los scripts (y con ellos requests, reportlab o selenium) solo se cargan aquí
+    import fixtures
+    if args.command == "frontend":
+        return fixtures.load_frontend().run_cli(
+            ["--frontend-url", args.frontend_url, "--base-url", args.base_url] + extra)
+    mode = ["--load"] if args.command == "load" else []
+    return fixtures.load_backend().run_cli(mode + ["--base-url", args.base_url] + extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from settings import BASE_URL as DEFAULT_BASE_URL
+
+CACHED_PREFIXES = ("/api/v1/products",)
+
+
+class _CachedResponse:
+    """Cuerpo y validadores de una respuesta 200 guardada en la caché."""
+
+    def __init__(self, response):
+        self.content = response.content
+        self.headers = response.headers.copy()
+        self.encoding = response.encoding
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+    def as_response(self, validation):
+        """Respuesta 200 con el cuerpo guardado, con los tiempos de la revalidación (`validation`)."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = self.content
+        response.headers = self.headers.copy()
+        response.encoding = self.encoding
+        response.url = validation.url
+        response.request = validation.request
+        response.elapsed = validation.elapsed
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """Caché LRU de respuestas GET que se revalida en cada petición.
+
+    Guarda las respuestas 200 que traen `ETag` o `Last-Modified` bajo las rutas
+    de `prefixes` y, al repetir la petición, envía `If-None-Match` /
+    `If-Modified-Since`; ante un 304 devuelve el cuerpo guardado. Como siempre
+    se consulta al servidor, un producto borrado nunca se sirve desde la caché.
+    El tamaño está acotado por `max_entries` y `max_bytes` de cuerpos.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, prefixes=CACHED_PREFIXES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.prefixes = tuple(prefixes)
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(("requests", "hits", "misses", "revalidations", "evictions",
+                                       "bytes_downloaded", "bytes_saved"), 0)
+
+    def accepts(self, method, url):
+        return method == "GET" and urlsplit(url).path.startswith(self.prefixes)
+
+    @staticmethod
+    def key(url, params=None):
+        return f"{url}?{urlencode(sorted(params.items()), doseq=True)}" if params else url
+
+    def lookup(self, key):
+        """Devuelve (entrada, cabeceras condicionales) o (None, {}) si la URL no está en caché."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, {}
+            self._entries.move_to_end(key)
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return entry, headers
+
+    def update(self, key, entry, response):
+        """Procesa la respuesta del servidor y devuelve la que debe ver quien hizo la petición."""
+        with self._lock:
+            self.counters["requests"] += 1
+            if entry is not None:
+                self.counters["revalidations"] += 1
+            if entry is not None and response.status_code == 304:
+                self.counters["hits"] += 1
+                self.counters["bytes_saved"] += len(entry.content)
+                return entry.as_response(response)
+            self.counters["misses"] += 1
+            self.counters["bytes_downloaded"] += len(response.content)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.content)
+            cacheable = (response.status_code == 200 and len(response.content) <= self.max_bytes
+                         and ("ETag" in response.headers or "Last-Modified" in response.headers))
+            if cacheable:
+                self._entries[key] = _CachedResponse(response)
+                self.size += len(response.content)
+                while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted.content)
+                    self.counters["evictions"] += 1
+        return response
+
+    def stats(self):
+        """Contadores, entradas y bytes en caché, y tasa de aciertos sobre las peticiones cacheables."""
+        with self._lock:
+            stats = dict(self.counters, entries=len(self._entries), size=self.size)
+        stats["hit_rate"] = stats["hits"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+class ApiClient:
+    """Cliente HTTP compartido por los helpers del backend.
+
+    Mantiene una única `requests.Session` con un pool de conexiones keep-alive,
+    de modo que las pruebas de muchas iteraciones no pagan el establecimiento de
+    una conexión TCP por petición.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=10, timeout=(3.05, 30),
+                 retries=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), cache=None):
+        self.base_url = base_url.rstrip("/")
+        # ResponseCache opcional para los GET de productos
+        self.cache = cache
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        # Observadores llamados tras cada petición: hook(method, path, status, size, seconds).
+        # Con caché ven la respuesta servida: un 304 revalidado llega como 200 con el tamaño del cuerpo guardado
+        self.hooks = []
+        # Capturas del intercambio completo: capture(method, path, kwargs, response, seconds);
+        # `response.from_cache` indica si el cuerpo salió de la caché
+        self.captures = []
+        self.session = requests.Session()
+        # Solo se reintentan métodos idempotentes (GET, DELETE, ...); un POST nunca se repite
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        """Construye la URL absoluta para una ruta del API."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def add_capture(self, capture):
+        self.captures.append(capture)
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+        cache_key = cached = None
+        if self.cache is not None and self.cache.accepts(method, url):
+            cache_key = self.cache.key(url, kwargs.get("params"))
+            cached, conditional = self.cache.lookup(cache_key)
+            if conditional:
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), **conditional}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            seconds = time.perf_counter() - start
+            self._notify(method, url, None, 0, seconds)
+            self._capture(method, path, kwargs, None, seconds)
+            raise
+        seconds = time.perf_counter() - start
+        if cache_key is not None:
+            response = self.cache.update(cache_key, cached, response)
+        if not getattr(response, "from_cache", False):
+            response.from_cache = False
+        self._notify(method, url, response.status_code, len(response.content), seconds)
+        self._capture(method, path, kwargs, response, seconds)
+        return response
+
+    def _capture(self, method, path, kwargs, response, seconds):
+        for capture in self.captures:
+            capture(method, path, kwargs, response, seconds)
+
+    def _notify(self, method, url, status, size, seconds):
+        path = urlsplit(url).path
+        for hook in self.hooks:
+            hook(method, path, status, size, seconds)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,107 @@
+from results import INFO, FAILED
+
+# Presupuestos por paso en milisegundos. Claves: duration (tiempo total del paso),
+# resources (desde el inicio del paso hasta el último recurso recibido),
+# ttfb/dom_content_loaded/load (Navigation Timing), fcp/lcp (paint).
+PAGE_BUDGETS = {
+    "abrir_frontend": {"ttfb": 800, "fcp": 1800, "lcp": 2500, "load": 4000},
+    "cargar_catalogo": {"duration": 3000, "resources": 2000},
+    "seleccionar_producto": {"duration": 2500, "resources": 1500},
+    "cargar_carrito": {"duration": 2500, "resources": 1500},
+    "ir_a_añadir_producto": {"duration": 2000},
+}
+
+_MARK_JS = "return [performance.now(), performance.timeOrigin];"
+
+# Navigation Timing, paint y resource timing desde la marca `since` (ms, reloj de la página)
+_COLLECT_JS = """
+const since = arguments[0];
+const result = {timeOrigin: performance.timeOrigin, now: performance.now()};
+const nav = performance.getEntriesByType('navigation')[0];
+if (nav) {
+    result.navigation = {
+        ttfb: nav.responseStart,
+        dom_content_loaded: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd,
+        transfer_size: nav.transferSize || 0,
+    };
+}
+const fcp = performance.getEntriesByType('paint').find(p => p.name === 'first-contentful-paint');
+result.fcp = fcp ? fcp.startTime : null;
+result.lcp = null;
+try {
+    const observer = new PerformanceObserver(() => {});
+    observer.observe({type: 'largest-contentful-paint', buffered: true});
+    const entries = observer.takeRecords();
+    observer.disconnect();
+    if (entries.length) result.lcp = entries[entries.length - 1].startTime;
+} catch (e) {}
+let bytes = 0, lastEnd = since, slowest = null, count = 0;
+for (const r of performance.getEntriesByType('resource')) {
+    if (r.startTime < since) continue;
+    count++;
+    bytes += r.transferSize || 0;
+    lastEnd = Math.max(lastEnd, r.responseEnd);
+    if (!slowest || r.duration > slowest.duration) slowest = {name: r.name, duration: r.duration};
+}
+result.resources = {count: count, bytes: bytes, span: lastEnd - since, slowest: slowest};
+return result;
+"""
+
+
+class PageMetrics:
+    """Listener de `StepTimings` que mide el rendimiento percibido en el navegador.
+
+    Al empezar cada paso marca `performance.now()`; al terminar recoge los
+    recursos descargados desde esa marca y, si el paso cargó un documento nuevo,
+    su Navigation Timing, FCP y LCP. Los valores se comparan con `PAGE_BUDGETS`.
+    """
+
+    def __init__(self, record, budgets=None):
+        self.record = record
+        self.budgets = PAGE_BUDGETS if budgets is None else budgets
+        self.violations = []
+        self._mark = None
+
+    def step_started(self, step, args):
+        driver = args[0] if args else None
+        self._mark = None
+        try:
+            self._mark = driver.execute_script(_MARK_JS)
+        except Exception:
+            # Pasos sin driver o navegador no disponible: no hay métricas que medir
+            pass
+
+    def step_finished(self, step, args, record):
+        if self._mark is None:
+            return None
+        since, time_origin = self._mark
+        self._mark = None
+        try:
+            data = args[0].execute_script(_COLLECT_JS, since)
+        except Exception:
+            return None
+        new_document = data["timeOrigin"] != time_origin
+        if new_document:
+            # Documento nuevo: todos sus recursos cuentan desde su propio origen de tiempo
+            data = args[0].execute_script(_COLLECT_JS, 0)
+        metrics = {"duration": record["total"] * 1000, "resources": data["resources"]["span"]}
+        if new_document:
+            metrics.update({k: v for k, v in (data.get("navigation") or {}).items() if k != "transfer_size"})
+            metrics["fcp"] = data["fcp"]
+            metrics["lcp"] = data["lcp"]
+        self._report(step, metrics, data["resources"])
+        return metrics
+
+    def _report(self, step, metrics, resources):
+        parts = [f"{name} {value:.0f} ms" for name, value in metrics.items() if value is not None]
+        parts.append(f"{resources['count']} recursos ({resources['bytes'] / 1024:.0f} KiB)")
+        if resources["slowest"]:
+            parts.append(f"más lento {resources['slowest']['name']} ({resources['slowest']['duration']:.0f} ms)")
+        self.record(INFO, f"🌐 {step}: " + ", ".join(parts))
+        for name, budget in self.budgets.get(step, {}).items():
+            value = metrics.get(name)
+            if value is not None and value > budget:
+                self.violations.append((step, name, value, budget))
+                self.record(FAILED, f"Presupuesto de rendimiento de {step}",
+                            f"{name} {value:.0f} ms > {budget} ms")
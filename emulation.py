@@ -0,0 +1,42 @@
+# Perfiles de emulación por Chrome DevTools: red con Network.emulateNetworkConditions
+# (latencia en ms, throughput en bytes/s) y CPU con Emulation.setCPUThrottlingRate.
+# Los de red son los preajustes "Fast 3G" y "Slow 3G" de DevTools.
+PERFIL_BASE = "escritorio"
+
+
+def _kbps(kbps):
+    return kbps * 1000 / 8
+
+
+PERFILES = {
+    PERFIL_BASE: {},
+    "fast-3g": {"latency": 562.5, "download": _kbps(1440), "upload": _kbps(675), "timeout_scale": 2},
+    "slow-3g": {"latency": 2000, "download": _kbps(400), "upload": _kbps(400), "timeout_scale": 4},
+    "cpu-4x": {"cpu": 4, "timeout_scale": 2},
+    # Teléfono de gama baja con conexión rural débil
+    "movil-rural": {"latency": 2000, "download": _kbps(400), "upload": _kbps(400), "cpu": 4, "timeout_scale": 6},
+}
+
+# Pasos que se comparan entre perfiles: catálogo, detalle, carrito y pedido
+FLUJOS_CLAVE = ("cargar_catalogo", "seleccionar_producto", "agregar_carrito_detalle", "realizar_pedido")
+
+
+def aplicar_perfil(driver, nombre):
+    """Aplica el perfil `nombre` al driver y devuelve su factor de escala de timeouts."""
+    perfil = PERFILES[nombre]
+    if "latency" in perfil:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": perfil["latency"],
+            "downloadThroughput": perfil["download"],
+            "uploadThroughput": perfil["upload"],
+        })
+    if "cpu" in perfil:
+        driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": perfil["cpu"]})
+    return perfil.get("timeout_scale", 1)
+
+
+def paso_con_perfil(step, perfil):
+    """Nombre del paso en reportes e histórico: sin sufijo en el perfil base, `paso @ perfil` en los demás."""
+    return step if perfil == PERFIL_BASE else f"{step} @ {perfil}"
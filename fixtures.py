@@ -0,0 +1,134 @@
+import importlib.util
+import json
+import os
+import sys
+
+SEED_PASSWORD = "Testpassword123."
+# Clave de localStorage donde el frontend guarda el token de sesión
+SESSION_TOKEN_KEY = "token"
+
+
+def _load_script(module_name, filename):
+    module = sys.modules.get(module_name)
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_backend():
+    """Carga BackEnd-Test.py como módulo para reutilizar sus helpers del API.
+
+    El nombre del script no es un identificador válido, así que se importa por
+    ruta; el módulo se cachea en `sys.modules` para cargarlo una sola vez.
+    """
+    return _load_script("backend_test", "BackEnd-Test.py")
+
+
+def load_frontend():
+    """Carga FrontEnd-Test.py como módulo (pasos y escenarios de Selenium), igual que `load_backend`."""
+    return _load_script("frontend_test", "FrontEnd-Test.py")
+
+
+def crear_usuario_api(full_name="Usuario de Prueba"):
+    """Registra un usuario por API e inicia sesión con él.
+
+    Devuelve un dict con `email`, `password`, `user_id` y `token`.
+    """
+    backend = load_backend()
+    email = f"{backend.generate_random_string(10)}@agrored.com"
+    user_id = backend.register_user(full_name, email, SEED_PASSWORD)
+    if user_id is None:
+        raise RuntimeError(f"No se pudo registrar el usuario de prueba {email}")
+    token = backend.get_token(email, SEED_PASSWORD)
+    if token is None:
+        raise RuntimeError(f"No se pudo iniciar sesión con {email}")
+    return {"email": email, "password": SEED_PASSWORD, "user_id": user_id, "token": token}
+
+
+def token_de(usuario):
+    """Token vigente de un usuario creado con `crear_usuario_api`, reutilizado entre escenarios.
+
+    El token que trae el dict se registra en la caché del proceso, así un
+    usuario creado en el proceso principal no vuelve a iniciar sesión en cada
+    proceso del pool mientras su token no esté por vencer.
+    """
+    backend = load_backend()
+    if usuario["email"] not in backend.token_cache:
+        backend.token_cache.put(usuario["email"], usuario["token"])
+    return backend.get_token(usuario["email"], usuario["password"])
+
+
+def eliminar_usuario_api(usuario):
+    """Elimina por API un usuario creado con `crear_usuario_api`."""
+    backend = load_backend()
+    token = token_de(usuario)
+    deleted = token is not None and backend.delete_user(token, usuario["user_id"])
+    backend.token_cache.invalidate(usuario["email"])
+    return deleted
+
+
+def sembrar_productos(token, nombres, **kwargs):
+    """Crea productos por API con el token indicado y devuelve {nombre: product_id}."""
+    backend = load_backend()
+    productos = {}
+    for nombre in nombres:
+        product_id = backend.create_product(token, nombre, **kwargs)
+        if product_id is None:
+            raise RuntimeError(f"No se pudo sembrar el producto '{nombre}'")
+        productos[nombre] = product_id
+    return productos
+
+
+def sembrar_catalogo(token, nombres, workers=16):
+    """Crea muchos productos en paralelo y devuelve {nombre: product_id} de los que se crearon."""
+    backend = load_backend()
+    ids = backend.run_parallel(lambda nombre: backend.create_product(token, nombre), nombres, workers)
+    return {nombre: product_id for nombre, product_id in zip(nombres, ids) if product_id}
+
+
+def eliminar_productos(token, productos, workers=1):
+    """Elimina por API los productos sembrados (limpieza al final del escenario)."""
+    backend = load_backend()
+    if workers > 1:
+        backend.run_parallel(lambda product_id: backend.delete_product(token, product_id),
+                             list(productos.values()), workers)
+        return
+    for product_id in productos.values():
+        backend.delete_product(token, product_id)
+
+
+def reiniciar_navegador(driver, origin):
+    """Deja un navegador reutilizado como recién abierto: pestaña nueva, sin cookies ni localStorage.
+
+    Los scripts de `inyectar_sesion` y el sessionStorage pertenecen a la
+    pestaña, así que se cierra la anterior en lugar de limpiarlos uno a uno.
+    """
+    anteriores = driver.window_handles
+    driver.switch_to.new_window("tab")
+    nueva = driver.current_window_handle
+    for handle in anteriores:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(nueva)
+    driver.delete_all_cookies()
+    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "local_storage"})
+
+
+def inyectar_sesion(driver, token):
+    """Deja el token en localStorage antes de que cargue la SPA.
+
+    El script se registra por CDP para cada documento nuevo, pero solo escribe
+    el token la primera vez por pestaña; así un cierre de sesión posterior no
+    vuelve a iniciarla al recargar.
+    """
+    script = (
+        "if (!sessionStorage.getItem('__agroredSeeded')) {"
+        f"  localStorage.setItem({json.dumps(SESSION_TOKEN_KEY)}, {json.dumps(token)});"
+        "  sessionStorage.setItem('__agroredSeeded', '1');"
+        "}"
+    )
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
@@ -0,0 +1,20 @@
+"""Punto de entrada de los procesos del pool de escenarios de FrontEnd-Test.py.
+
+`ProcessPoolExecutor` envía a cada proceso la función a ejecutar por nombre de
+módulo. FrontEnd-Test.py no se puede importar por nombre (se carga por ruta
+como `frontend_test` o corre como `__main__`), así que con spawn o forkserver
+los procesos no lo encontrarían; este módulo sí es importable y carga el
+script en cada proceso. Los procesos tampoco heredan la configuración del
+principal, por eso las URLs se aplican en `inicializar_proceso`.
+"""
+import fixtures
+
+
+def inicializar_proceso(frontend_url, base_url):
+    """`initializer` del pool: apunta el script del proceso al frontend y al backend indicados."""
+    fixtures.load_frontend().configurar_destinos(frontend_url, base_url)
+
+
+def ejecutar_escenario(*args):
+    """Ejecuta `ejecutar_escenario` de FrontEnd-Test.py en este proceso."""
+    return fixtures.load_frontend().ejecutar_escenario(*args)
@@ -0,0 +1,184 @@
+import argparse
+import os
+import sqlite3
+import time
+
+from results import read_results, PASSED, FAILED
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports", "history.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    results_path TEXT,
+    report_path TEXT,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_kind_id ON runs (kind, id);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL DEFAULT 0,
+    min_ms REAL,
+    mean_ms REAL,
+    p95_ms REAL,
+    max_ms REAL
+);
+CREATE INDEX IF NOT EXISTS metrics_run_id ON metrics (run_id);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    status TEXT NOT NULL,
+    step TEXT NOT NULL,
+    duration REAL,
+    details TEXT,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id);
+"""
+
+STATS = {"min": "min_ms", "mean": "mean_ms", "p95": "p95_ms", "max": "max_ms"}
+
+
+class HistoryStore:
+    """Histórico local (SQLite) de ejecuciones, con sus resultados y latencias.
+
+    Cada ejecución guarda las filas de latencia por endpoint (backend) o por
+    paso (frontend) con el formato de `RequestRecorder.summary()`.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, kind, metric_rows, results_path=None, report_path=None, started_at=None):
+        """Guarda una ejecución completa y devuelve su id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (kind, started_at, results_path, report_path) VALUES (?, ?, ?, ?)",
+                (kind, started_at or time.time(), results_path, report_path),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO metrics (run_id, name, count, errors, min_ms, mean_ms, p95_ms, max_ms)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, row["endpoint"], row["count"], row.get("errors", 0),
+                  row["min"], row["mean"], row["p95"], row["max"]) for row in metric_rows),
+            )
+            if results_path and os.path.exists(results_path):
+                counts = {PASSED: 0, FAILED: 0}
+
+                def rows():
+                    for result in read_results(results_path):
+                        if result.status in counts:
+                            counts[result.status] += 1
+                        yield (run_id, result.status, result.step, result.duration, result.details, result.timestamp)
+
+                self.conn.executemany(
+                    "INSERT INTO results (run_id, status, step, duration, details, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows(),
+                )
+                self.conn.execute("UPDATE runs SET passed = ?, failed = ? WHERE id = ?",
+                                  (counts[PASSED], counts[FAILED], run_id))
+        return run_id
+
+    def last_runs(self, kind, limit=10):
+        """Últimas `limit` ejecuciones de un tipo, de la más antigua a la más reciente."""
+        rows = self.conn.execute(
+            "SELECT id, started_at, passed, failed FROM runs WHERE kind = ? ORDER BY id DESC LIMIT ?",
+            (kind, limit),
+        ).fetchall()
+        return list(reversed(rows))
+
+    def get_run(self, run_id, kind=None):
+        """Una ejecución concreta con el formato de `last_runs`, o None si no existe (o es de otro tipo)."""
+        query = "SELECT id, started_at, passed, failed FROM runs WHERE id = ?"
+        if kind is not None:
+            return self.conn.execute(query + " AND kind = ?", (run_id, kind)).fetchone()
+        return self.conn.execute(query, (run_id,)).fetchone()
+
+    def find_run(self, kind=None, results_path=None):
+        """Última ejecución de `kind` o la que escribió `results_path`: (id, kind, results_path) o None."""
+        query = "SELECT id, kind, results_path FROM runs"
+        if results_path is not None:
+            return self.conn.execute(query + " WHERE results_path = ? ORDER BY id DESC LIMIT 1",
+                                     (results_path,)).fetchone()
+        return self.conn.execute(query + " WHERE kind = ? ORDER BY id DESC LIMIT 1", (kind,)).fetchone()
+
+    def run_metrics(self, run_id):
+        """Filas de latencia de una ejecución, con el formato de `RequestRecorder.summary()`."""
+        return [
+            {"endpoint": name, "count": count, "errors": errors, "min": min_ms, "mean": mean_ms,
+             "p95": p95_ms, "max": max_ms}
+            for name, count, errors, min_ms, mean_ms, p95_ms, max_ms in self.conn.execute(
+                "SELECT name, count, errors, min_ms, mean_ms, p95_ms, max_ms FROM metrics WHERE run_id = ? ORDER BY name",
+                (run_id,),
+            )
+        ]
+
+    def trend(self, kind, limit=10, stat="p95"):
+        """Devuelve (ejecuciones, {nombre: [valor por ejecución o None]}) para las últimas `limit`."""
+        runs = self.last_runs(kind, limit)
+        if not runs:
+            return runs, {}
+        column = STATS[stat]
+        run_ids = [run[0] for run in runs]
+        position = {run_id: i for i, run_id in enumerate(run_ids)}
+        placeholders = ",".join("?" * len(run_ids))
+        series = {}
+        for run_id, name, value in self.conn.execute(
+            f"SELECT run_id, name, {column} FROM metrics WHERE run_id IN ({placeholders})", run_ids
+        ):
+            series.setdefault(name, [None] * len(run_ids))[position[run_id]] = value
+        return runs, series
+
+
+def format_trend(runs, series, stat="p95"):
+    """Tabla de texto con la latencia (`stat`, ms) por ejecución y el cambio de la última
+    respecto a la media de las anteriores."""
+    if not runs:
+        return "Sin ejecuciones registradas."
+    name_width = max([len(name) for name in series] + [20])
+    header = f"{'Endpoint / paso':<{name_width}} " + " ".join(f"{'#' + str(run[0]):>9}" for run in runs) + "   Δ última"
+    lines = [f"Tendencia de latencia {stat} (ms) en las últimas {len(runs)} ejecuciones", header, "-" * len(header)]
+    for name in sorted(series):
+        values = series[name]
+        cells = " ".join(f"{v:>9.1f}" if v is not None else f"{'-':>9}" for v in values)
+        previous = [v for v in values[:-1] if v is not None]
+        delta = ""
+        if previous and values[-1] is not None:
+            baseline = sum(previous) / len(previous)
+            if baseline > 0:
+                change = (values[-1] - baseline) / baseline
+                delta = f"{change:+.0%}" + (" ⚠️" if change > 0.2 else "")
+        lines.append(f"{name:<{name_width}} {cells}   {delta}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tendencias de latencia entre ejecuciones de las pruebas AgroRed.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Ruta de la base SQLite del histórico.")
+    parser.add_argument("--kind", default="backend", help="Tipo de ejecución: backend, load, frontend...")
+    parser.add_argument("--last", type=int, default=10, help="Número de ejecuciones a comparar.")
+    parser.add_argument("--stat", choices=list(STATS), default="p95", help="Estadístico de latencia a mostrar.")
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+    try:
+        runs, series = store.trend(args.kind, args.last, args.stat)
+        print(format_trend(runs, series, args.stat))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import math
+import re
+import threading
+
+# Segmentos de ruta que son identificadores (ObjectId de Mongo, UUID, enteros)
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[0-9a-fA-F-]{8,}$|^\d+$")
+
+
+def endpoint_template(path):
+    """Normaliza una ruta reemplazando los identificadores por `{id}`.
+
+    `/api/v1/products/665f1c...` y `/api/v1/products/7a4a0c...` se agrupan así
+    en el mismo endpoint `/api/v1/products/{id}`.
+    """
+    path = path.split("?", 1)[0]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments)
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubetas logarítmicas.
+
+    Ocupa memoria constante sin importar cuántas muestras reciba; los
+    percentiles se estiman con un error relativo máximo de `GROWTH - 1`.
+    """
+
+    MIN_LATENCY = 0.0001  # 0.1 ms
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_LATENCY:
+            return 0
+        return int(math.log(seconds / self.MIN_LATENCY, self.GROWTH)) + 1
+
+    def _bucket_upper(self, index):
+        return self.MIN_LATENCY * self.GROWTH ** index
+
+    def add(self, seconds):
+        index = self._bucket(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct):
+        """Estimación del percentil `pct` (0-100) en segundos, acotada por min/max."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self._bucket_upper(index), self.min), self.max)
+        return self.max
+
+
+class EndpointStats:
+    """Latencias, códigos de estado y bytes de un endpoint (método + ruta)."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = {}
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, status, size, seconds):
+        self.latency.add(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+        self.bytes += size
+
+
+class RequestRecorder:
+    """Hook del `ApiClient` que acumula métricas por endpoint de cada llamada HTTP."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def __call__(self, method, path, status, size, seconds):
+        key = f"{method} {endpoint_template(path)}"
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.add(status, size, seconds)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def summary(self):
+        """Filas por endpoint: count, min, mean, p95 y max en milisegundos."""
+        rows = []
+        with self._lock:
+            for endpoint in sorted(self.endpoints):
+                stats = self.endpoints[endpoint]
+                latency = stats.latency
+                rows.append({
+                    "endpoint": endpoint,
+                    "count": latency.count,
+                    "errors": stats.errors,
+                    "bytes": stats.bytes,
+                    "min": (latency.min or 0.0) * 1000,
+                    "mean": latency.mean * 1000,
+                    "p95": latency.percentile(95) * 1000,
+                    "max": (latency.max or 0.0) * 1000,
+                })
+        return rows
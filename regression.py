@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+
+from history import HistoryStore, DEFAULT_DB, STATS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_TOLERANCE = 0.10
+
+# Códigos de salida de los scripts de prueba
+EXIT_OK = 0
+EXIT_FAILED = 1      # hubo resultados FAILED en la ejecución
+EXIT_REGRESSION = 2  # alguna latencia superó su umbral más la tolerancia
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    """Lee el archivo de umbrales: {"tolerance": 0.1, "kinds": {tipo: {nombre: {stat: ms}}}}."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(baseline, path=DEFAULT_BASELINE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(rows, thresholds, tolerance=DEFAULT_TOLERANCE):
+    """Compara las filas de una ejecución con los umbrales de su tipo.
+
+    Cada umbral puede llevar su propia `tolerance`. Devuelve una entrada por
+    umbral con `status` "ok", "regression" o "missing" (el endpoint o paso no
+    aparece en la ejecución); `change` es el cambio relativo contra el umbral.
+    """
+    by_name = {row["endpoint"]: row for row in rows}
+    checks = []
+    for name in sorted(thresholds):
+        limits = dict(thresholds[name])
+        metric_tolerance = limits.pop("tolerance", tolerance)
+        row = by_name.get(name)
+        for stat, baseline in sorted(limits.items()):
+            check = {"name": name, "stat": stat, "baseline": baseline,
+                     "limit": baseline * (1 + metric_tolerance), "tolerance": metric_tolerance}
+            value = row.get(stat) if row else None
+            if value is None:
+                check.update(value=None, change=None, status="missing")
+            else:
+                check.update(value=value, change=(value - baseline) / baseline if baseline else None,
+                             status="regression" if value > check["limit"] else "ok")
+            checks.append(check)
+    return checks
+
+
+def _find_run(store, kind, run_id):
+    """La ejecución `run_id` de `kind`, o la última de ese tipo si no se indica."""
+    if run_id is not None:
+        return store.get_run(run_id, kind)
+    runs = store.last_runs(kind, 1)
+    return runs[0] if runs else None
+
+
+def gate(kind, baseline_path=DEFAULT_BASELINE, tolerance=None, diff_path=None, db=DEFAULT_DB, run_id=None):
+    """Evalúa una ejecución de `kind` del histórico y devuelve el código de salida.
+
+    Los scripts pasan el `run_id` que acaban de guardar, para no evaluar la
+    ejecución de otro job que comparta el histórico; sin él se toma la última
+    de ese tipo. Sin archivo de umbrales solo se comprueban los resultados
+    FAILED. Con `diff_path` se escribe el detalle de la comparación en JSON.
+    """
+    store = HistoryStore(db)
+    try:
+        run = _find_run(store, kind, run_id)
+        if run is None:
+            print(f"❌ No hay ejecuciones '{kind}' en el histórico" if run_id is None
+                  else f"❌ No existe la ejecución '{kind}' #{run_id} en el histórico")
+            return EXIT_FAILED
+        run_id, _, passed, failed = run
+        rows = store.run_metrics(run_id)
+    finally:
+        store.close()
+    checks = []
+    if baseline_path and os.path.exists(baseline_path):
+        baseline = load_baseline(baseline_path)
+        if tolerance is None:
+            tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE)
+        checks = compare(rows, baseline.get("kinds", {}).get(kind, {}), tolerance)
+    elif baseline_path:
+        print(f"⚠️ No existe el archivo de umbrales {baseline_path}; solo se revisan los fallos")
+    regressions = [check for check in checks if check["status"] == "regression"]
+    for check in checks:
+        if check["status"] == "missing":
+            print(f"   ⚠️ {check['name']} ({check['stat']}): sin datos en la ejecución #{run_id}")
+        else:
+            icon = "❌" if check["status"] == "regression" else "✅"
+            print(f"   {icon} {check['name']} ({check['stat']}): {check['value']:.1f} ms "
+                  f"(umbral {check['baseline']:.1f} ms, límite {check['limit']:.1f} ms)")
+    exit_code = EXIT_FAILED if failed else EXIT_REGRESSION if regressions else EXIT_OK
+    if diff_path:
+        with open(diff_path, "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, "run_id": run_id, "passed": passed, "failed": failed,
+                       "tolerance": tolerance, "exit_code": exit_code, "regressions": len(regressions),
+                       "checks": checks}, f, ensure_ascii=False, indent=2)
+    if exit_code == EXIT_OK:
+        print(f"✅ Ejecución '{kind}' #{run_id} dentro de los umbrales")
+    else:
+        print(f"❌ Ejecución '{kind}' #{run_id}: {failed} resultados fallidos, {len(regressions)} regresiones de latencia")
+    return exit_code
+
+
+def update_baseline(kind, baseline_path=DEFAULT_BASELINE, stats=("p95",), db=DEFAULT_DB, run_id=None):
+    """Fija como umbrales de `kind` los valores de la ejecución `run_id` o de la última (conserva los demás tipos)."""
+    store = HistoryStore(db)
+    try:
+        run = _find_run(store, kind, run_id)
+        if run is None:
+            raise RuntimeError(f"No hay ejecuciones '{kind}' en el histórico" if run_id is None
+                               else f"No existe la ejecución '{kind}' #{run_id} en el histórico")
+        run_id = run[0]
+        rows = store.run_metrics(run_id)
+    finally:
+        store.close()
+    baseline = load_baseline(baseline_path) if os.path.exists(baseline_path) else {"tolerance": DEFAULT_TOLERANCE}
+    thresholds = baseline.setdefault("kinds", {}).setdefault(kind, {})
+    for row in rows:
+        limits = thresholds.setdefault(row["endpoint"], {})
+        for stat in stats:
+            if row[stat] is not None:
+                limits[stat] = round(row[stat], 1)
+    save_baseline(baseline, baseline_path)
+    print(f"🗂️ Umbrales de '{kind}' actualizados desde la ejecución #{run_id} en {baseline_path}")
+    return baseline
+
+
+def add_arguments(parser):
+    """Opciones comunes de los scripts para compararse con los umbrales al terminar."""
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Archivo de umbrales de latencia por endpoint o paso.")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Margen relativo sobre cada umbral antes de considerarlo regresión (por defecto el del archivo).")
+    parser.add_argument("--diff-out", default=None, help="Escribe la comparación con los umbrales en este JSON.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara una ejecución del histórico con los umbrales de latencia.")
+    parser.add_argument("--kind", default="backend", help="Tipo de ejecución: backend, load, frontend...")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Ruta de la base SQLite del histórico.")
+    parser.add_argument("--run-id", type=int, default=None, help="Ejecución a evaluar (por defecto la última de --kind).")
+    parser.add_argument("--update", action="store_true", help="Toma la ejecución como nuevos umbrales.")
+    parser.add_argument("--stat", nargs="+", choices=list(STATS), default=["p95"], help="Estadísticos a fijar con --update.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.update:
+        update_baseline(args.kind, args.baseline, args.stat, args.db, args.run_id)
+        return EXIT_OK
+    return gate(args.kind, args.baseline, args.tolerance, args.diff_out, args.db, args.run_id)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
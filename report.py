@@ -0,0 +1,448 @@
+import bisect
+import html
+import os
+import re
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from metrics import LatencyHistogram
+from results import PASSED, FAILED, WARNING, INFO
+
+# Límites que acotan el tamaño del reporte sin importar cuánto duró la ejecución
+MAX_FAILURES = 200   # fallos listados uno por uno (el resto solo se cuenta)
+MAX_NOTES = 200      # líneas de resumen elegidas con `include`
+MAX_GROUPS = 40      # pasos distintos en la tabla; el resto se agrupa en "Otros pasos"
+MAX_BUCKETS = 60     # intervalos de la serie temporal
+MAX_DETAIL = 500     # caracteres de detalle por línea listada
+OTHER_GROUP = "Otros pasos"
+
+# Cubetas fijas del histograma de duraciones, en ms
+HISTOGRAM_EDGES = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+HISTOGRAM_LABELS = tuple(
+    [f"<{HISTOGRAM_EDGES[0]}"]
+    + [f"{low}-{high}" for low, high in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:])]
+    + [f">{HISTOGRAM_EDGES[-1]}"]
+)
+
+# Partes variables de los nombres de paso (emails e ids) que no deben abrir un grupo nuevo cada vez
+_EMAIL = re.compile(r"[^\s'\"()@]+@[^\s'\"()]+")
+_ID = re.compile(r"\b(?=[0-9a-fA-F-]*\d)[0-9a-fA-F-]{8,}\b")
+
+
+def step_group(step):
+    """Nombre de grupo de un paso: `Login de usuario 'x@y.com'` -> `Login de usuario '{email}'`."""
+    return _ID.sub("{id}", _EMAIL.sub("{email}", step))
+
+
+def _shorten(text, limit=MAX_DETAIL):
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+class _Timeline:
+    """Serie temporal de resultados en como mucho `max_buckets` intervalos.
+
+    El ancho de intervalo empieza en 1 s y se duplica (fusionando intervalos
+    vecinos) cada vez que la ejecución no cabe, así que se construye en una
+    sola pasada sin conocer la duración de antemano.
+    """
+
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self.width = 1.0
+        self.origin = None
+        self.buckets = []
+
+    @staticmethod
+    def _empty():
+        return [0, 0, LatencyHistogram()]
+
+    def _compact(self):
+        merged = []
+        for i in range(0, len(self.buckets), 2):
+            bucket = self.buckets[i]
+            if i + 1 < len(self.buckets):
+                other = self.buckets[i + 1]
+                bucket[0] += other[0]
+                bucket[1] += other[1]
+                bucket[2].merge(other[2])
+            merged.append(bucket)
+        self.buckets = merged
+        self.width *= 2
+
+    def add(self, timestamp, failed, duration):
+        if self.origin is None:
+            self.origin = timestamp
+        if timestamp < self.origin:
+            # Resultados anteriores al primero leído (p. ej. los de escenarios combinados al final)
+            shift = int((self.origin - timestamp) // self.width) + 1
+            self.buckets[:0] = [self._empty() for _ in range(shift)]
+            self.origin -= shift * self.width
+        index = int((timestamp - self.origin) // self.width)
+        while index >= self.max_buckets or len(self.buckets) > self.max_buckets:
+            self._compact()
+            index = int((timestamp - self.origin) // self.width)
+        while len(self.buckets) <= index:
+            self.buckets.append(self._empty())
+        bucket = self.buckets[index]
+        bucket[0] += 1
+        bucket[1] += failed
+        if duration is not None:
+            bucket[2].add(duration)
+
+    def points(self):
+        """(segundo de inicio, resultados, fallos, p95 en ms o None) por intervalo."""
+        return [(i * self.width, count, failed, histogram.percentile(95) * 1000 if histogram.count else None)
+                for i, (count, failed, histogram) in enumerate(self.buckets)]
+
+
+class RunSummary:
+    """Agregado de los resultados de una ejecución, construido en una sola pasada.
+
+    Guarda conteos por estado, duraciones por grupo de paso, el histograma de
+    duraciones, la serie temporal, los primeros `max_failures` fallos y las
+    primeras `max_notes` líneas que cumplan `include`. La memoria no depende
+    del número de resultados.
+    """
+
+    def __init__(self, include=None, max_failures=MAX_FAILURES, max_notes=MAX_NOTES, max_groups=MAX_GROUPS):
+        self.include = include
+        self.max_failures = max_failures
+        self.max_notes = max_notes
+        self.max_groups = max_groups
+        self.counts = {PASSED: 0, FAILED: 0, WARNING: 0, INFO: 0}
+        self.groups = {}
+        self.histogram = [0] * len(HISTOGRAM_LABELS)
+        self.timeline = _Timeline()
+        self.failures = []
+        self.notes = []
+        self.omitted_failures = 0
+        self.omitted_notes = 0
+        self.first = None
+        self.last = None
+
+    def add(self, result):
+        self.counts[result.status] = self.counts.get(result.status, 0) + 1
+        if result.timestamp is not None:
+            self.first = result.timestamp if self.first is None else min(self.first, result.timestamp)
+            self.last = result.timestamp if self.last is None else max(self.last, result.timestamp)
+        if result.failed:
+            if len(self.failures) < self.max_failures:
+                self.failures.append(result)
+            else:
+                self.omitted_failures += 1
+        elif self.include is not None and self.include(result):
+            if len(self.notes) < self.max_notes:
+                self.notes.append(result)
+            else:
+                self.omitted_notes += 1
+        if result.status == INFO:
+            return
+        group = step_group(result.step)
+        if group not in self.groups and len(self.groups) >= self.max_groups:
+            group = OTHER_GROUP
+        stats = self.groups.get(group)
+        if stats is None:
+            stats = self.groups[group] = {"count": 0, "failed": 0, "latency": LatencyHistogram()}
+        stats["count"] += 1
+        stats["failed"] += result.failed
+        if result.duration is not None:
+            stats["latency"].add(result.duration)
+            self.histogram[bisect.bisect_right(HISTOGRAM_EDGES, result.duration * 1000)] += 1
+        if result.timestamp is not None:
+            self.timeline.add(result.timestamp, result.failed, result.duration)
+
+    def consume(self, results):
+        for result in results:
+            self.add(result)
+        return self
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def duration(self):
+        return (self.last - self.first) if self.first is not None else 0.0
+
+    def group_rows(self):
+        """Filas por grupo de paso con el formato de `RequestRecorder.summary()` (ms; None sin duraciones)."""
+        rows = []
+        for name in sorted(self.groups, key=lambda name: (name == OTHER_GROUP, name)):
+            stats = self.groups[name]
+            latency = stats["latency"]
+            timed = latency.count > 0
+            rows.append({
+                "endpoint": name,
+                "count": stats["count"],
+                "errors": stats["failed"],
+                "min": latency.min * 1000 if timed else None,
+                "mean": latency.mean * 1000 if timed else None,
+                "p95": latency.percentile(95) * 1000 if timed else None,
+                "max": latency.max * 1000 if timed else None,
+            })
+        return rows
+
+    def overview_rows(self):
+        rows = [["Resultados", self.total]]
+        rows += [[status, self.counts.get(status, 0)] for status in (PASSED, FAILED, WARNING, INFO)]
+        rows.append(["Duración cubierta", f"{self.duration:.1f} s"])
+        if self.omitted_failures:
+            rows.append(["Fallos no listados", self.omitted_failures])
+        return rows
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+LATENCY_HEADER = ["Endpoint / paso", "Count", "Errores", "Min (ms)", "Media (ms)", "p95 (ms)", "Max (ms)"]
+
+
+def _latency_cells(row):
+    return [row["count"], row["errors"], _ms(row["min"]), _ms(row["mean"]), _ms(row["p95"]), _ms(row["max"])]
+
+
+# --- PDF ---
+
+def _pdf_latency_table(rows, styles):
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
+    data = [LATENCY_HEADER] + [[Paragraph(escape(row["endpoint"]), styles['Normal'])] + _latency_cells(row)
+                               for row in rows]
+    table = Table(data, colWidths=[180, 45, 50, 55, 65, 55, 55], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ]))
+    return table
+
+
+def _pdf_key_value_table(rows):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+    table = Table([[str(label), str(value)] for label, value in rows], colWidths=[280, 140])
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ]))
+    return table
+
+
+def _pdf_histogram_chart(summary):
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.shapes import Drawing
+    drawing = Drawing(460, 170)
+    chart = VerticalBarChart()
+    chart.x, chart.y, chart.width, chart.height = 40, 30, 400, 120
+    chart.data = [summary.histogram]
+    chart.categoryAxis.categoryNames = list(HISTOGRAM_LABELS)
+    chart.categoryAxis.labels.fontSize = 7
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.labels.fontSize = 7
+    drawing.add(chart)
+    return drawing
+
+
+def _pdf_timeline_chart(points, index, label):
+    """Línea de la columna `index` de `_Timeline.points()` contra el segundo de inicio del intervalo."""
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.shapes import Drawing, String
+    series = [(point[0], point[index]) for point in points if point[index] is not None]
+    drawing = Drawing(460, 170)
+    drawing.add(String(40, 155, label, fontSize=8))
+    if len(series) < 2:
+        return drawing
+    chart = LinePlot()
+    chart.x, chart.y, chart.width, chart.height = 40, 30, 400, 115
+    chart.data = [series]
+    chart.xValueAxis.labels.fontSize = 7
+    chart.yValueAxis.labels.fontSize = 7
+    chart.yValueAxis.valueMin = 0
+    drawing.add(chart)
+    return drawing
+
+
+def _pdf_result_line(result, styles):
+    from reportlab.platypus import Paragraph
+    text = escape(_shorten(result.text()))
+    if result.status == FAILED:
+        return Paragraph(f"<font color='red'>{text}</font>", styles['Code'])
+    if result.status == PASSED:
+        return Paragraph(f"<font color='green'>{text}</font>", styles['Normal'])
+    return Paragraph(text, styles['Normal'])
+
+
+def write_pdf(summary, filename, title, latency_rows=None, tables=(), logo_path=None):
+    """Escribe el reporte PDF de `summary`; su tamaño está acotado por los límites del resumen."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+
+    doc = SimpleDocTemplate(filename, pagesize=letter, pageCompression=1)
+    styles = getSampleStyleSheet()
+    story = []
+    if logo_path and os.path.exists(logo_path):
+        story.append(Image(logo_path, width=128, height=60))
+        story.append(Spacer(1, 12))
+    story.append(Paragraph(escape(title), styles['h1']))
+    story.append(Paragraph(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Resumen", styles['h2']))
+    story.append(_pdf_key_value_table(summary.overview_rows()))
+    story.append(Spacer(1, 12))
+    if latency_rows:
+        story.append(Paragraph("Latencia por endpoint", styles['h2']))
+        story.append(_pdf_latency_table(latency_rows, styles))
+        story.append(Spacer(1, 12))
+    for table_title, rows in tables:
+        story.append(Paragraph(escape(table_title), styles['h2']))
+        story.append(_pdf_key_value_table(rows))
+        story.append(Spacer(1, 12))
+    if summary.groups:
+        story.append(Paragraph("Resultados por paso", styles['h2']))
+        story.append(_pdf_latency_table(summary.group_rows(), styles))
+        story.append(Spacer(1, 12))
+    if any(summary.histogram):
+        story.append(Paragraph("Distribución de duraciones (ms)", styles['h2']))
+        story.append(_pdf_histogram_chart(summary))
+    points = summary.timeline.points()
+    if len(points) > 1:
+        story.append(Paragraph(f"Serie temporal (intervalos de {summary.timeline.width:g} s)", styles['h2']))
+        story.append(_pdf_timeline_chart(points, 3, "p95 de duración por intervalo (ms)"))
+        story.append(_pdf_timeline_chart(points, 1, "Resultados por intervalo"))
+        if summary.counts.get(FAILED):
+            story.append(_pdf_timeline_chart(points, 2, "Fallos por intervalo"))
+    if summary.notes:
+        story.append(Paragraph("Notas de la ejecución", styles['h2']))
+        for result in summary.notes:
+            story.append(_pdf_result_line(result, styles))
+            story.append(Spacer(1, 4))
+        if summary.omitted_notes:
+            story.append(Paragraph(f"… y {summary.omitted_notes} líneas más (ver el JSONL)", styles['Italic']))
+    story.append(Paragraph("Fallos", styles['h2']))
+    if not summary.failures:
+        story.append(Paragraph("<font color='green'>Sin fallos.</font>", styles['Normal']))
+    for result in summary.failures:
+        story.append(_pdf_result_line(result, styles))
+        story.append(Spacer(1, 4))
+    if summary.omitted_failures:
+        story.append(Paragraph(f"… y {summary.omitted_failures} fallos más (ver el JSONL)", styles['Italic']))
+    doc.build(story)
+    return filename
+
+
+# --- HTML ---
+
+_HTML_STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 1.5em; font-size: 0.85em; }
+th, td { border: 1px solid #aaa; padding: 0.25em 0.6em; }
+th { background: #ddd; }
+td.n { text-align: right; }
+.FAILED { color: #b00; } .PASSED { color: #070; } .WARNING { color: #a60; }
+li { margin-bottom: 0.3em; }
+svg text { font-size: 10px; }
+"""
+
+
+def _html_table(header, rows):
+    cells = "".join(f"<th>{html.escape(str(cell))}</th>" for cell in header) if header else ""
+    lines = [f"<tr>{cells}</tr>"] if header else []
+    for row in rows:
+        lines.append("<tr>" + "".join(
+            f"<td{' class=n' if i else ''}>{html.escape(str(cell))}</td>" for i, cell in enumerate(row)) + "</tr>")
+    return "<table>" + "".join(lines) + "</table>"
+
+
+def _svg_bars(values, labels, width=600, height=180):
+    top = max(values) or 1
+    step = (width - 40) / len(values)
+    parts = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">']
+    for i, (value, label) in enumerate(zip(values, labels)):
+        bar = (height - 40) * value / top
+        x = 30 + i * step
+        parts.append(f'<rect x="{x + 2:.1f}" y="{height - 25 - bar:.1f}" width="{step - 4:.1f}" height="{bar:.1f}" '
+                     f'fill="#4a7"><title>{html.escape(label)}: {value}</title></rect>')
+        parts.append(f'<text x="{x + step / 2:.1f}" y="{height - 10}" text-anchor="middle">{html.escape(label)}</text>')
+        parts.append(f'<text x="{x + step / 2:.1f}" y="{height - 28 - bar:.1f}" text-anchor="middle">{value}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _svg_line(series, label, width=600, height=180):
+    if len(series) < 2:
+        return ""
+    max_x = series[-1][0] or 1
+    max_y = max(y for _, y in series) or 1
+    coords = " ".join(f"{40 + (width - 60) * x / max_x:.1f},{height - 25 - (height - 45) * y / max_y:.1f}"
+                      for x, y in series)
+    return (f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">'
+            f'<text x="40" y="12">{html.escape(label)} (máx. {max_y:.1f})</text>'
+            f'<line x1="40" y1="{height - 25}" x2="{width - 20}" y2="{height - 25}" stroke="#888"/>'
+            f'<text x="40" y="{height - 10}">0 s</text>'
+            f'<text x="{width - 20}" y="{height - 10}" text-anchor="end">{max_x:g} s</text>'
+            f'<polyline points="{coords}" fill="none" stroke="#37a" stroke-width="1.5"/></svg>')
+
+
+def _html_results(results):
+    return "<ul>" + "".join(
+        f'<li class="{html.escape(result.status)}">{html.escape(_shorten(result.text()))}</li>' for result in results
+    ) + "</ul>"
+
+
+def write_html(summary, filename, title, latency_rows=None, tables=()):
+    """Escribe el mismo reporte en un HTML autocontenido (gráficos SVG en línea, sin dependencias)."""
+    body = [f"<h1>{html.escape(title)}</h1>",
+            f"<p>Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>",
+            "<h2>Resumen</h2>", _html_table(None, summary.overview_rows())]
+    if latency_rows:
+        body += ["<h2>Latencia por endpoint</h2>",
+                 _html_table(LATENCY_HEADER, [[row["endpoint"]] + _latency_cells(row) for row in latency_rows])]
+    for table_title, rows in tables:
+        body += [f"<h2>{html.escape(table_title)}</h2>", _html_table(None, rows)]
+    if summary.groups:
+        body += ["<h2>Resultados por paso</h2>",
+                 _html_table(LATENCY_HEADER, [[row["endpoint"]] + _latency_cells(row) for row in summary.group_rows()])]
+    if any(summary.histogram):
+        body += ["<h2>Distribución de duraciones (ms)</h2>", _svg_bars(summary.histogram, HISTOGRAM_LABELS)]
+    points = summary.timeline.points()
+    if len(points) > 1:
+        body.append(f"<h2>Serie temporal (intervalos de {summary.timeline.width:g} s)</h2>")
+        body.append(_svg_line([(start, p95) for start, _, _, p95 in points if p95 is not None],
+                              "p95 de duración por intervalo (ms)"))
+        body.append(_svg_line([(start, count) for start, count, _, _ in points], "Resultados por intervalo"))
+        if summary.counts.get(FAILED):
+            body.append(_svg_line([(start, failed) for start, _, failed, _ in points], "Fallos por intervalo"))
+    if summary.notes:
+        body += ["<h2>Notas de la ejecución</h2>", _html_results(summary.notes)]
+        if summary.omitted_notes:
+            body.append(f"<p><em>… y {summary.omitted_notes} líneas más (ver el JSONL)</em></p>")
+    body.append("<h2>Fallos</h2>")
+    body.append(_html_results(summary.failures) if summary.failures else '<p class="PASSED">Sin fallos.</p>')
+    if summary.omitted_failures:
+        body.append(f"<p><em>… y {summary.omitted_failures} fallos más (ver el JSONL)</em></p>")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                f"<style>{_HTML_STYLE}</style></head><body>{''.join(body)}</body></html>\n")
+    return filename
+
+
+def build_report(results, filename, title, latency_rows=None, tables=(), include=None,
+                 max_failures=MAX_FAILURES, max_notes=MAX_NOTES, html_output=True, logo_path=None):
+    """Resume `results` en una pasada y escribe el PDF en `filename` (y el HTML al lado).
+
+    `include` elige qué resultados que no fallaron se listan como notas;
+    `tables` son tablas extra (título, [[etiqueta, valor], ...]). Devuelve
+    (ruta del PDF, ruta del HTML o None).
+    """
+    summary = RunSummary(include, max_failures, max_notes).consume(results)
+    write_pdf(summary, filename, title, latency_rows, tables, logo_path)
+    html_path = None
+    if html_output:
+        html_path = write_html(summary, os.path.splitext(filename)[0] + ".html", title, latency_rows, tables)
+    return filename, html_path
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+WARNING = "WARNING"
+INFO = "INFO"
+
+STATUS_ICONS = {PASSED: "✅", FAILED: "❌", WARNING: "⚠️", INFO: ""}
+
+
+class ResultRecord:
+    """Resultado de un paso de prueba: estado, paso, duración (s) y detalles."""
+
+    __slots__ = ("status", "step", "duration", "details", "timestamp")
+
+    def __init__(self, status, step, duration=None, details="", timestamp=None):
+        self.status = status
+        self.step = step
+        self.duration = duration
+        self.details = details
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def failed(self):
+        return self.status == FAILED
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def text(self):
+        """Línea legible del resultado, como la muestran la consola y el PDF."""
+        if self.status == INFO:
+            line = self.step
+        else:
+            line = f"{STATUS_ICONS[self.status]} {self.step}: {self.status}"
+        if self.duration is not None:
+            line += f" ({self.duration * 1000:.0f} ms)"
+        if self.details:
+            line += f". {self.details}"
+        return line
+
+
+class ResultSink:
+    """Escribe cada resultado como una línea JSON en cuanto se produce.
+
+    Nada se acumula en memoria: los reportes se construyen después leyendo el
+    archivo con `read_results`. Sin `path` los resultados se descartan (útil
+    cuando los helpers se usan fuera de una ejecución, p. ej. como fixtures).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self.counts = {PASSED: 0, FAILED: 0, WARNING: 0, INFO: 0}
+
+    def emit(self, status, step, details="", duration=None):
+        record = ResultRecord(status, step, duration, details)
+        self.write(record)
+        return record
+
+    def write(self, record):
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self.counts[record.status] += 1
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def open_run_sink(reports_dir, prefix):
+    """Abre el JSONL de una ejecución nueva: `<reports_dir>/<prefix>_<fecha-hora>.jsonl`."""
+    os.makedirs(reports_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return ResultSink(os.path.join(reports_dir, f"{prefix}_{stamp}.jsonl"))
+
+
+def read_results(path):
+    """Itera los resultados de un JSONL sin cargar el archivo completo en memoria."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield ResultRecord.from_dict(json.loads(line))
@@ -0,0 +1,6 @@
+import os
+
+# Destinos de las pruebas. Precedencia: flags de la línea de comandos > variables de entorno > estos valores.
+# Este módulo solo usa la biblioteca estándar: la CLI lo importa aunque el comando no necesite `requests`.
+BASE_URL = os.environ.get("AGRORED_BASE_URL", "http://127.0.0.1:8000")  # Asumiendo que el main.py de FastAPI corre en 8000
+FRONTEND_URL = os.environ.get("AGRORED_FRONTEND_URL", "http://localhost:5173")  # Servidor de desarrollo de Vite
@@ -0,0 +1,375 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/v1"
+TOKEN_TTL = 30 * 60  # segundos, como el ACCESS_TOKEN_EXPIRE_MINUTES por defecto de FastAPI
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def make_token(subject, ttl=TOKEN_TTL):
+    """Genera un JWT sin firma válida (solo header y payload con `sub`/`exp`), suficiente para el stub."""
+    return f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64({'sub': subject, 'exp': int(time.time()) + ttl})}.stub"
+
+
+def hash_password(password, rounds):
+    """Hash PBKDF2 con `rounds` iteraciones: simula el coste de CPU de bcrypt en user_service."""
+    if not rounds:
+        return password
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), b"agrored-stub", rounds).hex()
+
+
+class StubState:
+    """Datos en memoria del stub: usuarios, productos y tokens emitidos."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}
+        self.users_by_email = {}
+        self.products = {}
+        self.orders = {}
+        self.tokens = {}
+        # Validadores HTTP del catálogo y de cada producto: (versión, instante de la última modificación)
+        self.catalog_version = (0, time.time())
+        self.product_versions = {}
+
+    def touch_product(self, product_id, deleted=False):
+        """Registra un cambio en un producto (llamar con `lock` tomado)."""
+        version = (self.catalog_version[0] + 1, time.time())
+        self.catalog_version = version
+        if deleted:
+            self.product_versions.pop(product_id, None)
+        else:
+            self.product_versions[product_id] = version
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Implementa los endpoints de user_service/product_service (y pedidos) que usan los scripts de prueba."""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo salen en un solo write (se vacía al final de cada petición)
+    # y sin Nagle, para que el stub no añada ~40 ms de delayed ACK por respuesta
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- utilidades ---
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send(self, status, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_validated(self, body, tag, modified):
+        """Responde 200 con `ETag`/`Last-Modified`, o 304 sin cuerpo si el cliente ya tiene esa versión."""
+        headers = {"ETag": f'"{tag}"', "Last-Modified": formatdate(modified, usegmt=True)}
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Si llega If-None-Match, If-Modified-Since se ignora (RFC 9110)
+            if if_none_match.strip() == "*" or headers["ETag"] in (t.strip() for t in if_none_match.split(",")):
+                return self._send(304, headers=headers)
+        elif self.headers.get("If-Modified-Since"):
+            try:
+                since = parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and int(modified) <= since:
+                return self._send(304, headers=headers)
+        self._send(200, body, headers)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+        return json.loads(raw) if raw else {}
+
+    def _current_user(self):
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return None
+        token = auth[len("Bearer "):]
+        with self.state.lock:
+            user_id, expires = self.state.tokens.get(token, (None, 0))
+            if user_id is None or expires < time.time():
+                return None
+            return self.state.users.get(user_id)
+
+    def _route(self):
+        """Devuelve (colección, id) para rutas `/api/v1/<colección>[/<id>]`."""
+        path = urlsplit(self.path).path
+        if not path.startswith(API_PREFIX + "/"):
+            return None, None
+        parts = path[len(API_PREFIX) + 1:].strip("/").split("/")
+        return parts[0], (parts[1] if len(parts) > 1 else None)
+
+    def _dispatch(self, method):
+        config = self.server.config
+        if config["latency"]:
+            time.sleep(config["latency"] + random.uniform(0, config["jitter"]))
+        if config["error_rate"] and random.random() < config["error_rate"]:
+            self._read_body()
+            return self._send(500, {"detail": "Error inyectado por el stub"})
+        collection, item_id = self._route()
+        handler = getattr(self, f"_{method}_{collection}", None)
+        if handler is None:
+            return self._send(404, {"detail": "Not Found"})
+        handler(item_id)
+
+    def do_GET(self):
+        self._dispatch("get")
+
+    def do_POST(self):
+        self._dispatch("post")
+
+    def do_PUT(self):
+        self._dispatch("put")
+
+    def do_DELETE(self):
+        self._dispatch("delete")
+
+    # --- /users ---
+
+    def _post_users(self, item_id):
+        data = self._read_body()
+        if item_id is not None or not all(data.get(k) for k in ("email", "password", "full_name")):
+            return self._send(422, {"detail": "Datos de usuario inválidos"})
+        # El hash se calcula fuera del lock, como en el servicio real
+        password = hash_password(data["password"], self.server.config["hash_rounds"])
+        with self.state.lock:
+            if data["email"] in self.state.users_by_email:
+                return self._send(400, {"detail": "El email ya está registrado"})
+            user = {"_id": uuid.uuid4().hex[:24], "email": data["email"], "full_name": data["full_name"],
+                    "password": password, "is_active": True}
+            self.state.users[user["_id"]] = user
+            self.state.users_by_email[user["email"]] = user
+        self._send(201, {k: v for k, v in user.items() if k != "password"})
+
+    def _get_users(self, item_id):
+        if self._current_user() is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            if item_id is None:
+                users = [{k: v for k, v in u.items() if k != "password"} for u in self.state.users.values()]
+                return self._send(200, users)
+            user = self.state.users.get(item_id)
+        if user is None:
+            return self._send(404, {"detail": "Usuario no encontrado"})
+        self._send(200, {k: v for k, v in user.items() if k != "password"})
+
+    def _put_users(self, item_id):
+        current = self._current_user()
+        data = self._read_body()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            user = self.state.users.get(item_id)
+            if user is None:
+                return self._send(404, {"detail": "Usuario no encontrado"})
+            if current["_id"] != item_id:
+                return self._send(403, {"detail": "No autorizado"})
+            del self.state.users_by_email[user["email"]]
+            user.update({k: v for k, v in data.items() if k in ("full_name", "email")})
+            if data.get("password"):
+                user["password"] = hash_password(data["password"], self.server.config["hash_rounds"])
+            self.state.users_by_email[user["email"]] = user
+        self._send(200, {k: v for k, v in user.items() if k != "password"})
+
+    def _delete_users(self, item_id):
+        current = self._current_user()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            if item_id not in self.state.users:
+                return self._send(404, {"detail": "Usuario no encontrado"})
+            if current["_id"] != item_id:
+                return self._send(403, {"detail": "No autorizado"})
+            user = self.state.users.pop(item_id)
+            del self.state.users_by_email[user["email"]]
+        self._send(204)
+
+    # --- /auth/login ---
+
+    def _post_auth(self, item_id):
+        data = self._read_body()
+        if item_id != "login":
+            return self._send(404, {"detail": "Not Found"})
+        # La verificación del hash (lo costoso del login) no retiene el lock
+        password = hash_password(data.get("password") or "", self.server.config["hash_rounds"])
+        with self.state.lock:
+            user = self.state.users_by_email.get(data.get("username"))
+            if user is None or user["password"] != password:
+                return self._send(401, {"detail": "Email o contraseña incorrectos"})
+            token = make_token(user["email"], self.server.config["token_ttl"])
+            self.state.tokens[token] = (user["_id"], time.time() + self.server.config["token_ttl"])
+        self._send(200, {"access_token": token, "token_type": "bearer"})
+
+    # --- /products ---
+
+    def _post_products(self, item_id):
+        current = self._current_user()
+        data = self._read_body()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        if item_id is not None or not data.get("name"):
+            return self._send(422, {"detail": "Datos de producto inválidos"})
+        product = dict(data, _id=uuid.uuid4().hex[:24], owner_id=current["_id"])
+        with self.state.lock:
+            self.state.products[product["_id"]] = product
+            self.state.touch_product(product["_id"])
+        self._send(201, product)
+
+    def _get_products(self, item_id):
+        with self.state.lock:
+            if item_id is None:
+                body = list(self.state.products.values())
+                version, modified = self.state.catalog_version
+                tag = f"catalog-{version}"
+            else:
+                body = self.state.products.get(item_id)
+                version, modified = self.state.product_versions.get(item_id, (0, 0))
+                tag = f"{item_id}-{version}"
+        if body is None:
+            return self._send(404, {"detail": "Producto no encontrado"})
+        self._send_validated(body, tag, modified)
+
+    def _put_products(self, item_id):
+        current = self._current_user()
+        data = self._read_body()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            product = self.state.products.get(item_id)
+            if product is None:
+                return self._send(404, {"detail": "Producto no encontrado"})
+            if product["owner_id"] != current["_id"]:
+                return self._send(403, {"detail": "No autorizado"})
+            product.update({k: v for k, v in data.items() if k not in ("_id", "owner_id")})
+            self.state.touch_product(item_id)
+        self._send(200, product)
+
+    def _delete_products(self, item_id):
+        current = self._current_user()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            product = self.state.products.get(item_id)
+            if product is None:
+                return self._send(404, {"detail": "Producto no encontrado"})
+            if product["owner_id"] != current["_id"]:
+                return self._send(403, {"detail": "No autorizado"})
+            del self.state.products[item_id]
+            self.state.touch_product(item_id, deleted=True)
+        self._send(204)
+
+    # --- /orders ---
+
+    def _post_orders(self, item_id):
+        current = self._current_user()
+        data = self._read_body()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        quantity = data.get("quantity", 1)
+        if item_id is not None or not data.get("product_id") or not isinstance(quantity, int) or quantity < 1:
+            return self._send(422, {"detail": "Datos de pedido inválidos"})
+        # Verificar y descontar el stock en la misma sección crítica evita la sobreventa
+        with self.state.lock:
+            product = self.state.products.get(data["product_id"])
+            if product is None:
+                return self._send(404, {"detail": "Producto no encontrado"})
+            if product.get("stock", 0) < quantity:
+                return self._send(409, {"detail": "Stock insuficiente"})
+            product["stock"] -= quantity
+            self.state.touch_product(product["_id"])
+            order = {"_id": uuid.uuid4().hex[:24], "product_id": product["_id"], "buyer_id": current["_id"],
+                     "quantity": quantity, "status": "pending"}
+            self.state.orders[order["_id"]] = order
+        self._send(201, order)
+
+    def _get_orders(self, item_id):
+        current = self._current_user()
+        if current is None:
+            return self._send(401, {"detail": "Not authenticated"})
+        with self.state.lock:
+            if item_id is None:
+                orders = [o for o in self.state.orders.values() if o["buyer_id"] == current["_id"]]
+                return self._send(200, orders)
+            order = self.state.orders.get(item_id)
+        if order is None or order["buyer_id"] != current["_id"]:
+            return self._send(404, {"detail": "Pedido no encontrado"})
+        self._send(200, order)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Cola de conexiones amplia: con la de 5 por defecto las ráfagas concurrentes pierden SYN y esperan 1 s
+    request_queue_size = 128
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0, token_ttl=TOKEN_TTL, hash_rounds=0):
+        super().__init__(address, StubHandler)
+        self.state = StubState()
+        self.config = {"latency": latency, "jitter": jitter, "error_rate": error_rate, "token_ttl": token_ttl,
+                       "hash_rounds": hash_rounds}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config):
+    """Levanta el stub en un hilo de fondo y lo devuelve; `port=0` elige un puerto libre.
+
+    Se detiene con `server.shutdown()`.
+    """
+    server = StubServer((host, port), **config)
+    thread = threading.Thread(target=server.serve_forever, name="agrored-stub", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub local del backend AgroRed (user_service + product_service).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia inyectada por petición en segundos.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latencia extra aleatoria máxima en segundos.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de peticiones que responden 500.")
+    parser.add_argument("--hash-rounds", type=int, default=0,
+                        help="Iteraciones PBKDF2 por registro/login para simular el coste de CPU del hash (0 = sin hash).")
+    args = parser.parse_args(argv)
+    server = StubServer((args.host, args.port), latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        hash_rounds=args.hash_rounds)
+    print(f"🧪 Stub AgroRed escuchando en {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
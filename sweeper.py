@@ -0,0 +1,174 @@
+import argparse
+import re
+import threading
+import time
+
+import fixtures
+
+# Patrones de lo que crean los scripts de prueba: emails `generate_random_string(n)@agrored.com`
+# con uno de los nombres de usuario de prueba, y productos cuyo nombre lleva el prefijo o sufijo
+# aleatorio de cada flujo (un nombre fijo como "Tomate Orgánico" podría ser de un agricultor real;
+# esos se barren igual por pertenecer a un usuario de prueba).
+TEST_EMAIL_PATTERN = r"^[a-z]{5,10}@agrored\.com$"
+TEST_USER_NAMES = (
+    "Usuario de Prueba", "Usuario de Carga", "Usuario Soak", "Vendedor Benchmark",
+    "Vendedor de Prueba", "Vendedor Búsqueda",
+)
+TEST_PRODUCT_PATTERN = (r"^([a-z]{5} Tomate (Carga|Soak|Cosecha)|Bench [a-z]{8}|Bench (Papa|Tomate|Fresa|Mango|Yuca) [a-z]{6}"
+                        r"|[a-z]{5} Producto (Semilla|Test)( gw\d+| main)?)$")
+# Contraseñas con que los scripts registran a sus usuarios (BackEnd-Test.py y fixtures.py)
+TEST_PASSWORDS = ("testpassword123", fixtures.SEED_PASSWORD)
+
+
+class RateLimiter:
+    """Limita las peticiones a `rate` por segundo entre todos los hilos (cubeta de fichas)."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class OrphanSweeper:
+    """Encuentra usuarios y productos creados por las pruebas y los elimina en paralelo.
+
+    Los productos solo los puede borrar su dueño, así que el barrido se agrupa
+    por dueño: se inicia sesión con las contraseñas de prueba, se borran sus
+    productos y, si el dueño también es un usuario de prueba, se borra el usuario.
+    """
+
+    def __init__(self, email_pattern=TEST_EMAIL_PATTERN, user_names=TEST_USER_NAMES,
+                 product_pattern=TEST_PRODUCT_PATTERN, passwords=TEST_PASSWORDS, rate=10.0, workers=8):
+        self.backend = fixtures.load_backend()
+        self.email_pattern = re.compile(email_pattern)
+        self.user_names = set(user_names)
+        self.product_pattern = re.compile(product_pattern)
+        self.passwords = passwords
+        self.limiter = RateLimiter(rate, burst=workers)
+        self.workers = workers
+
+    def is_test_user(self, user):
+        return bool(self.email_pattern.match(user.get("email", ""))) and user.get("full_name") in self.user_names
+
+    def is_test_product(self, product):
+        return bool(self.product_pattern.match(product.get("name", "")))
+
+    def _call(self, func, *args):
+        self.limiter.wait()
+        return func(*args)
+
+    def discover(self, access_token):
+        """Devuelve {owner_id: {"user": dict o None, "products": [ids]}} con lo que hay que borrar."""
+        backend = self.backend
+        listed = self._call(backend.list_users, access_token)
+        if listed is None:
+            print("⚠️ No se pudo listar usuarios; solo se barrerán los productos de prueba y sus dueños")
+        users = {user["_id"]: user for user in listed or []}
+        plan = {}
+        for user_id, user in users.items():
+            if self.is_test_user(user):
+                plan[user_id] = {"user": user, "products": []}
+        for product in self._call(backend.get_products):
+            owner_id = product.get("owner_id")
+            if owner_id in plan or self.is_test_product(product):
+                entry = plan.setdefault(owner_id, {"user": users.get(owner_id), "products": []})
+                entry["products"].append(product["_id"])
+        # Dueños de productos de prueba que no salieron en el listado de usuarios
+        for owner_id, entry in plan.items():
+            if entry["user"] is None and owner_id:
+                entry["user"] = self._call(backend.get_user, owner_id, access_token)
+        return plan
+
+    def _owner_token(self, user):
+        for password in self.passwords:
+            token = self._call(self.backend.login_user, user["email"], password)
+            if token:
+                return token
+        return None
+
+    def sweep_owner(self, owner_id, entry):
+        """Borra los productos del dueño y, si es usuario de prueba, al usuario. Devuelve el conteo."""
+        backend = self.backend
+        result = {"products": 0, "users": 0, "skipped": 0}
+        user = entry["user"]
+        token = self._owner_token(user) if user else None
+        if token is None:
+            result["skipped"] = len(entry["products"]) + (1 if user and self.is_test_user(user) else 0)
+            return result
+        for product_id in entry["products"]:
+            if self._call(backend.delete_product, token, product_id):
+                result["products"] += 1
+            else:
+                result["skipped"] += 1
+        if self.is_test_user(user) and result["products"] == len(entry["products"]):
+            if self._call(backend.delete_user, token, owner_id):
+                result["users"] += 1
+            else:
+                result["skipped"] += 1
+        return result
+
+    def run(self, dry_run=False):
+        backend = self.backend
+        # Usuario propio para poder listar; también es de prueba y se borra al final
+        email = f"{backend.generate_random_string(10)}@agrored.com"
+        password = TEST_PASSWORDS[0]
+        user_id = backend.register_user("Usuario de Prueba", email, password)
+        access_token = backend.login_user(email, password) if user_id else None
+        if access_token is None:
+            raise RuntimeError("No se pudo crear el usuario del barrido")
+        try:
+            plan = self.discover(access_token)
+            plan.pop(user_id, None)
+            n_users = sum(1 for entry in plan.values() if entry["user"] and self.is_test_user(entry["user"]))
+            n_products = sum(len(entry["products"]) for entry in plan.values())
+            print(f"🔍 Encontrados {n_users} usuarios y {n_products} productos de prueba ({len(plan)} dueños)")
+            if dry_run:
+                for owner_id, entry in plan.items():
+                    user = entry["user"] or {}
+                    print(f"   {user.get('email', owner_id)}: {len(entry['products'])} productos"
+                          + (" + usuario" if user and self.is_test_user(user) else ""))
+                return {"products": 0, "users": 0, "skipped": 0}
+            start = time.perf_counter()
+            results = backend.run_parallel(lambda item: self.sweep_owner(*item), list(plan.items()), self.workers)
+            totals = {key: sum(result[key] for result in results) for key in ("products", "users", "skipped")}
+            print(f"🧹 Eliminados {totals['users']} usuarios y {totals['products']} productos en "
+                  f"{time.perf_counter() - start:.1f} s; {totals['skipped']} sin credenciales o con error")
+            return totals
+        finally:
+            backend.delete_user(access_token, user_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Elimina usuarios y productos huérfanos creados por las pruebas AgroRed.")
+    parser.add_argument("--base-url", default=fixtures.load_backend().BASE_URL, help="URL base del backend.")
+    parser.add_argument("--dry-run", action="store_true", help="Solo lista lo que se eliminaría.")
+    parser.add_argument("--workers", type=int, default=8, help="Dueños que se barren en paralelo.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Máximo de peticiones por segundo (0 = sin límite).")
+    parser.add_argument("--email-pattern", default=TEST_EMAIL_PATTERN, help="Regex de emails de usuarios de prueba.")
+    parser.add_argument("--user-name", nargs="+", default=list(TEST_USER_NAMES), help="Nombres de usuarios de prueba.")
+    parser.add_argument("--product-pattern", default=TEST_PRODUCT_PATTERN, help="Regex de nombres de productos de prueba.")
+    args = parser.parse_args(argv)
+    backend = fixtures.load_backend()
+    backend.configure_client(base_url=args.base_url, pool_size=args.workers)
+    sweeper = OrphanSweeper(args.email_pattern, args.user_name, args.product_pattern, rate=args.rate, workers=args.workers)
+    sweeper.run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("agrored")
+    group.addoption("--backend-url", default=os.environ.get("AGRORED_BASE_URL"),
+                    help="Backend real contra el que probar; sin él cada worker levanta su propio stub.")
+    group.addoption("--frontend-url", default=os.environ.get("AGRORED_FRONTEND_URL"),
+                    help="URL del frontend; sin ella se omiten las pruebas de navegador.")
+    group.addoption("--headed", action="store_true", help="Muestra Chrome en las pruebas de frontend.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "frontend: prueba de navegador (requiere --frontend-url y Chrome)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--frontend-url"):
+        return
+    skip = pytest.mark.skip(reason="sin --frontend-url no se ejecutan las pruebas de navegador")
+    for item in items:
+        if "frontend" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def worker():
+    """Id del worker de pytest-xdist (`gw0`, `gw1`...) o `main` sin paralelismo."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+@pytest.fixture(scope="session")
+def backend(request):
+    """Helpers de BackEnd-Test.py apuntando al backend de este worker.
+
+    Con `-n` cada worker es un proceso aparte: tiene su propio cliente HTTP y,
+    si no se indicó `--backend-url`, su propio stub con datos aislados.
+    """
+    module = fixtures.load_backend()
+    base_url = request.config.getoption("--backend-url")
+    stub = None
+    if not base_url:
+        from stub_server import start_stub_server
+        stub = start_stub_server()
+        base_url = stub.url
+    module.configure_client(base_url=base_url)
+    yield module
+    module.client.close()
+    if stub is not None:
+        stub.shutdown()
+        stub.server_close()
+
+
+@pytest.fixture(scope="session")
+def usuario(backend):
+    """Usuario registrado y con sesión, compartido por todas las pruebas del worker."""
+    datos = fixtures.crear_usuario_api("Usuario de Prueba")
+    yield datos
+    fixtures.eliminar_usuario_api(datos)
+
+
+@pytest.fixture
+def token(usuario):
+    """Token vigente del usuario compartido (de la caché; se renueva si está por vencer)."""
+    return fixtures.token_de(usuario)
+
+
+@pytest.fixture
+def nombre_unico(backend, worker):
+    """Genera nombres de producto únicos por worker y por prueba."""
+    def generar(base="Producto Test"):
+        return f"{backend.generate_random_string()} {base} {worker}"
+    return generar
+
+
+@pytest.fixture(scope="session")
+def frontend(request, backend):
+    module = fixtures.load_frontend()
+    module.FRONTEND_URL = request.config.getoption("--frontend-url")
+    return module
+
+
+@pytest.fixture(scope="session")
+def navegador(request, frontend):
+    """Un Chrome por worker, reutilizado por todas sus pruebas de frontend."""
+    try:
+        driver = frontend.crear_driver(headless=not request.config.getoption("--headed"))
+    except Exception as e:
+        pytest.skip(f"No se pudo iniciar Chrome: {e}")
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def driver(navegador, frontend):
+    """El Chrome del worker, limpio al empezar cada prueba."""
+    fixtures.reiniciar_navegador(navegador, frontend.FRONTEND_URL)
+    frontend.timings.reset()
+    return navegador
+
+
+@pytest.fixture(scope="session")
+def vendedor(frontend):
+    """Vendedor de los productos sembrados, compartido por las pruebas de frontend del worker."""
+    datos = fixtures.crear_usuario_api("Vendedor de Prueba")
+    yield datos
+    fixtures.eliminar_usuario_api(datos)
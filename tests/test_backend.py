@@ -0,0 +1,158 @@
+import pytest
+
+from api_client import ApiClient, ResponseCache
+import fixtures
+import traffic
+
+
+@pytest.fixture
+def producto(backend, token, nombre_unico):
+    """Producto del usuario compartido; se elimina al terminar la prueba si sigue existiendo."""
+    product_id = backend.create_product(token, nombre_unico())
+    assert product_id is not None, "No se pudo crear el producto"
+    yield product_id
+    if backend.get_product(product_id) is not None:
+        backend.delete_product(token, product_id)
+
+
+def test_registro_y_login(backend):
+    usuario = fixtures.crear_usuario_api("Usuario de Prueba")
+    try:
+        assert usuario["user_id"]
+        assert usuario["token"]
+    finally:
+        assert fixtures.eliminar_usuario_api(usuario)
+
+
+def test_login_con_contrasena_incorrecta(backend, usuario):
+    assert backend.login_user(usuario["email"], "contraseña-incorrecta") is None
+
+
+def test_obtener_usuario(backend, usuario, token):
+    datos = backend.get_user(usuario["user_id"], token)
+    assert datos is not None
+    assert datos["_id"] == usuario["user_id"]
+    assert datos["email"] == usuario["email"]
+
+
+def test_crear_producto_asociado_al_usuario(backend, usuario, producto):
+    datos = backend.get_product(producto)
+    assert datos is not None
+    assert datos["owner_id"] == usuario["user_id"]
+
+
+def test_listado_incluye_producto(backend, producto):
+    assert any(p["_id"] == producto for p in backend.get_products())
+
+
+def test_eliminar_producto(backend, token, producto):
+    assert backend.delete_product(token, producto)
+    assert backend.get_product(producto) is None
+
+
+def test_eliminar_producto_ajeno_falla(backend, producto):
+    otro = fixtures.crear_usuario_api("Usuario de Prueba")
+    try:
+        assert not backend.delete_product(fixtures.token_de(otro), producto)
+        assert backend.get_product(producto) is not None
+    finally:
+        fixtures.eliminar_usuario_api(otro)
+
+
+def test_eliminar_usuario(backend):
+    usuario = fixtures.crear_usuario_api("Usuario de Prueba")
+    token = fixtures.token_de(usuario)
+    assert fixtures.eliminar_usuario_api(usuario)
+    assert backend.get_user(usuario["user_id"], token) is None
+
+
+def test_pedido_descuenta_stock(backend, token, nombre_unico):
+    product_id = backend.create_product(token, nombre_unico(), stock=3)
+    try:
+        assert backend.create_order(token, product_id, quantity=2) is not None
+        assert backend.get_product(product_id)["stock"] == 1
+        # Sin stock suficiente el pedido se rechaza y el stock no baja de cero
+        assert backend.create_order(token, product_id, quantity=2) is None
+        assert backend.get_product(product_id)["stock"] == 1
+    finally:
+        backend.delete_product(token, product_id)
+
+
+def test_grabacion_y_reproduccion(backend, nombre_unico, tmp_path):
+    recorder = backend.start_recording(str(tmp_path / "trafico.jsonl"))
+    try:
+        usuario = fixtures.crear_usuario_api("Usuario de Prueba")
+        product_id = backend.create_product(fixtures.token_de(usuario), nombre_unico())
+        assert backend.delete_product(fixtures.token_de(usuario), product_id)
+        assert fixtures.eliminar_usuario_api(usuario)
+    finally:
+        backend.stop_recording(recorder)
+    _, streams = traffic.load_recording(recorder.path)
+    # Dos copias a la vez: cada una con su propio email, ids y token
+    replayer = traffic.TrafficReplayer(backend.client, streams, speed=0, copies=2)
+    stats = replayer.run()
+    assert stats["requests"] == 2 * recorder.count
+    assert stats["skipped"] == stats["mismatched"] == stats["errors"] == 0
+
+
+def test_cache_http_revalida_productos(backend, token, producto):
+    cache = ResponseCache()
+    client = ApiClient(backend.client.base_url, cache=cache)
+    vistas = []
+    client.add_hook(lambda method, path, status, size, seconds: vistas.append((status, size)))
+    try:
+        ruta = f"{backend.PRODUCTS_URL}/{producto}"
+        primera = client.get(ruta)
+        segunda = client.get(ruta)
+        assert not primera.from_cache
+        assert segunda.status_code == 200 and segunda.from_cache
+        # Los observadores ven la respuesta servida, no el 304 vacío de la revalidación
+        assert vistas == [(200, len(primera.content))] * 2
+        assert segunda.json() == primera.json()
+        # Un cambio en el producto invalida el ETag y se descarga el cuerpo nuevo
+        assert backend.create_order(token, producto) is not None
+        assert client.get(ruta).json()["stock"] == primera.json()["stock"] - 1
+        assert backend.delete_product(token, producto)
+        assert client.get(ruta).status_code == 404
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["revalidations"]) == (1, 3, 3)
+        assert stats["bytes_saved"] == len(primera.content)
+        assert stats["entries"] == 0
+    finally:
+        client.close()
+
+
+def test_deriva_de_latencia(backend):
+    def ventana(p95, extra=None):
+        filas = [{"endpoint": "GET /api/v1/products", "count": 10, "p95": p95}]
+        if extra is not None:
+            filas.append({"endpoint": "POST /api/v1/users", "count": extra, "p95": 50.0})
+        return filas
+
+    # Se comparan las medias del primer y el último cuarto de las ventanas
+    ventanas = [ventana(p95) for p95 in (100, 100, 300, 120, 150, 150, 200, 200)]
+    inicio, final, cambio = backend.latency_drift(ventanas)["GET /api/v1/products"]
+    assert (inicio, final, cambio) == (100.0, 200.0, 1.0)
+    # Ventanas sin peticiones no cuentan y un endpoint con una sola ventana no tiene deriva
+    drift = backend.latency_drift([ventana(10, extra=0), ventana(10, extra=3), ventana(5)])
+    assert drift["GET /api/v1/products"] == (10.0, 5.0, -0.5)
+    assert "POST /api/v1/users" not in drift
+
+
+def test_flujo_soak_no_deja_recursos(backend):
+    ledger = backend.ResourceLedger()
+    assert backend.soak_flow(ledger)
+    assert ledger.live == {"usuarios": {}, "productos": {}}
+    assert ledger.created == ledger.deleted == {"usuarios": 1, "productos": 1}
+    ledger.add("productos", "p1", "x@agrored.com")
+    ledger.remove("productos", "p1")
+    ledger.add("usuarios", "u1", "x@agrored.com")
+    assert ledger.live == {"usuarios": {"u1": "x@agrored.com"}, "productos": {}}
+
+
+@pytest.mark.parametrize("opcion", ["--rate", "--soak-duration", "--window"])
+def test_soak_rechaza_valores_no_positivos(backend, opcion):
+    assert getattr(backend.parse_args([opcion, "0.5"]), opcion.lstrip("-").replace("-", "_")) == 0.5
+    for valor in ("0", "-1"):
+        with pytest.raises(SystemExit):
+            backend.parse_args([opcion, valor])
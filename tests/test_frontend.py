@@ -0,0 +1,22 @@
+import pytest
+
+pytestmark = pytest.mark.frontend
+
+ESCENARIOS = ("registro", "calificacion", "carrito", "crud_producto", "busqueda")
+
+
+@pytest.mark.parametrize("nombre", ESCENARIOS)
+def test_escenario(frontend, driver, vendedor, nombre_unico, nombre):
+    """Cada escenario de FrontEnd-Test.py como prueba, con el Chrome y el vendedor del worker."""
+    escenario, n_productos, sesion_api = frontend.ESCENARIOS[nombre]
+    datos = None
+    try:
+        if sesion_api:
+            productos = [nombre_unico("Producto Semilla") for _ in range(n_productos)]
+            datos = frontend.preparar_sesion(driver, productos, vendedor)
+            frontend.abrir_frontend(driver)
+            frontend.verificar_sesion(driver)
+        escenario(driver, datos)
+        frontend.cerrar_sesion(driver)
+    finally:
+        frontend.limpiar_sesion(datos)
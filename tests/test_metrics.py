@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from metrics import LatencyHistogram, RequestRecorder, endpoint_template
+
+
+@pytest.mark.parametrize("ruta, esperado", [
+    ("/api/v1/products/665f1c2ab3d4e5f6a7b8c9d0", "/api/v1/products/{id}"),
+    ("/api/v1/users/123e4567-e89b-12d3-a456-426614174000?x=1", "/api/v1/users/{id}"),
+    ("/api/v1/orders/42", "/api/v1/orders/{id}"),
+    ("/api/v1/products", "/api/v1/products"),
+    # Palabras hexadecimales sin dígitos no son ids
+    ("/api/v1/products/deadbeefcafe", "/api/v1/products/deadbeefcafe"),
+    ("/api/v1/auth/login", "/api/v1/auth/login"),
+])
+def test_endpoint_template(ruta, esperado):
+    assert endpoint_template(ruta) == esperado
+
+
+def test_percentiles_dentro_del_error_relativo():
+    rng = random.Random(7)
+    muestras = [rng.lognormvariate(-4, 1) for _ in range(20000)]
+    histograma = LatencyHistogram()
+    for muestra in muestras:
+        histograma.add(muestra)
+    ordenadas = sorted(muestras)
+    for pct in (50, 95, 99):
+        exacto = ordenadas[int(len(ordenadas) * pct / 100) - 1]
+        assert histograma.percentile(pct) == pytest.approx(exacto, rel=LatencyHistogram.GROWTH - 1)
+    assert histograma.count == len(muestras)
+    assert histograma.min == ordenadas[0] and histograma.max == ordenadas[-1]
+    assert histograma.mean == pytest.approx(sum(muestras) / len(muestras))
+    # Memoria acotada: las cubetas no crecen con el número de muestras
+    assert len(histograma.buckets) < 500
+
+
+def test_histograma_vacio_y_merge():
+    vacio = LatencyHistogram()
+    assert vacio.percentile(95) == 0.0 and vacio.mean == 0.0
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for segundos in (0.01, 0.02):
+        a.add(segundos)
+    b.add(0.5)
+    a.merge(b)
+    a.merge(vacio)
+    assert a.count == 3 and a.min == 0.01 and a.max == 0.5
+    assert a.percentile(100) == 0.5
+    # El percentil queda acotado por el mínimo y el máximo observados
+    assert a.percentile(1) == pytest.approx(0.01, rel=LatencyHistogram.GROWTH - 1)
+
+
+def test_recorder_agrupa_por_plantilla():
+    recorder = RequestRecorder()
+    recorder("GET", "/api/v1/products/665f1c2ab3d4e5f6a7b8c9d0", 200, 100, 0.01)
+    recorder("GET", "/api/v1/products/765f1c2ab3d4e5f6a7b8c9d1", 404, 20, 0.03)
+    recorder("POST", "/api/v1/products", None, 0, 1.0)
+    filas = {fila["endpoint"]: fila for fila in recorder.summary()}
+    assert set(filas) == {"GET /api/v1/products/{id}", "POST /api/v1/products"}
+    assert filas["GET /api/v1/products/{id}"]["count"] == 2
+    assert filas["GET /api/v1/products/{id}"]["errors"] == 1
+    assert filas["GET /api/v1/products/{id}"]["bytes"] == 120
+    assert filas["POST /api/v1/products"]["errors"] == 1
@@ -0,0 +1,86 @@
+import itertools
+import json
+
+import pytest
+
+import regression
+from history import HistoryStore
+from results import ResultSink, PASSED, FAILED
+
+
+def fila(endpoint, p95):
+    return {"endpoint": endpoint, "count": 10, "errors": 0, "min": 1.0, "mean": p95 / 2, "p95": p95, "max": p95 * 2}
+
+
+@pytest.fixture
+def historial(tmp_path):
+    """Guarda ejecuciones en un histórico temporal y devuelve su id."""
+    db = str(tmp_path / "history.sqlite3")
+    numeros = itertools.count()
+
+    def guardar(kind, filas, fallos=0):
+        sink = ResultSink(str(tmp_path / f"{kind}_{next(numeros)}.jsonl"))
+        sink.emit(PASSED, "Paso")
+        for _ in range(fallos):
+            sink.emit(FAILED, "Paso fallido")
+        sink.close()
+        store = HistoryStore(db)
+        try:
+            return store.record_run(kind, filas, sink.path)
+        finally:
+            store.close()
+
+    guardar.db = db
+    return guardar
+
+
+@pytest.fixture
+def umbrales(tmp_path):
+    path = str(tmp_path / "baselines.json")
+    regression.save_baseline({"tolerance": 0.1, "kinds": {"backend": {"GET /a": {"p95": 100.0}}}}, path)
+    return path
+
+
+def test_compare_tolerancia_y_faltantes():
+    thresholds = {"GET /a": {"p95": 100.0}, "GET /b": {"p95": 100.0, "tolerance": 0.5}, "GET /c": {"p95": 10.0}}
+    checks = regression.compare([fila("GET /a", 111.0), fila("GET /b", 140.0)], thresholds, tolerance=0.1)
+    por_nombre = {check["name"]: check for check in checks}
+    assert por_nombre["GET /a"]["status"] == "regression"
+    assert por_nombre["GET /a"]["change"] == pytest.approx(0.11)
+    # Tolerancia propia del umbral
+    assert por_nombre["GET /b"]["status"] == "ok" and por_nombre["GET /b"]["limit"] == pytest.approx(150.0)
+    assert por_nombre["GET /c"]["status"] == "missing" and por_nombre["GET /c"]["value"] is None
+
+
+def test_gate_codigos_de_salida(historial, umbrales, tmp_path):
+    ok = historial("backend", [fila("GET /a", 105.0)])
+    lenta = historial("backend", [fila("GET /a", 200.0)])
+    fallida = historial("backend", [fila("GET /a", 105.0)], fallos=2)
+    assert regression.gate("backend", umbrales, db=historial.db, run_id=ok) == regression.EXIT_OK
+    diff = str(tmp_path / "diff.json")
+    assert regression.gate("backend", umbrales, diff_path=diff, db=historial.db, run_id=lenta) == regression.EXIT_REGRESSION
+    with open(diff, encoding="utf-8") as f:
+        assert json.load(f)["regressions"] == 1
+    assert regression.gate("backend", umbrales, db=historial.db, run_id=fallida) == regression.EXIT_FAILED
+    # Sin run_id se evalúa la última ejecución del tipo
+    assert regression.gate("backend", umbrales, db=historial.db) == regression.EXIT_FAILED
+
+
+def test_gate_evalua_la_ejecucion_indicada(historial, umbrales):
+    propia = historial("backend", [fila("GET /a", 50.0)])
+    # Otro job guarda después una ejecución lenta en el mismo histórico
+    historial("backend", [fila("GET /a", 500.0)])
+    assert regression.gate("backend", umbrales, db=historial.db, run_id=propia) == regression.EXIT_OK
+    # Un id inexistente o de otro tipo no se confunde con la última ejecución
+    assert regression.gate("load", umbrales, db=historial.db, run_id=propia) == regression.EXIT_FAILED
+    assert regression.gate("backend", umbrales, db=historial.db, run_id=propia + 100) == regression.EXIT_FAILED
+
+
+def test_update_baseline_conserva_otros_tipos(historial, umbrales):
+    historial("load", [fila("GET /a", 80.04), fila("GET /b", 20.0)])
+    baseline = regression.update_baseline("load", umbrales, stats=("p95", "max"), db=historial.db)
+    assert baseline["kinds"]["load"] == {"GET /a": {"p95": 80.0, "max": 160.1}, "GET /b": {"p95": 20.0, "max": 40.0}}
+    assert baseline["kinds"]["backend"] == {"GET /a": {"p95": 100.0}}
+    assert regression.load_baseline(umbrales) == baseline
+    with pytest.raises(RuntimeError):
+        regression.update_baseline("soak", umbrales, db=historial.db)
@@ -0,0 +1,19 @@
+import report
+from results import ResultRecord, PASSED, FAILED
+
+
+def test_resumen_acotado(tmp_path):
+    resultados = (
+        ResultRecord(FAILED if i % 10 == 0 else PASSED, f"Login de usuario 'u{i}@agrored.com'",
+                     duration=0.02, timestamp=1000.0 + i)
+        for i in range(5000)
+    )
+    resumen = report.RunSummary(max_failures=5).consume(resultados)
+    assert resumen.counts[FAILED] == 500
+    assert len(resumen.failures) == 5 and resumen.omitted_failures == 495
+    # Los emails no abren un grupo por usuario
+    assert [row["endpoint"] for row in resumen.group_rows()] == ["Login de usuario '{email}'"]
+    assert len(resumen.timeline.buckets) <= report.MAX_BUCKETS
+    assert sum(count for _, count, _, _ in resumen.timeline.points()) == 5000
+    pdf, html = report.build_report([], str(tmp_path / "vacio.pdf"), "Reporte")
+    assert (tmp_path / "vacio.pdf").exists() and html.endswith(".html")
@@ -0,0 +1,69 @@
+import re
+import threading
+import time
+
+import pytest
+
+import fixtures
+import sweeper
+
+
+@pytest.mark.parametrize("nombre", [
+    "qwert Tomate Carga", "qwert Tomate Soak", "qwert Tomate Cosecha", "Bench abcdefgh", "Bench Papa abcdef",
+    "qwert Producto Semilla", "qwert Producto Test", "qwert Producto Semilla gw3", "qwert Producto Test main",
+])
+def test_patron_reconoce_productos_generados(nombre):
+    assert re.match(sweeper.TEST_PRODUCT_PATTERN, nombre)
+
+
+@pytest.mark.parametrize("nombre", [
+    "Tomate Orgánico", "Tomate Cosecha", "Bench de madera", "Bench Papa criolla", "Papa Producto Semilla",
+    "qwert Producto Test extra grande",
+])
+def test_patron_ignora_productos_reales(nombre):
+    assert not re.match(sweeper.TEST_PRODUCT_PATTERN, nombre)
+
+
+def test_patron_de_emails():
+    assert re.match(sweeper.TEST_EMAIL_PATTERN, "abcdefghij@agrored.com")
+    for email in ("abcd@agrored.com", "abcdefghijkl@agrored.com", "juan.perez@agrored.com", "abcde@gmail.com"):
+        assert not re.match(sweeper.TEST_EMAIL_PATTERN, email)
+
+
+def test_rate_limiter_entre_hilos():
+    limiter = sweeper.RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    hilos = [threading.Thread(target=lambda: [limiter.wait() for _ in range(3)]) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    # 12 peticiones a 50/s con una ficha inicial: al menos 11 intervalos de 20 ms
+    assert time.monotonic() - start >= 11 / 50 * 0.95
+    sin_limite = sweeper.RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(1000):
+        sin_limite.wait()
+    assert time.monotonic() - start < 0.1
+
+
+def test_barrido_borra_solo_datos_de_prueba(backend, worker):
+    # Patrones propios de la prueba: el barrido no toca los datos de otras pruebas ni de otros workers
+    nombre_usuario = f"Usuario Barrido {worker}"
+    real = fixtures.crear_usuario_api("Juan Pérez")
+    huerfano = fixtures.crear_usuario_api(nombre_usuario)
+    try:
+        propio = backend.create_product(real["token"], "Tomate Orgánico")
+        generado = backend.create_product(real["token"], f"qwert Barrido {worker}")
+        de_prueba = backend.create_product(huerfano["token"], "Tomate Orgánico")
+        barrido = sweeper.OrphanSweeper(user_names=(nombre_usuario,), product_pattern=rf"^[a-z]{{5}} Barrido {worker}$",
+                                        rate=0, workers=4)
+        assert barrido.run() == {"products": 2, "users": 1, "skipped": 0}
+        assert backend.get_product(propio) is not None
+        # Producto con nombre generado de un usuario real, y todo lo del usuario de prueba
+        assert backend.get_product(generado) is None
+        assert backend.get_product(de_prueba) is None
+        assert backend.get_user(huerfano["user_id"], real["token"]) is None
+        backend.delete_product(real["token"], propio)
+    finally:
+        fixtures.eliminar_usuario_api(real)
@@ -0,0 +1,75 @@
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from token_cache import TokenCache, jwt_expiry
+
+
+def jwt(payload):
+    """JWT sin firma válida: la caché solo lee el payload."""
+    cuerpo = base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+    return f"eyJhbGciOiJIUzI1NiJ9.{cuerpo}.firma"
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(jwt({"sub": "x", "exp": 1700000000})) == 1700000000.0
+    assert jwt_expiry(jwt({"sub": "x"})) is None
+    for invalido in (None, "", "sin-puntos", "a.no-es-base64!.c", "a.e30.c"):
+        assert jwt_expiry(invalido) is None
+
+
+def test_renueva_antes_de_exp():
+    cache = TokenCache(refresh_margin=60)
+    vigente = jwt({"exp": time.time() + 3600})
+    por_vencer = jwt({"exp": time.time() + 30})
+    tokens = {"vigente@agrored.com": vigente, "vence@agrored.com": por_vencer}
+    logins = []
+
+    def login(email, password):
+        logins.append(email)
+        return tokens[email]
+
+    for _ in range(3):
+        assert cache.get("vigente@agrored.com", "clave", login) == vigente
+        assert cache.get("vence@agrored.com", "clave", login) == por_vencer
+    # El token con exp dentro del margen se pide en cada llamada; el vigente una sola vez
+    assert logins.count("vigente@agrored.com") == 1
+    assert logins.count("vence@agrored.com") == 3
+    assert cache.stats() == {"hits": 2, "logins": 4, "hit_rate": 2 / 6}
+    cache.invalidate("vigente@agrored.com")
+    cache.get("vigente@agrored.com", "clave", login)
+    assert logins.count("vigente@agrored.com") == 2
+
+
+def test_sin_exp_usa_ttl_por_defecto_y_no_guarda_fallos():
+    cache = TokenCache(refresh_margin=60, default_ttl=300)
+    cache.put("a@agrored.com", "token-opaco")
+    assert cache.get("a@agrored.com", "clave", lambda *args: "otro") == "token-opaco"
+    assert cache.get("b@agrored.com", "clave", lambda *args: None) is None
+    assert "b@agrored.com" not in cache
+
+
+def test_un_solo_login_concurrente_por_usuario():
+    cache = TokenCache()
+    token = jwt({"exp": time.time() + 3600})
+    en_login = threading.Event()
+    liberar = threading.Event()
+    logins = []
+
+    def login(email, password):
+        logins.append(email)
+        en_login.set()
+        liberar.wait(5)
+        return token
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [executor.submit(cache.get, "u@agrored.com", "clave", login) for _ in range(16)]
+        assert en_login.wait(5)
+        # Un usuario distinto no espera al login en curso del primero
+        assert cache.get("otro@agrored.com", "clave", lambda *args: "token-otro") == "token-otro"
+        liberar.set()
+        assert {future.result() for future in futures} == {token}
+    assert logins == ["u@agrored.com"]
+    assert cache.stats()["hits"] == 15
@@ -0,0 +1,91 @@
+import base64
+import json
+import threading
+import time
+
+# Segundos antes de `exp` en que un token se considera vencido y se renueva
+REFRESH_MARGIN = 60
+# Vigencia asumida si el token no trae `exp` legible
+DEFAULT_TTL = 5 * 60
+
+
+def jwt_expiry(token):
+    """Devuelve el `exp` (epoch en segundos) del payload de un JWT, sin validar la firma; None si no se puede leer."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (AttributeError, IndexError, ValueError, TypeError):
+        return None
+
+
+class TokenCache:
+    """Tokens de acceso por usuario, reutilizados mientras falte más de `refresh_margin` s para su `exp`.
+
+    Es seguro entre hilos: cada email tiene su propio lock, así que varios hilos
+    que piden el token del mismo usuario provocan un único login y el resto
+    espera y reutiliza el resultado, sin bloquear los logins de otros usuarios.
+    """
+
+    def __init__(self, refresh_margin=REFRESH_MARGIN, default_ttl=DEFAULT_TTL):
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.logins = 0
+
+    def __contains__(self, email):
+        return email in self._tokens
+
+    def _user_lock(self, email):
+        with self._lock:
+            lock = self._locks.get(email)
+            if lock is None:
+                lock = self._locks[email] = threading.Lock()
+            return lock
+
+    def _valid(self, email):
+        entry = self._tokens.get(email)
+        if entry is not None and entry[1] - self.refresh_margin > time.time():
+            return entry[0]
+        return None
+
+    def get(self, email, password, login):
+        """Token vigente de `email`; si no hay, llama a `login(email, password)` y lo guarda."""
+        token = self._valid(email)
+        if token is None:
+            with self._user_lock(email):
+                token = self._valid(email)
+                if token is None:
+                    token = login(email, password)
+                    with self._lock:
+                        self.logins += 1
+                    if token is None:
+                        return None
+                    self.put(email, token)
+                    return token
+        with self._lock:
+            self.hits += 1
+        return token
+
+    def put(self, email, token):
+        """Guarda un token obtenido fuera de la caché (p. ej. en otro proceso)."""
+        self._tokens[email] = (token, jwt_expiry(token) or time.time() + self.default_ttl)
+
+    def invalidate(self, email):
+        """Descarta el token de `email` (p. ej. tras un 401 o al borrar el usuario)."""
+        self._tokens.pop(email, None)
+
+    def clear(self):
+        self._tokens.clear()
+        with self._lock:
+            self.hits = 0
+            self.logins = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.logins
+            return {"hits": self.hits, "logins": self.logins, "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,306 @@
+import bisect
+import gzip
+import json
+import random
+import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from metrics import endpoint_template
+
+FORMAT = "agrored-traffic"
+VERSION = 1
+# Campos de las respuestas cuyo valor se sustituye al reproducir (ids y tokens generados por el backend)
+CAPTURE_FIELDS = ("_id", "access_token")
+# Partes de la petición que se guardan; el resto de kwargs (timeout...) es del cliente
+REQUEST_PARTS = ("params", "json", "data")
+RECORDED_HEADERS = ("Authorization", "Content-Type")
+EMAIL_PATTERN = re.compile(r"^[^@\s/]+@agrored\.com$")
+_PLACEHOLDER = re.compile(r"\{\{(email:)?(\d+)\}\}")
+
+
+def _open(path, mode):
+    """Las grabaciones terminadas en `.gz` se escriben y leen comprimidas."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TrafficRecorder:
+    """Graba cada petición del `ApiClient` en JSONL con su desfase desde el inicio.
+
+    Se registra como `client.add_capture(recorder)`. Los valores de `_id` y
+    `access_token` que devuelve el backend se numeran y, cuando reaparecen en
+    peticiones posteriores (rutas, cabecera `Authorization`, cuerpos), se
+    guardan como `{{n}}`; los emails se guardan como `{{email:n}}`. Así la
+    grabación se puede reproducir contra otro backend o varias veces a la vez.
+    Cada hilo que hace peticiones es un `stream` que se reproduce en orden;
+    `t` es el inicio de la petición y `d` su duración, en segundos.
+    """
+
+    def __init__(self, path, base_url=None):
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self._start = None
+        self._values = {}
+        self._emails = {}
+        self._streams = {}
+        self.count = 0
+        self._write({"format": FORMAT, "version": VERSION, "base_url": base_url, "recorded_at": time.time()})
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _template(self, value):
+        if isinstance(value, dict):
+            return {key: self._template(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._template(item) for item in value]
+        if not isinstance(value, str):
+            return value
+        if value in self._values:
+            return f"{{{{{self._values[value]}}}}}"
+        if EMAIL_PATTERN.match(value):
+            index = self._emails.setdefault(value, len(self._emails))
+            return f"{{{{email:{index}}}}}"
+        if value.startswith("Bearer "):
+            return "Bearer " + self._template(value[len("Bearer "):])
+        if "/" in value:
+            return "/".join(self._template(part) for part in value.split("/"))
+        return value
+
+    def __call__(self, method, path, kwargs, response, seconds):
+        now = time.perf_counter()
+        with self._lock:
+            if self._start is None:
+                self._start = now - seconds
+            stream = self._streams.setdefault(threading.get_ident(), len(self._streams))
+            entry = {"t": round(max(now - seconds - self._start, 0.0), 4), "stream": stream,
+                     "method": method, "path": self._template(path)}
+            headers = {key: value for key, value in (kwargs.get("headers") or {}).items() if key in RECORDED_HEADERS}
+            if headers:
+                entry["headers"] = self._template(headers)
+            for part in REQUEST_PARTS:
+                if kwargs.get(part) is not None:
+                    entry[part] = self._template(kwargs[part])
+            entry["d"] = round(seconds, 4)
+            entry["status"] = response.status_code if response is not None else None
+            captures = {}
+            for field, value in _captured_values(response).items():
+                if value not in self._values:
+                    self._values[value] = len(self._values)
+                    captures[field] = self._values[value]
+            if captures:
+                entry["captures"] = captures
+            self._write(entry)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _captured_values(response):
+    """Valores de `CAPTURE_FIELDS` en el cuerpo JSON de una respuesta exitosa."""
+    if response is None or response.status_code >= 400 or not response.content:
+        return {}
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    if not isinstance(body, dict):
+        return {}
+    return {field: body[field] for field in CAPTURE_FIELDS if isinstance(body.get(field), str) and body[field]}
+
+
+def load_recording(path):
+    """Lee una grabación; devuelve (cabecera, peticiones agrupadas por stream en orden)."""
+    with _open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} no es una grabación de tráfico AgroRed")
+        streams = {}
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                streams.setdefault(entry["stream"], []).append(entry)
+    return header, [streams[stream] for stream in sorted(streams)]
+
+
+class _Unresolved(Exception):
+    """La petición depende de un valor que esta copia no llegó a capturar."""
+
+
+class _CopyState:
+    """Estado de una copia de la grabación, compartido entre sus streams.
+
+    Guarda los valores capturados, los emails generados y cuántas peticiones
+    de cada stream ya terminaron, para respetar el orden entre streams.
+    """
+
+    def __init__(self, streams, wait):
+        self.wait = wait
+        self.values = {}
+        self.emails = {}
+        self.done = [0] * streams
+        self._cond = threading.Condition()
+
+    def bind(self, index, value):
+        with self._cond:
+            self.values[index] = value
+            self._cond.notify_all()
+
+    def finished(self, stream):
+        with self._cond:
+            self.done[stream] += 1
+            self._cond.notify_all()
+
+    def wait_for(self, deps):
+        """Espera a que cada stream de `deps` haya completado el número de peticiones indicado."""
+        with self._cond:
+            return self._cond.wait_for(lambda: all(self.done[other] >= count for other, count in deps), self.wait)
+
+    def resolve(self, index):
+        with self._cond:
+            if not self._cond.wait_for(lambda: index in self.values, self.wait) or self.values[index] is None:
+                raise _Unresolved(index)
+            return self.values[index]
+
+    def email(self, index):
+        with self._cond:
+            if index not in self.emails:
+                self.emails[index] = f"{''.join(random.choices(string.ascii_lowercase, k=10))}@agrored.com"
+            return self.emails[index]
+
+    def render(self, value):
+        if isinstance(value, dict):
+            return {key: self.render(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.render(item) for item in value]
+        if not isinstance(value, str) or "{{" not in value:
+            return value
+        return _PLACEHOLDER.sub(
+            lambda m: self.email(int(m.group(2))) if m.group(1) else self.resolve(int(m.group(2))), value)
+
+
+def _stream_dependencies(streams):
+    """Para cada petición, las peticiones de otros streams que en la grabación ya habían terminado.
+
+    Se guarda solo lo que aumenta respecto de la petición anterior del mismo
+    stream: (stream, cuántas de sus peticiones deben haber terminado).
+    """
+    ends = [[entry["t"] + entry.get("d", 0.0) for entry in stream] for stream in streams]
+    dependencies = []
+    for index, stream in enumerate(streams):
+        required = [0] * len(streams)
+        stream_deps = []
+        for entry in stream:
+            deps = []
+            for other, other_ends in enumerate(ends):
+                if other != index:
+                    count = bisect.bisect_right(other_ends, entry["t"], lo=required[other])
+                    if count > required[other]:
+                        required[other] = count
+                        deps.append((other, count))
+            stream_deps.append(deps)
+        dependencies.append(stream_deps)
+    return dependencies
+
+
+class TrafficReplayer:
+    """Reproduce una grabación contra un `ApiClient` con la aceleración indicada.
+
+    Con `speed` 1 se respetan los desfases grabados, con 10 se comprimen diez
+    veces y con 0 se envía cada petición en cuanto puede. En todos los casos
+    una petición espera a las de otros streams que en la grabación ya habían
+    terminado al empezar ella (p. ej. el borrado final de los usuarios espera
+    a los flujos que los usan). Se lanzan `copies` copias independientes de la
+    grabación en paralelo (cada una con sus propios emails, ids y tokens),
+    espaciadas `stagger` segundos.
+    """
+
+    def __init__(self, client, streams, speed=1.0, copies=1, stagger=0.0, wait=30.0):
+        self.client = client
+        self.streams = streams
+        self.speed = speed
+        self.copies = copies
+        self.stagger = stagger
+        self.wait = wait
+        self._dependencies = _stream_dependencies(streams)
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.mismatches = {}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _lag(self, seconds):
+        with self._lock:
+            self.stats["max_lag"] = max(self.stats["max_lag"], seconds)
+
+    def _play(self, index, state, start):
+        delay = start - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        for entry, deps in zip(self.streams[index], self._dependencies[index]):
+            if deps:
+                state.wait_for(deps)
+            if self.speed:
+                delay = start + entry["t"] / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self._lag(-delay)
+            try:
+                self._send(entry, state)
+            finally:
+                state.finished(index)
+
+    def _send(self, entry, state):
+        try:
+            kwargs = {part: state.render(entry[part]) for part in ("headers",) + REQUEST_PARTS if part in entry}
+            path = state.render(entry["path"])
+        except _Unresolved:
+            self._count("skipped")
+            for index in entry.get("captures", {}).values():
+                state.bind(index, None)
+            return
+        try:
+            response = self.client.request(entry["method"], path, **kwargs)
+        except requests.exceptions.RequestException:
+            response = None
+        self._count("requests")
+        status = response.status_code if response is not None else None
+        if status is None:
+            self._count("errors")
+        if status != entry["status"]:
+            endpoint = f"{entry['method']} {endpoint_template(urlsplit(path).path)}"
+            with self._lock:
+                self.stats["mismatched"] += 1
+                self.mismatches[endpoint] = self.mismatches.get(endpoint, 0) + 1
+        values = _captured_values(response)
+        for field, index in entry.get("captures", {}).items():
+            state.bind(index, values.get(field))
+
+    def run(self):
+        """Reproduce todas las copias y devuelve los contadores de la reproducción."""
+        self.stats = {"requests": 0, "skipped": 0, "mismatched": 0, "errors": 0, "max_lag": 0.0}
+        self.mismatches = {}
+        jobs = []
+        origin = time.perf_counter()
+        for copy in range(self.copies):
+            state = _CopyState(len(self.streams), self.wait)
+            start = origin + copy * self.stagger
+            jobs.extend((index, state, start) for index in range(len(self.streams)))
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                list(executor.map(lambda job: self._play(*job), jobs))
+        self.stats["wall_time"] = time.perf_counter() - origin
+        return dict(self.stats)
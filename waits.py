@@ -0,0 +1,301 @@
+import functools
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+DEFAULT_TIMEOUT = 10  # segundos por espera si el paso no define otro
+NETWORK_QUIET = 0.5  # segundos sin peticiones para considerar la red inactiva
+POLL_FREQUENCY = 0.1
+
+# Timeouts por paso (en segundos) para los pasos más lentos del flujo
+STEP_TIMEOUTS = {
+    "realizar_pedido": 30,
+    "crear_producto": 20,
+}
+
+# Cuenta las peticiones fetch/XHR en vuelo de la SPA; se instala una vez por documento
+_NETWORK_TRACKER_JS = """
+if (!window.__agroredNet) {
+    const net = window.__agroredNet = {pending: 0};
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            net.pending++;
+            return originalFetch.apply(this, arguments).finally(() => { net.pending--; });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        net.pending++;
+        this.addEventListener('loadend', () => { net.pending--; });
+        return originalSend.apply(this, arguments);
+    };
+}
+return [window.__agroredNet.pending, performance.getEntriesByType('resource').length, document.readyState];
+"""
+
+
+class StepTimings:
+    """Mide cuánto tiempo de cada paso se va en esperas y cuánto en trabajo.
+
+    Los pasos se registran con el decorador `step`; las esperas hechas con las
+    funciones de este módulo se suman al paso activo del hilo que las ejecuta.
+    Los listeners reciben `step_started(step, args)` y
+    `step_finished(step, args, record)` alrededor de cada paso.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.records = []
+        self.listeners = []
+        # Multiplicador de todos los timeouts (p. ej. al emular red o CPU lentas)
+        self.timeout_scale = 1.0
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def step(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(self._local, "current", None) is not None:
+                # Paso anidado: sus esperas cuentan para el paso externo
+                return func(*args, **kwargs)
+            for listener in self.listeners:
+                listener.step_started(func.__name__, args)
+            start = time.perf_counter()
+            self._local.current = {"step": func.__name__, "wait": 0.0, "start": start}
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record = self._local.current
+                del record["start"]
+                record["total"] = time.perf_counter() - start
+                record["work"] = max(record["total"] - record["wait"], 0.0)
+                self._local.current = None
+                with self._lock:
+                    self.records.append(record)
+                for listener in self.listeners:
+                    listener.step_finished(func.__name__, args, record)
+        return wrapper
+
+    def current_timeout(self):
+        current = getattr(self._local, "current", None)
+        if current is None:
+            return DEFAULT_TIMEOUT * self.timeout_scale
+        return STEP_TIMEOUTS.get(current["step"], DEFAULT_TIMEOUT) * self.timeout_scale
+
+    def current_elapsed(self):
+        """Segundos desde que empezó el paso activo, o None fuera de un paso."""
+        current = getattr(self._local, "current", None)
+        if current is None:
+            return None
+        return time.perf_counter() - current["start"]
+
+    def add_wait(self, seconds):
+        current = getattr(self._local, "current", None)
+        if current is not None:
+            current["wait"] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+    def extend(self, records):
+        """Incorpora registros medidos en otro proceso (escenarios en paralelo)."""
+        with self._lock:
+            self.records.extend(records)
+
+    def rows(self):
+        """Filas por paso con el formato de `RequestRecorder.summary()` (ms por llamada)."""
+        steps = {}
+        with self._lock:
+            for record in self.records:
+                steps.setdefault(record["step"], []).append(record["total"] * 1000)
+        rows = []
+        for step in sorted(steps):
+            values = sorted(steps[step])
+            rows.append({
+                "endpoint": step,
+                "count": len(values),
+                "errors": 0,
+                "min": values[0],
+                "mean": sum(values) / len(values),
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            })
+        return rows
+
+    def summary(self):
+        """Agrega los registros por paso: llamadas, total, espera y trabajo en segundos."""
+        steps = {}
+        with self._lock:
+            for record in self.records:
+                stats = steps.setdefault(record["step"], {"calls": 0, "total": 0.0, "wait": 0.0, "work": 0.0})
+                stats["calls"] += 1
+                stats["total"] += record["total"]
+                stats["wait"] += record["wait"]
+                stats["work"] += record["work"]
+        return steps
+
+
+timings = StepTimings()
+
+
+def wait_until(driver, condition, timeout=None, message=""):
+    """Espera una condición de Selenium sumando el tiempo esperado al paso actual."""
+    timeout = timeout or timings.current_timeout()
+    start = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition, message)
+    finally:
+        timings.add_wait(time.perf_counter() - start)
+
+
+_ELEMENT_STATES = {
+    "present": EC.presence_of_element_located,
+    "visible": EC.visibility_of_element_located,
+    "clickable": EC.element_to_be_clickable,
+    "invisible": EC.invisibility_of_element_located,
+}
+
+
+def wait_for_element(driver, locator, state="present", timeout=None):
+    """Espera a que el elemento `locator` llegue al estado indicado y lo devuelve."""
+    return wait_until(driver, _ELEMENT_STATES[state](locator), timeout,
+                      f"Elemento {locator} no llegó al estado '{state}'")
+
+
+def wait_for_staleness(driver, element, timeout=None):
+    """Espera a que un elemento desaparezca del DOM (p. ej. tras eliminarlo)."""
+    return wait_until(driver, EC.staleness_of(element), timeout, "El elemento sigue en el DOM")
+
+
+def wait_for_route_change(driver, old_url, timeout=None):
+    """Espera a que la SPA navegue a una URL distinta de `old_url`."""
+    return wait_until(driver, EC.url_changes(old_url), timeout, f"La ruta no cambió desde {old_url}")
+
+
+def wait_for_route(driver, url_fragment, timeout=None):
+    """Espera a que la URL actual contenga `url_fragment`."""
+    return wait_until(driver, EC.url_contains(url_fragment), timeout, f"La ruta no llegó a {url_fragment}")
+
+
+def track_network(driver):
+    """Instala el contador de peticiones antes de una acción que dispara tráfico."""
+    driver.execute_script(_NETWORK_TRACKER_JS)
+
+
+class _NetworkIdle:
+    """Condición: documento cargado, sin fetch/XHR en vuelo y sin recursos nuevos durante `quiet` s."""
+
+    def __init__(self, quiet):
+        self.quiet = quiet
+        self.last_state = None
+        self.last_change = None
+
+    def __call__(self, driver):
+        pending, resources, ready_state = driver.execute_script(_NETWORK_TRACKER_JS)
+        now = time.perf_counter()
+        state = (pending, resources)
+        if pending > 0 or ready_state != "complete" or state != self.last_state:
+            self.last_state = state
+            self.last_change = now
+            return False
+        return now - self.last_change >= self.quiet
+
+
+def wait_for_network_idle(driver, quiet=NETWORK_QUIET, timeout=None):
+    """Espera a que la página deje de hacer peticiones de red."""
+    return wait_until(driver, _NetworkIdle(quiet), timeout, "La red no quedó inactiva")
+
+
+class _StableCount:
+    """Condición: el número de elementos que coinciden con `locator` no cambia durante `quiet` s."""
+
+    def __init__(self, locator, quiet):
+        self.locator = locator
+        self.quiet = quiet
+        self.last_count = None
+        self.last_change = None
+
+    def __call__(self, driver):
+        by, value = self.locator
+        if by == By.CLASS_NAME:
+            # Se cuenta dentro de la página: no trae una referencia por elemento en cada sondeo
+            count = driver.execute_script("return document.getElementsByClassName(arguments[0]).length;", value)
+        elif by == By.CSS_SELECTOR:
+            count = driver.execute_script("return document.querySelectorAll(arguments[0]).length;", value)
+        else:
+            count = len(driver.find_elements(by, value))
+        now = time.perf_counter()
+        if count != self.last_count:
+            self.last_count = count
+            self.last_change = now
+            return False
+        return now - self.last_change >= self.quiet
+
+
+def wait_for_stable_count(driver, locator, quiet=0.3, timeout=None):
+    """Espera a que una lista de elementos (p. ej. tarjetas filtradas) se estabilice."""
+    return wait_until(driver, _StableCount(locator, quiet), timeout, f"La lista {locator} no se estabilizó")
+
+
+# Marca en la página el último evento `input` del campo y la última mutación del DOM
+_INPUT_TIMER_JS = """
+const input = arguments[0];
+if (!window.__agroredInput) {
+    const timer = window.__agroredInput = {lastInput: 0, lastMutation: 0};
+    new MutationObserver(() => { timer.lastMutation = performance.now(); })
+        .observe(document.body, {childList: true, subtree: true, characterData: true});
+}
+if (!input.__agroredTimed) {
+    input.__agroredTimed = true;
+    input.addEventListener('input', () => { window.__agroredInput.lastInput = performance.now(); });
+}
+window.__agroredInput.lastInput = 0;
+window.__agroredInput.lastMutation = 0;
+"""
+
+_INPUT_TIMER_STATE_JS = "const t = window.__agroredInput; return [t.lastInput, t.lastMutation, performance.now()];"
+
+
+def start_input_timer(driver, element):
+    """Empieza a medir la respuesta de la página a lo que se escriba en `element`."""
+    driver.execute_script(_INPUT_TIMER_JS, element)
+
+
+class _InputSettled:
+    """Condición: hubo tecleo y el DOM no cambia desde hace `quiet` s; devuelve la latencia en ms."""
+
+    def __init__(self, quiet):
+        self.quiet_ms = quiet * 1000
+
+    def __call__(self, driver):
+        last_input, last_mutation, now = driver.execute_script(_INPUT_TIMER_STATE_JS)
+        if not last_input or now - max(last_input, last_mutation) < self.quiet_ms:
+            return False
+        # Se devuelve en una tupla para que una latencia de 0 ms cuente como condición cumplida
+        # (sin mutaciones posteriores al último tecleo no había nada que repintar)
+        return (max(last_mutation - last_input, 0.0),)
+
+
+def wait_for_input_settled(driver, quiet=0.3, timeout=None):
+    """Espera a que el DOM se estabilice tras el último tecleo.
+
+    Devuelve los milisegundos entre el último evento `input` y la última
+    mutación del DOM, medidos con el reloj de la propia página.
+    """
+    (latency,) = wait_until(driver, _InputSettled(quiet), timeout, "El DOM no se estabilizó tras escribir")
+    return latency
+
+
+def wait_for_alert(driver, timeout=None):
+    """Espera a que aparezca un `alert()` nativo del navegador y lo devuelve."""
+    return wait_until(driver, EC.alert_is_present(), timeout, "No apareció la alerta")